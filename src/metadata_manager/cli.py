@@ -10,7 +10,11 @@ from rich.prompt import Confirm
 
 # Importaciones relativas simples
 from .core.file_scanner import FileScanner
+from .core.http_client import connection_stats
+from .core.library_index import open_library_index
 from .core.metadata_manager import MetadataManager
+from .core.response_cache import get_response_cache
+from .core.retry import retry_stats
 from .core.display import display_results_table  # Nuevo import
 
 def parse_args():
@@ -22,6 +26,9 @@ def parse_args():
     parser.add_argument("-a", "--auto", action="store_true", help="Auto mode (no prompts)")
     parser.add_argument("-p", "--providers", help="Comma-separated list of providers")
     parser.add_argument("--no-search", action="store_true", help="Skip metadata search")
+    parser.add_argument("-j", "--workers", type=int, help="Parallel tag readers (1 disables parallel scanning)")
+    parser.add_argument("--processes", action="store_true", help="Read tags in worker processes instead of threads")
+    parser.add_argument("--no-index", action="store_true", help="Re-read every file instead of using the library index")
     return parser.parse_args()
 
 def display_metadata(files: List[Dict], compact: bool = True):
@@ -62,7 +69,6 @@ def _format_display_title(self, match: Dict) -> str:
     """Format title with year and tracks info."""
     title = match.get('title') or match.get('album') or '(No title)'
     year = match.get('year', '')
-    num_tracks = len(match.get('tracks', []))
     
     # Build display string
     parts = []
@@ -89,12 +95,25 @@ def search_metadata(files: List[Dict], args) -> None:
         if not title:
             continue
             
-        results = manager.search_all([{
+        query = [{
             'metadata': {
                 'title': [title],
                 'artist': [artist]
             }
-        }])
+        }]
+        
+        if args.auto:
+            # Take the first good enough match instead of waiting for every provider
+            options = manager.race_search(query)
+            if options:
+                rprint(f"Selected: {options['title']} by {options['artist']} "
+                       f"[cyan]({options.get('provider', 'unknown')}, score {options.get('score', 0):.1f})[/cyan]")
+                processed += 1
+            else:
+                rprint(f"[yellow]No match above the score threshold for: {title}[/yellow]")
+            continue
+        
+        results = manager.search_all(query)
         
         if results:
             rprint(f"\n[cyan]Results for: {title}[/cyan]")
@@ -103,16 +122,39 @@ def search_metadata(files: List[Dict], args) -> None:
             if options:
                 rprint(f"Selected: {options['title']} by {options['artist']}")
                 processed += 1
-            elif not args.auto:
-                if Confirm.ask("\nExit metadata search?", default=True):
-                    break
+            elif Confirm.ask("\nExit metadata search?", default=True):
+                break
+
+    display_provider_status(manager)
+
+def display_provider_status(manager: MetadataManager) -> None:
+    """Show providers skipped because they kept failing, retried requests, caching and connection reuse."""
+    failing = {name: state for name, state in manager.provider_status().items() if state != "closed"}
+    if failing:
+        rprint("\n[yellow]Providers skipped:[/yellow] " +
+               ", ".join(f"{name} ({state})" for name, state in failing.items()))
+    retries = retry_stats()
+    if retries:
+        rprint("[cyan]Retried requests:[/cyan] " + ", ".join(f"{name} {count}" for name, count in retries.items()))
+    cache = get_response_cache()
+    if cache is not None and cache.hits + cache.misses:
+        stats = cache.stats()
+        rprint(f"[cyan]Response cache:[/cyan] {stats['hits']} hits, {stats['misses']} misses, "
+               f"{stats['entries']} stored")
+    connections = connection_stats()
+    if connections:
+        rprint("[cyan]Connections:[/cyan] " + ", ".join(
+            f"{host} {stats['requests']} requests on {stats['connections']} connections"
+            for host, stats in connections.items()
+        ))
 
 def main():
     """Main entry point."""
     args = parse_args()
     
     # Initialize scanner
-    scanner = FileScanner()
+    index = None if args.no_index else open_library_index()
+    scanner = FileScanner(workers=args.workers, use_processes=args.processes, index=index)
     
     # Scan directory
     rprint(f"[cyan]Scanning directory: {args.directory}[/cyan]")
@@ -1,7 +1,8 @@
 """Utility to find artwork from various sources."""
-import requests
 from urllib.parse import quote
 
+from .http_client import get_json
+
 def find_artwork(artist: str = "", album: str = "", title: str = "", size: str = "large") -> str:
     """Find artwork URL from various sources.
     
@@ -46,13 +47,11 @@ def find_lastfm_artwork(artist: str, album: str, size: str = "large") -> str:
             "format": "json"
         }
         
-        response = requests.get("http://ws.audioscrobbler.com/2.0/", params=params)
-        if response.status_code == 200:
-            data = response.json()
-            if "album" in data and "image" in data["album"]:
-                for image in data["album"]["image"]:
-                    if image["size"] == size and image["#text"]:
-                        return image["#text"]
+        data = get_json("http://ws.audioscrobbler.com/2.0/", params=params)
+        if "album" in data and "image" in data["album"]:
+            for image in data["album"]["image"]:
+                if image["size"] == size and image["#text"]:
+                    return image["#text"]
     except Exception as e:
         print(f"Last.fm artwork error: {e}")
         
@@ -68,15 +67,13 @@ def find_musicbrainz_artwork(artist: str, album: str) -> str:
         query = f"release:{album} AND artist:{artist}"
         url = f"https://musicbrainz.org/ws/2/release?query={quote(query)}&fmt=json&limit=1"
         
-        response = requests.get(url, headers={"User-Agent": "MusicDLP/1.0"})
-        if response.status_code == 200:
-            data = response.json()
-            if data["releases"] and data["releases"][0].get("id"):
-                # Get artwork from Cover Art Archive
-                mbid = data["releases"][0]["id"]
-                caa_url = f"https://coverartarchive.org/release/{mbid}/front"
-                # Just return the URL - no need to check, CAA will redirect if image exists
-                return caa_url
+        data = get_json(url)
+        if data["releases"] and data["releases"][0].get("id"):
+            # Get artwork from Cover Art Archive
+            mbid = data["releases"][0]["id"]
+            caa_url = f"https://coverartarchive.org/release/{mbid}/front"
+            # Just return the URL - no need to check, CAA will redirect if image exists
+            return caa_url
     except Exception as e:
         print(f"MusicBrainz artwork error: {e}")
         
@@ -97,15 +94,13 @@ def find_itunes_artwork(artist: str, album: str) -> str:
             "limit": 1
         }
         
-        response = requests.get("https://itunes.apple.com/search", params=params)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("resultCount", 0) > 0:
-                # Get artwork URL and convert to higher resolution
-                artwork_url = data["results"][0].get("artworkUrl100", "")
-                if artwork_url:
-                    # Convert to larger size (e.g. 600x600)
-                    return artwork_url.replace("100x100", "600x600")
+        data = get_json("https://itunes.apple.com/search", params=params)
+        if data.get("resultCount", 0) > 0:
+            # Get artwork URL and convert to higher resolution
+            artwork_url = data["results"][0].get("artworkUrl100", "")
+            if artwork_url:
+                # Convert to larger size (e.g. 600x600)
+                return artwork_url.replace("100x100", "600x600")
     except Exception as e:
         print(f"iTunes artwork error: {e}")
         
@@ -0,0 +1,133 @@
+"""Circuit breaker for providers that keep failing or answering slowly."""
+import time
+import threading
+from collections import deque
+from typing import Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_SLOW_CALL = 10.0
+DEFAULT_WINDOW = 10
+DEFAULT_MIN_CALLS = 3
+DEFAULT_OPEN_SECONDS = 60.0
+
+class CircuitOpenError(Exception):
+    """A call was refused because the provider's circuit is open."""
+
+class CircuitBreaker:
+    """Tracks the outcome of recent calls to one provider.
+    
+    The circuit opens once at least failure_rate of the last window calls
+    failed or took longer than slow_call seconds (after min_calls calls).
+    While open, calls are refused for open_seconds; then a single probe
+    call is let through. A good probe closes the circuit again, a bad one
+    reopens it.
+    """
+    
+    def __init__(self, failure_rate: float = DEFAULT_FAILURE_RATE, slow_call: float = DEFAULT_SLOW_CALL,
+                 window: int = DEFAULT_WINDOW, min_calls: int = DEFAULT_MIN_CALLS,
+                 open_seconds: float = DEFAULT_OPEN_SECONDS):
+        """
+        Initialize a closed circuit.
+        
+        Args:
+            failure_rate: Share of bad calls in the window that opens the circuit
+            slow_call: Seconds after which a successful call still counts as bad
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before the circuit can open
+            open_seconds: Seconds calls are refused before a probe is allowed
+        """
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.min_calls = max(1, min_calls)
+        self.open_seconds = open_seconds
+        self._outcomes = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.last_error: Optional[BaseException] = None
+    
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half-open."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            return self._state
+    
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in half-open state only one probe at a time does."""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            # A probe that never reported back (e.g. cancelled) does not block forever
+            now = time.monotonic()
+            if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+                return False
+            self._probe_started = now
+            return True
+    
+    def record(self, ok: bool, elapsed: float, error: Optional[BaseException] = None) -> bool:
+        """
+        Record the outcome of a call.
+        
+        Args:
+            ok: Whether the call succeeded
+            elapsed: Seconds the call took
+            error: Exception raised by the call, None if it succeeded
+        
+        Returns:
+            True if this call opened the circuit
+        """
+        good = ok and elapsed < self.slow_call
+        with self._lock:
+            self.last_error = error
+            if self._state == HALF_OPEN:
+                self._probe_started = None
+                if good:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    return False
+                return self._open()
+            
+            self._outcomes.append(good)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    return self._open()
+            return False
+    
+    def release(self):
+        """Forget a call that ended without a verdict, e.g. cut short by the caller's deadline."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                # Let the next call probe instead
+                self._probe_started = None
+    
+    def _open(self) -> bool:
+        """Open the circuit; called with the lock held."""
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        return True
+    
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+    
+    def describe(self) -> str:
+        """Short state description for status lines."""
+        state = self.state
+        if state == OPEN:
+            return f"open, retry in {self.retry_in():.0f}s"
+        return state
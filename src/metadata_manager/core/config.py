@@ -0,0 +1,81 @@
+"""Configuration loading."""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from rich import print as rprint
+
+# Importaciones opcionales
+try:
+    import tomllib
+    HAS_TOML = True
+except ImportError:
+    try:
+        import tomli as tomllib
+        HAS_TOML = True
+    except ImportError:
+        HAS_TOML = False
+
+CONFIG_ENV_VAR = 'MUSIC_DLP_CONFIG'
+
+_config = None
+_config_lock = threading.Lock()
+
+def config_paths() -> List[Path]:
+    """Locations searched for config.toml, most specific first."""
+    paths = []
+    if os.environ.get(CONFIG_ENV_VAR):
+        paths.append(Path(os.environ[CONFIG_ENV_VAR]))
+    paths.append(Path.cwd() / 'config.toml')
+    config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(Path.home(), '.config')
+    paths.append(Path(config_home) / 'music-dlp' / 'config.toml')
+    # Checkout root, for running from the source tree
+    paths.append(Path(__file__).resolve().parents[3] / 'config.toml')
+    return paths
+
+def load_config(path: Optional[os.PathLike] = None) -> Dict[str, Any]:
+    """
+    Read a config file.
+    
+    Args:
+        path: File to read, defaults to the first existing entry of config_paths()
+    
+    Returns:
+        Parsed settings, or an empty dict if there is no usable config
+    """
+    candidates = [Path(path)] if path else config_paths()
+    for candidate in candidates:
+        if not candidate.is_file():
+            continue
+        if not HAS_TOML:
+            rprint("[yellow]Warning: tomli not installed. config.toml is ignored.[/yellow]")
+            return {}
+        try:
+            with open(candidate, 'rb') as f:
+                return tomllib.load(f)
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            rprint(f"[yellow]Warning: Could not read {candidate} - {str(e)}[/yellow]")
+            return {}
+    return {}
+
+def get_config() -> Dict[str, Any]:
+    """Settings shared by the whole process, loaded on first use."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = load_config()
+        return _config
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """
+    Look up one setting.
+    
+    Args:
+        section: Dotted table name, e.g. 'providers' or 'providers.spotify'
+        key: Setting name inside the table
+        default: Value when the setting is missing
+    """
+    table = get_config()
+    for part in section.split('.'):
+        table = table.get(part, {}) if isinstance(table, dict) else {}
+    return table.get(key, default) if isinstance(table, dict) else default
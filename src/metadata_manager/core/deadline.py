@@ -0,0 +1,87 @@
+"""Time budgets for searches, passed down to every request they make."""
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future
+from typing import Callable, Iterator, Optional
+
+class DeadlineExceeded(Exception):
+    """The search this call belongs to ran out of time."""
+
+# Monotonic time by which the current search must be done, None if unbounded
+_deadline: 'contextvars.ContextVar[Optional[float]]' = contextvars.ContextVar('deadline', default=None)
+
+@contextmanager
+def scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Run a block with at most `seconds` left; an enclosing budget is never extended.
+    
+    The budget follows the context into tasks and into threads started
+    with submit() or to_thread().
+    """
+    if seconds is None:
+        yield
+        return
+    current = _deadline.get()
+    until = time.monotonic() + seconds
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget, None if there is none."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+def check():
+    """
+    Raise if the current budget is spent.
+    
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("search deadline exceeded")
+
+def request_timeout(timeout: float) -> float:
+    """
+    Timeout for a request: the given one, capped by the time left.
+    
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    check()
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+def sleep(seconds: float):
+    """
+    Sleep, unless that would outlast the current budget.
+    
+    Raises:
+        DeadlineExceeded: If the budget ends before the sleep would
+    """
+    left = remaining()
+    if left is not None and seconds >= left:
+        raise DeadlineExceeded("search deadline exceeded")
+    time.sleep(seconds)
+
+async def sleep_async(seconds: float):
+    """Async counterpart of sleep()."""
+    left = remaining()
+    if left is not None and seconds >= left:
+        raise DeadlineExceeded("search deadline exceeded")
+    await asyncio.sleep(seconds)
+
+def submit(executor: Executor, func: Callable, *args) -> Future:
+    """Submit func to an executor, keeping the caller's budget."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+async def to_thread(func: Callable, *args):
+    """Run func on the loop's default executor, keeping the caller's budget (asyncio.to_thread needs 3.9)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, contextvars.copy_context().run, func, *args)
@@ -3,6 +3,8 @@ from typing import Dict, List
 from rich import print as rprint
 from rich.table import Table
 
+from .lazy_tracks import format_track_count, track_count
+
 def display_results_table(results: List[Dict]):
     """Display search results in a table."""
     if not results:
@@ -32,8 +34,7 @@ def display_results_table(results: List[Dict]):
         album = result.get("album", title)
         year = result.get("year", "")
         score = f"{result.get('score', 0):.1f}"
-        num_tracks = len(result.get('tracks', []))
-        tracks_str = str(num_tracks) if num_tracks > 0 else ""
+        tracks_str = format_track_count(result.get('tracks'))
         
         table.add_row(source, title, artist, album, year, score, tracks_str)
 
@@ -48,7 +49,11 @@ def display_results_table(results: List[Dict]):
         rprint(f"{provider} ({len(provider_results)} matches):")
         
         for result in provider_results:
-            tracks_info = f"{len(result.get('tracks', []))} tracks" if result.get('tracks') else "no track info"
+            num_tracks = track_count(result.get('tracks'))
+            if num_tracks is None:
+                tracks_info = "tracks on request"
+            else:
+                tracks_info = f"{num_tracks} tracks" if num_tracks else "no track info"
             year_str = f" ({result.get('year', '')}) " if result.get('year') else " "
             display = f"{result.get('artist', '')} - {result.get('title', '')}{year_str}• {tracks_info}"
             rprint(f"  {match_index}. {display}")
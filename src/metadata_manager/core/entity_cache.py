@@ -0,0 +1,215 @@
+"""Process-wide cache of provider entities such as albums and releases."""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from rich import print as rprint
+
+from .config import get_setting
+from .singleflight import SingleFlight
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 24 * 60 * 60  # Album track lists rarely change within a day
+
+def default_entity_cache_path() -> Path:
+    """Location of the persisted entity cache."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(cache_home) / 'music-dlp' / 'entities.db'
+
+class EntityCache:
+    """LRU cache with expiry, keyed by (provider, entity type, id).
+    
+    Providers read albums and releases through get_or_fetch(), so an entity
+    shared by several search results is fetched once per process, even when
+    they ask for it at the same time. Failed
+    fetches raise and are not cached. With a db_path, entries are also
+    written to SQLite and reused by later runs until they expire.
+    """
+    
+    SCHEMA_VERSION = 1
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 db_path: Optional[os.PathLike] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Entities kept in memory before the least recently used is dropped
+            ttl: Seconds an entity stays valid
+            db_path: SQLite file to persist entities in, or None to keep them in memory only
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._open(Path(db_path))
+    
+    def _open(self, db_path: Path):
+        """Open the SQLite store, falling back to memory only on failure."""
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                if version != self.SCHEMA_VERSION:
+                    self._conn.execute("DROP TABLE IF EXISTS entities")
+                    self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS entities (
+                        provider TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        id TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        expires REAL NOT NULL,
+                        PRIMARY KEY (provider, kind, id)
+                    )
+                """)
+                self._conn.execute("DELETE FROM entities WHERE expires < ?", (time.time(),))
+        except sqlite3.Error as e:
+            rprint(f"[yellow]Warning: Entity cache not persisted - {str(e)}[/yellow]")
+            self._conn = None
+    
+    @staticmethod
+    def _key(provider: str, kind: str, entity_id: Any) -> Tuple[str, str, str]:
+        return provider, kind, str(entity_id)
+    
+    def get(self, provider: str, kind: str, entity_id: Any) -> Optional[Any]:
+        """Cached entity, or None if missing or expired."""
+        key = self._key(provider, kind, entity_id)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, expires FROM entities WHERE provider = ? AND kind = ? AND id = ?", key
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._store(key, value, row[1])
+                    self.hits += 1
+                    return value
+            
+            self.misses += 1
+            return None
+    
+    def set(self, provider: str, kind: str, entity_id: Any, value: Any):
+        """Store an entity."""
+        key = self._key(provider, kind, entity_id)
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires)
+            if self._conn is not None:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO entities (provider, kind, id, value, expires) VALUES (?, ?, ?, ?, ?)",
+                            key + (json.dumps(value), expires)
+                        )
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    rprint(f"[yellow]Warning: Could not persist {key[0]} {key[1]} - {str(e)}[/yellow]")
+    
+    def _store(self, key: Tuple[str, str, str], value: Any, expires: float):
+        """Put an entry in memory, evicting the least recently used ones."""
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get_or_fetch(self, provider: str, kind: str, entity_id: Any, fetch: Callable[[], Any]) -> Any:
+        """
+        Get an entity, fetching and caching it on a miss.
+        
+        Args:
+            provider: Provider name
+            kind: Entity type, e.g. 'album' or 'release'
+            entity_id: Provider ID of the entity
+            fetch: Called without arguments to load the entity; may raise
+        
+        Returns:
+            The cached or freshly fetched entity
+        """
+        value = self.get(provider, kind, entity_id)
+        if value is not None:
+            return value
+        
+        def load():
+            # Another caller may have stored it while this one waited
+            value = self.get(provider, kind, entity_id)
+            if value is None:
+                value = fetch()
+                if value is not None:
+                    self.set(provider, kind, entity_id, value)
+            return value
+        
+        # Concurrent misses for one entity share a single fetch
+        return self._flights.do(self._key(provider, kind, entity_id), load)
+    
+    async def get_or_fetch_async(self, provider: str, kind: str, entity_id: Any,
+                                 fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of get_or_fetch(); fetch returns an awaitable."""
+        value = self.get(provider, kind, entity_id)
+        if value is not None:
+            return value
+        
+        async def load():
+            value = self.get(provider, kind, entity_id)
+            if value is None:
+                value = await fetch()
+                if value is not None:
+                    self.set(provider, kind, entity_id, value)
+            return value
+        
+        return await self._flights.do_async(self._key(provider, kind, entity_id), load)
+    
+    def clear(self):
+        """Drop all cached entities, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entities")
+    
+    def close(self):
+        """Close the SQLite store."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_entity_cache = None
+_entity_cache_lock = threading.Lock()
+
+def get_entity_cache() -> EntityCache:
+    """Cache shared by all providers, configured from [cache] in config.toml."""
+    global _entity_cache
+    with _entity_cache_lock:
+        if _entity_cache is None:
+            persist = get_setting('cache', 'persist_entities', False)
+            _entity_cache = EntityCache(
+                max_entries=get_setting('cache', 'entity_max_entries', DEFAULT_MAX_ENTRIES),
+                ttl=float(get_setting('cache', 'entity_ttl', DEFAULT_TTL)),
+                db_path=default_entity_cache_path() if persist else None
+            )
+        return _entity_cache
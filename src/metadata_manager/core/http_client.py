@@ -0,0 +1,238 @@
+"""Shared HTTP helpers for metadata providers."""
+import json
+import socket
+import asyncio
+import weakref
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import deadline, retry
+from .deadline import DeadlineExceeded
+from .rate_limit import provider_for_url, throttle, throttle_async
+from .response_cache import cache_key, get_response_cache
+from .singleflight import SingleFlight
+
+# Importaciones opcionales
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+USER_AGENT = "MusicDLP/1.0"
+# Seconds to wait for a response; connecting gets a shorter budget
+DEFAULT_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 3.05
+
+# Connection pools of the shared session: hosts kept, and connections per
+# host, enough for every provider worker of a parallel batch run
+POOL_HOSTS = 16
+POOL_CONNECTIONS_PER_HOST = 20
+
+# Connection pool of the async client, shared by all providers
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+class HTTPStatusError(Exception):
+    """Error response from a provider API, for both sync and async requests."""
+    
+    def __init__(self, status: int, url: str, headers: Optional[Dict] = None):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.headers = dict(headers or {})
+
+# Errors meaning a provider could not be reached: failed connections and
+# timeouts, as opposed to an answer. Error replies are judged by their status
+# in is_transport_error().
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    ConnectionError, TimeoutError, socket.timeout, DeadlineExceeded)
+STATUS_ERRORS = (HTTPStatusError, requests.HTTPError)
+if HAS_HTTPX:
+    TRANSPORT_ERRORS += (httpx.TransportError,)
+    STATUS_ERRORS += (httpx.HTTPStatusError,)
+
+def is_transport_error(error: BaseException, transport_errors: Tuple = TRANSPORT_ERRORS) -> bool:
+    """
+    Whether an error means the provider is unreachable or failing.
+    
+    Error replies only count when the provider is overloaded (429) or broken
+    (5xx); a 4xx reply is an answer to a bad or unknown query.
+    
+    Args:
+        error: Exception raised by a request
+        transport_errors: Exception types that count regardless of status
+    """
+    if isinstance(error, STATUS_ERRORS):
+        status = getattr(error, 'status', None)
+        if status is None:
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status is None or status == 429 or status >= 500
+    return isinstance(error, transport_errors)
+
+def get_json(url: str, params: Optional[Dict] = None,
+             headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    """
+    GET a JSON document over the shared session, once the API's rate limit allows.
+    
+    Successful responses are served from the response cache while fresh,
+    concurrent identical requests share one round trip, and transient
+    failures are retried under the provider's retry policy.
+    
+    Raises:
+        HTTPStatusError: On a 4xx or 5xx response
+    """
+    cached = _cached_json(url, params)
+    if cached is not None:
+        return cached
+    
+    def attempt():
+        throttle(url)
+        response = get_session().get(url, params=params, headers=headers, timeout=(CONNECT_TIMEOUT, timeout))
+        if response.status_code >= 400:
+            raise HTTPStatusError(response.status_code, response.url, response.headers)
+        return _store_json(url, params, response.text)
+    
+    return _flights.do(cache_key('GET', url, params), lambda: retry.call(_retry_name(url), attempt))
+
+async def get_json_async(url: str, params: Optional[Dict] = None,
+                         headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT):
+    """
+    GET a JSON document without blocking the event loop.
+    
+    Uses one pooled httpx client per event loop, so many lookups share
+    connections on a single thread. Without httpx the request runs on the
+    loop's default executor instead.
+    
+    Raises:
+        HTTPStatusError: On a 4xx or 5xx response
+    """
+    if not HAS_HTTPX:
+        return await deadline.to_thread(get_json, url, params, headers, timeout)
+    
+    cached = _cached_json(url, params)
+    if cached is not None:
+        return cached
+    
+    async def attempt():
+        await throttle_async(url)
+        timeout_left = deadline.request_timeout(timeout)
+        response = await _get_async_client().get(
+            url, params=params, headers=headers,
+            timeout=httpx.Timeout(timeout_left, connect=min(CONNECT_TIMEOUT, timeout_left))
+        )
+        if response.status_code >= 400:
+            raise HTTPStatusError(response.status_code, str(response.url), response.headers)
+        return _store_json(url, params, response.text)
+    
+    return await _flights.do_async(cache_key('GET', url, params), lambda: retry.call_async(_retry_name(url), attempt))
+
+def get_content(url: str, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+    """
+    GET a binary resource such as cover art over the shared session; not cached.
+    
+    Raises:
+        HTTPStatusError: On a 4xx or 5xx response
+    """
+    def attempt():
+        throttle(url)
+        response = get_session().get(url, timeout=(CONNECT_TIMEOUT, timeout))
+        if response.status_code >= 400:
+            raise HTTPStatusError(response.status_code, response.url, response.headers)
+        return response.content
+    
+    return retry.call(_retry_name(url), attempt)
+
+def _retry_name(url: str) -> str:
+    """Retry counter a request counts against: its provider, or else its host."""
+    return provider_for_url(url) or urlsplit(url).hostname or ''
+
+def get_session() -> requests.Session:
+    """
+    Session shared by every blocking request of the application.
+    
+    Connections are kept alive in per-host pools, so repeated lookups skip
+    the TCP and TLS handshakes. Libraries that accept a requests session
+    (ytmusicapi, spotipy) are given this one too. Every request gets a
+    timeout, capped by the remaining budget of the search it belongs to.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+            adapter = _DeadlineAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+class _DeadlineAdapter(HTTPAdapter):
+    """Adapter giving every request a timeout within the current search's budget."""
+    
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (CONNECT_TIMEOUT, DEFAULT_TIMEOUT)
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        timeout = (deadline.request_timeout(connect), deadline.request_timeout(read))
+        return super().send(request, timeout=timeout, **kwargs)
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """Requests sent and connections opened per host by the shared session, for pools still open."""
+    stats = {}
+    if _session is None:
+        return stats
+    for adapter in {id(a): a for a in _session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+            host['requests'] += pool.num_requests
+            host['connections'] += pool.num_connections
+    return stats
+
+def _cached_json(url: str, params: Optional[Dict]):
+    """Fresh cached document for a GET request, or None."""
+    cache = get_response_cache()
+    body = cache.get('GET', url, params) if cache is not None else None
+    return json.loads(body) if body is not None else None
+
+def _store_json(url: str, params: Optional[Dict], body: str):
+    """Parse a response body and cache it."""
+    data = json.loads(body)
+    cache = get_response_cache()
+    if cache is not None:
+        cache.set('GET', url, params, body)
+    return data
+
+async def aclose():
+    """Close the async client of the running event loop."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# Identical requests in progress, shared by sync and async callers
+_flights = SingleFlight()
+# httpx clients are bound to the loop that created them
+_async_clients = weakref.WeakKeyDictionary()
+_session = None
+_session_lock = threading.Lock()
+
+def _get_async_client() -> 'httpx.AsyncClient':
+    """Pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+        )
+        _async_clients[loop] = client
+    return client
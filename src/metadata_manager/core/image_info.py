@@ -0,0 +1,83 @@
+"""Header-only image dimension sniffing."""
+import os
+import struct
+from functools import lru_cache
+from typing import BinaryIO, Optional, Tuple, Union
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but do not
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+def get_image_size(path: Union[str, os.PathLike]) -> Optional[Tuple[int, int]]:
+    """
+    Get (width, height) of a JPEG or PNG image by reading its header only.
+    
+    Results are cached by path and modification time, so repeated scans of
+    the same folders do not touch the files again.
+    
+    Args:
+        path: Image file path
+    
+    Returns:
+        (width, height), or None if the size could not be determined
+    """
+    path = os.fspath(path)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    return _cached_image_size(path, mtime_ns)
+
+@lru_cache(maxsize=8192)
+def _cached_image_size(path: str, mtime_ns: int) -> Optional[Tuple[int, int]]:
+    """Sniff an image once per (path, mtime)."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+            if head.startswith(PNG_SIGNATURE):
+                return _png_size(head)
+            if head.startswith(b'\xff\xd8'):
+                f.seek(2)
+                return _jpeg_size(f)
+    except (OSError, struct.error):
+        pass
+    return None
+
+def _png_size(head: bytes) -> Optional[Tuple[int, int]]:
+    """Read the size from the IHDR chunk, which must come first."""
+    if len(head) < 24 or head[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', head[16:24])
+    return width, height
+
+def _jpeg_size(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Walk JPEG segment headers until the start-of-frame segment."""
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue  # Not at a marker, resync
+        
+        # Skip fill bytes
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            return None
+        
+        code = marker[0]
+        if code in JPEG_STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code == 0xD9:  # End of image
+            return None
+        
+        length = struct.unpack('>H', f.read(2))[0]
+        if code in JPEG_SOF_MARKERS:
+            # Precision (1 byte), then height and width
+            height, width = struct.unpack('>xHH', f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
@@ -0,0 +1,120 @@
+"""Track lists of provider results, fetched only when needed."""
+import asyncio
+import threading
+from collections.abc import Sequence
+from typing import Callable, Dict, List, Optional
+from rich import print as rprint
+
+class LazyTracks(Sequence):
+    """Memoized track list of a search result.
+    
+    Providers hand one of these out instead of fetching every candidate's
+    track list up front. The loader runs on first access (indexing,
+    iteration, len() or truth testing) and only once, even when several
+    threads ask at the same time. Use track_count() to show a count
+    without triggering the fetch. A loader that raises, e.g. on a network
+    error, gives an empty list for that access and is tried again on the
+    next one.
+    
+    A loader may also return a dict with the track list under 'tracks' and
+    other album fields learned on the way, such as the year. Those are kept
+    in details rather than written into the result, which may be shared.
+    """
+    
+    __slots__ = ('_loader', '_tracks', '_count', '_details', '_lock')
+    
+    def __init__(self, loader: Callable[[], List[Dict]], count: Optional[int] = None):
+        """
+        Initialize the handle.
+        
+        Args:
+            loader: Fetches the track list (or a dict with it under 'tracks'), returning [] when there is none
+            count: Track count reported by the search response, if any
+        """
+        self._loader = loader
+        self._tracks = None
+        self._count = count
+        self._details: Dict = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def resolved(self) -> bool:
+        """Whether the track list has been fetched."""
+        return self._tracks is not None
+    
+    @property
+    def count(self) -> Optional[int]:
+        """Number of tracks if known without fetching them."""
+        if self._tracks is not None:
+            return len(self._tracks)
+        return self._count
+    
+    @property
+    def details(self) -> Dict:
+        """Album fields the loader returned with the tracks, empty until resolved."""
+        return self._details
+    
+    def resolve(self) -> List[Dict]:
+        """Fetch the track list if needed and return it."""
+        if self._tracks is None:
+            with self._lock:
+                if self._tracks is None:
+                    try:
+                        loaded = self._loader() or []
+                    except Exception as e:
+                        # Not memoized, so a passing failure is not kept for good
+                        rprint(f"[yellow]Error fetching tracks: {str(e)}[/yellow]")
+                        return []
+                    if isinstance(loaded, dict):
+                        self._details = {key: value for key, value in loaded.items() if key != 'tracks'}
+                        loaded = loaded.get('tracks') or []
+                    self._tracks = list(loaded)
+                    self._loader = None
+        return self._tracks
+    
+    async def resolve_async(self) -> List[Dict]:
+        """Fetch the track list on the loop's executor if needed."""
+        if self._tracks is None:
+            return await asyncio.get_running_loop().run_in_executor(None, self.resolve)
+        return self._tracks
+    
+    def __getitem__(self, index):
+        return self.resolve()[index]
+    
+    def __len__(self) -> int:
+        return len(self.resolve())
+    
+    def __iter__(self):
+        return iter(self.resolve())
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyTracks):
+            other = other.resolve()
+        return self.resolve() == other
+    
+    def __repr__(self) -> str:
+        if self._tracks is not None:
+            return f"LazyTracks({self._tracks!r})"
+        return f"LazyTracks(<pending, count={self._count}>)"
+
+def track_count(tracks) -> Optional[int]:
+    """Number of tracks in a result's track list, or None if not fetched yet."""
+    if isinstance(tracks, LazyTracks):
+        return tracks.count
+    return len(tracks or [])
+
+def fill_details(result: Dict) -> Dict:
+    """Fill a result's empty fields, e.g. year, from its fetched track list's details."""
+    tracks = result.get('tracks')
+    if isinstance(tracks, LazyTracks) and tracks.resolved:
+        for key, value in tracks.details.items():
+            if value and not result.get(key):
+                result[key] = value
+    return result
+
+def format_track_count(tracks) -> str:
+    """Track count for tables: '' when there are none, '?' when not fetched yet."""
+    count = track_count(tracks)
+    if count is None:
+        return "?"
+    return str(count) if count > 0 else ""
@@ -0,0 +1,181 @@
+"""Persistent library index for incremental scans."""
+import os
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from rich import print as rprint
+
+def default_index_path() -> Path:
+    """Location of the shared library index."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(cache_home) / 'music-dlp' / 'library.db'
+
+class LibraryIndex:
+    """SQLite cache of extracted tags keyed by path, size, mtime and inode.
+
+    A scan asks the index first and only reads tags from files whose stat
+    signature changed. Rows for files that disappeared from a scanned
+    directory are dropped when the scan finishes.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Optional[os.PathLike] = None):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: SQLite file to use, defaults to default_index_path()
+        """
+        self.db_path = Path(db_path) if db_path else default_index_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._generation = 0
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create tables, discarding rows written by an older schema."""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS files")
+                self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    dir TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    metadata TEXT NOT NULL,
+                    generation INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_dir ON files(dir)")
+
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+        """Values that must match for a cached row to be reused."""
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def begin_scan(self) -> int:
+        """Start a scan and return its generation marker."""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(generation) FROM files").fetchone()
+            self._generation = max(self._generation, row[0] or 0) + 1
+            return self._generation
+
+    def lookup(self, path: str, st: os.stat_result, generation: int = 0) -> Optional[Dict]:
+        """
+        Get cached metadata for a file if it is unchanged.
+
+        Args:
+            path: Absolute file path
+            st: Current stat result of the file
+            generation: Scan marker to record the file as still present
+
+        Returns:
+            Metadata dict, or None if the file is new or modified
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, metadata FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            if not row or tuple(row[:3]) != self._signature(st):
+                return None
+            if generation:
+                self._conn.execute("UPDATE files SET generation = ? WHERE path = ?", (generation, path))
+        return json.loads(row[3])
+
+    def signatures(self, directory: str) -> Dict[str, Tuple[int, int, int]]:
+        """Size, mtime and inode recorded for each indexed file directly in directory."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, inode FROM files WHERE dir = ?",
+                (directory.rstrip(os.sep) or os.sep,)
+            ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def store(self, path: str, st: os.stat_result, metadata: Dict, generation: int = 0):
+        """Record freshly extracted metadata for a file."""
+        size, mtime_ns, inode = self._signature(st)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, inode, metadata, generation) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, os.path.dirname(path), size, mtime_ns, inode,
+                 json.dumps(metadata, default=str), generation)
+            )
+
+    def remove(self, paths: Iterable[str]):
+        """Drop rows for the given files."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in paths))
+
+    def finish_scan(self, directory: str, recursive: bool, generation: int,
+                    skipped: Iterable[str] = ()) -> int:
+        """
+        Drop rows under directory that were not seen by the given scan.
+
+        Args:
+            directory: Directory the scan started from
+            recursive: Whether the scan included subdirectories
+            generation: Marker of the scan
+            skipped: Directories the scan could not read; rows below them are kept
+
+        Returns:
+            Number of rows removed
+        """
+        directory = directory.rstrip(os.sep) or os.sep
+        with self._lock, self._conn:
+            for path in skipped:
+                self._conn.execute(
+                    "UPDATE files SET generation = ? WHERE path = ? OR (path >= ? AND path < ?)",
+                    (generation, path) + self._subtree(path)
+                )
+            if recursive:
+                cursor = self._conn.execute(
+                    "DELETE FROM files WHERE path >= ? AND path < ? AND generation != ?",
+                    self._subtree(directory) + (generation,)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM files WHERE dir = ? AND generation != ?",
+                    (directory, generation)
+                )
+            return cursor.rowcount
+
+    @staticmethod
+    def _subtree(directory: str) -> Tuple[str, str]:
+        """Path range of everything below a directory.
+
+        A range query instead of LIKE, so '%' and '_' in paths are literal.
+        """
+        directory = directory.rstrip(os.sep)
+        prefix = directory + os.sep
+        return prefix, directory + chr(ord(os.sep) + 1)
+
+    def commit(self):
+        """Flush pending writes."""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        """Commit and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+def open_library_index(db_path: Optional[os.PathLike] = None) -> Optional[LibraryIndex]:
+    """Open the library index, or return None if it is unavailable."""
+    try:
+        return LibraryIndex(db_path)
+    except (OSError, sqlite3.Error) as e:
+        rprint(f"[yellow]Warning: Library index disabled - {str(e)}[/yellow]")
+        return None
@@ -0,0 +1,333 @@
+"""Single-pass library scanner."""
+import os
+import re
+import fnmatch
+import pathlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+from rich import print as rprint
+
+from .image_info import get_image_size
+from .library_index import LibraryIndex
+from .tag_reader import read_metadata
+from .track import Track
+
+# Kinds of entries produced by a library walk
+AUDIO = 'audio'
+ARTWORK = 'artwork'
+FOLDER = 'folder'
+
+class FolderGroup(NamedTuple):
+    """Music files and artwork found directly inside one folder."""
+    path: str
+    music_files: List[Track]
+    artwork: List[Dict]
+
+class LibraryScanner:
+    """Walk a library once and report audio files, artwork and folders.
+    
+    Every directory is listed a single time. Audio files get their tags read
+    on a worker pool (reusing the library index when possible), image files
+    get their dimensions sniffed from the header, and a FolderGroup is
+    reported once a folder's entries are complete.
+    """
+    
+    SUPPORTED_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.ogg', '.opus', '.wma'}
+    IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+    
+    # Tag reads are latency-bound, so oversubscribe the cores like ThreadPoolExecutor does
+    DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+    
+    # Module-level function, so process pools can pickle it
+    _extract_metadata = staticmethod(read_metadata)
+    
+    def __init__(self, workers: Optional[int] = None, use_processes: bool = False,
+                 index: Optional[LibraryIndex] = None):
+        """
+        Initialize the scanner.
+        
+        Args:
+            workers: Number of parallel tag readers (None for DEFAULT_WORKERS, 1 to disable)
+            use_processes: Use a process pool instead of threads for CPU-bound local scans
+            index: Library index used to skip files that have not changed since the last scan
+        """
+        self.workers = self.DEFAULT_WORKERS if workers is None else max(1, workers)
+        self.use_processes = use_processes
+        self.index = index
+        self.audio_extensions = set(self.SUPPORTED_EXTENSIONS)
+        self.image_extensions = set(self.IMAGE_EXTENSIONS)
+        self.ignored_patterns = {'.*', 'Thumbs.db', 'desktop.ini', '.DS_Store'}
+        self._ignore_key = None
+        self._ignore_rule = None
+    
+    def scan(self, directory: Union[str, pathlib.Path], recursive: bool = False) -> Dict:
+        """
+        Scan a library in one pass.
+        
+        Args:
+            directory: Path to scan
+            recursive: Whether to scan subdirectories
+        
+        Returns:
+            Dict with music files (as Track records), artwork and per-folder groups
+        """
+        result = {
+            'music_files': [],
+            'artwork': [],
+            'folders': [],
+            'path': str(directory)
+        }
+        for kind, item in self.iter_scan(directory, recursive):
+            if kind == AUDIO:
+                result['music_files'].append(item)
+            elif kind == ARTWORK:
+                result['artwork'].append(item)
+            else:
+                result['folders'].append(item)
+        
+        rprint(f"[green]Found {len(result['music_files'])} music files and "
+               f"{len(result['artwork'])} artwork images[/green]")
+        return result
+    
+    def iter_scan(self, directory: Union[str, pathlib.Path], recursive: bool = False,
+                  tags: bool = True, artwork: bool = True) -> Iterator[Tuple[str, object]]:
+        """
+        Stream a library scan as entries are found.
+        
+        Args:
+            directory: Path to scan
+            recursive: Whether to scan subdirectories
+            tags: Read tags of audio files (without tags the tracks carry only their path)
+            artwork: Report image files with their dimensions
+        
+        Yields:
+            (AUDIO, Track), (ARTWORK, {'path', 'size'}) and, after the
+            entries of each non-empty folder, (FOLDER, FolderGroup)
+        """
+        try:
+            directory = pathlib.Path(directory).resolve()
+            if not directory.is_dir():
+                rprint(f"[red]Error: {directory} is not a directory[/red]")
+                return
+            
+            rprint(f"[cyan]Scanning directory: {directory}[/cyan]")
+            
+            index = self.index if tags else None
+            generation = index.begin_scan() if index else 0
+            failed = []
+            entries = self._scan_path(directory, recursive, artwork, failed)
+            if not tags:
+                results = ((kind, entry, None, {}, True) for kind, entry in entries)
+            else:
+                jobs = self._lookup_index(entries, generation)
+                if self.workers > 1:
+                    results = self._extract_parallel(jobs)
+                else:
+                    results = self._extract_serial(jobs)
+            
+            music_files, images = [], []
+            try:
+                for kind, entry, st, metadata, cached in results:
+                    if kind == FOLDER:
+                        if music_files or images:
+                            yield FOLDER, FolderGroup(entry, music_files, images)
+                            music_files, images = [], []
+                    
+                    elif kind == ARTWORK:
+                        size = self._get_image_size(entry.path)
+                        if size:
+                            image = {'path': entry.path, 'size': size}
+                            images.append(image)
+                            yield ARTWORK, image
+                    
+                    else:
+                        if index and not cached and st is not None:
+                            index.store(entry.path, st, metadata, generation)
+                        if not tags:
+                            file = Track(entry.path)
+                        elif metadata:
+                            file = Track.from_metadata(entry.path, metadata)
+                        else:
+                            continue
+                        music_files.append(file)
+                        yield AUDIO, file
+                
+                # Only a completed walk knows which files are gone, and only
+                # below the directories it could read
+                if index:
+                    index.finish_scan(str(directory), recursive, generation, skipped=failed)
+            finally:
+                if index:
+                    index.commit()
+        
+        except Exception as e:
+            rprint(f"[red]Error scanning directory: {str(e)}[/red]")
+    
+    def scan_file(self, path: Union[str, pathlib.Path]) -> Optional[Track]:
+        """
+        Read a single music file, reusing indexed metadata when it is unchanged.
+        
+        Returns:
+            Track, or None if the file is not a readable music file
+        """
+        path = pathlib.Path(path)
+        if not self.accepts(path.name):
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        
+        metadata = self.index.lookup(str(path), st) if self.index else None
+        if metadata is None:
+            metadata = self._extract_metadata(path)
+            if self.index:
+                self.index.store(str(path), st, metadata)
+                self.index.commit()
+        
+        if not metadata:
+            return None
+        return Track.from_metadata(str(path), metadata)
+    
+    def accepts(self, name: str) -> bool:
+        """Whether a file name is a supported, non-ignored music file."""
+        if self.is_ignored(name):
+            return False
+        return os.path.splitext(name)[1].lower() in self.audio_extensions
+    
+    def is_ignored(self, name: str) -> bool:
+        """Whether an entry name matches ignored_patterns."""
+        return self._ignored_matcher().match(name) is not None
+    
+    def walk(self, directory: Union[str, pathlib.Path], recursive: bool = False) -> Iterator[os.DirEntry]:
+        """Yield music file entries without reading their tags."""
+        for kind, entry in self._scan_path(pathlib.Path(directory), recursive, False):
+            if kind == AUDIO:
+                yield entry
+    
+    def _get_image_size(self, path: str) -> Optional[Tuple[int, int]]:
+        """Get image dimensions from the file header."""
+        return get_image_size(path)
+    
+    def _lookup_index(self, entries: Iterator[Tuple[str, object]], generation: int) -> Iterator:
+        """Pair each audio entry with its stat result and any still-valid cached metadata."""
+        for kind, entry in entries:
+            if kind != AUDIO or not self.index:
+                yield kind, entry, None, None
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            yield kind, entry, st, self.index.lookup(entry.path, st, generation)
+    
+    def _extract_serial(self, jobs: Iterator) -> Iterator:
+        """Read tags one file at a time."""
+        for kind, entry, st, cached in jobs:
+            if kind != AUDIO or cached is not None:
+                yield kind, entry, st, cached, True
+                continue
+            try:
+                yield kind, entry, st, self._extract_metadata(pathlib.Path(entry.path)), False
+            except Exception as e:
+                rprint(f"[yellow]Error reading {entry.name}: {str(e)}[/yellow]")
+    
+    def _extract_parallel(self, jobs: Iterator) -> Iterator:
+        """Read tags on a worker pool, yielding results in walk order.
+        
+        At most a few batches per worker are in flight, so memory stays
+        bounded while the walker keeps feeding the pool. Artwork and folder
+        entries travel through the same queue to keep their place.
+        """
+        window = self.workers * 4
+        with self._make_executor() as executor:
+            pending = deque()
+            for kind, entry, st, cached in jobs:
+                if kind != AUDIO or cached is not None:
+                    future = Future()
+                    future.set_result(cached)
+                else:
+                    future = executor.submit(self._extract_metadata, pathlib.Path(entry.path))
+                pending.append((kind, entry, st, future, kind != AUDIO or cached is not None))
+                if len(pending) >= window:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+    
+    def _collect(self, kind: str, entry: os.DirEntry, st, future: Future, cached: bool) -> tuple:
+        """Wait for one extraction, reporting failures instead of aborting the scan."""
+        try:
+            return kind, entry, st, future.result(), cached
+        except Exception as e:
+            rprint(f"[yellow]Error reading {entry.name}: {str(e)}[/yellow]")
+            return kind, entry, None, {}, cached
+    
+    def _make_executor(self) -> Executor:
+        """Create the worker pool for a scan."""
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tag-reader")
+    
+    def _ignored_matcher(self) -> Pattern:
+        """Compile ignored_patterns into a single regex matched against entry names."""
+        key = frozenset(self.ignored_patterns)
+        if key != self._ignore_key:
+            rule = '|'.join(fnmatch.translate(pattern) for pattern in sorted(key))
+            self._ignore_rule = re.compile(rule or r'(?!)')
+            self._ignore_key = key
+        return self._ignore_rule
+    
+    def _scan_path(self, path: pathlib.Path, recursive: bool, artwork: bool = True,
+                   failed: Optional[List[str]] = None) -> Iterator[Tuple[str, object]]:
+        """Yield (kind, entry) pairs from path.
+        
+        Walks iteratively with os.scandir so the cached DirEntry types are used
+        and deep trees never hit the recursion limit. Only the pending
+        directory stack is kept in memory. Each directory is followed by a
+        (FOLDER, path) marker once all of its files have been yielded.
+        Directories and entries that could not be read are appended to failed.
+        """
+        ignored = self._ignored_matcher().match
+        audio_extensions = self.audio_extensions
+        image_extensions = self.image_extensions if artwork else ()
+        pending = [str(path)]
+        visited = set()
+        
+        while pending:
+            current = pending.pop()
+            try:
+                # Guard against symlink loops
+                st = os.stat(current)
+                if (st.st_dev, st.st_ino) in visited:
+                    continue
+                visited.add((st.st_dev, st.st_ino))
+                
+                subdirs = []
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        # Skip hidden files and ignored patterns
+                        if ignored(entry.name):
+                            continue
+                        
+                        try:
+                            if entry.is_file():
+                                ext = os.path.splitext(entry.name)[1].lower()
+                                if ext in audio_extensions:
+                                    yield AUDIO, entry
+                                elif ext in image_extensions:
+                                    yield ARTWORK, entry
+                            elif recursive and entry.is_dir():
+                                subdirs.append(entry.path)
+                        except OSError:
+                            if failed is not None:
+                                failed.append(entry.path)
+                            continue
+                
+                yield FOLDER, current
+                # Reverse so subdirectories are visited in listing order
+                pending.extend(reversed(subdirs))
+            except Exception as e:
+                rprint(f"[yellow]Error accessing {current}: {str(e)}[/yellow]")
+                if failed is not None:
+                    failed.append(current)
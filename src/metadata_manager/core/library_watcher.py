@@ -0,0 +1,513 @@
+"""Live library watcher."""
+import os
+import sys
+import time
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from rich import print as rprint
+
+from .file_scanner import FileScanner
+from .track import Track
+
+# Directories are stat'ed every poll; file signatures only on the slower sweep
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_SWEEP_INTERVAL = 60.0
+
+class WatchEvent(NamedTuple):
+    """A change to a music file in the watched library."""
+    kind: str                        # 'added', 'modified', 'deleted' or 'moved'
+    path: str
+    file: Optional[Track] = None     # Fresh record for added, modified and moved files
+    src_path: Optional[str] = None   # Previous path of a moved file
+
+class InotifyBackend:
+    """Raw change events from Linux inotify."""
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self, scanner: FileScanner, directory: str, recursive: bool, emit: Callable):
+        """Open an inotify instance; prepare() adds the watches."""
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        self.scanner = scanner
+        self.directory = directory
+        self.recursive = recursive
+        self.emit = emit
+        self._watches = {}  # wd -> directory path
+    
+    def prepare(self):
+        """Watch the library tree."""
+        self.add_tree(self.directory)
+    
+    def add_tree(self, directory: str):
+        """Watch a directory, and its subdirectories when recursive."""
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), self.WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Cannot watch {current}")
+            self._watches[wd] = current
+            
+            if not self.recursive:
+                continue
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False) and not self.scanner.is_ignored(entry.name):
+                            pending.append(entry.path)
+            except OSError:
+                continue
+    
+    def remove_tree(self, directory: str):
+        """Stop watching a directory that moved away."""
+        prefix = directory + os.sep
+        for wd, path in list(self._watches.items()):
+            if path == directory or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+    
+    def run(self, stop: threading.Event):
+        """Read events until stop is set."""
+        while not stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._parse(data)
+    
+    def _parse(self, data: bytes):
+        """Translate a buffer of inotify events into raw watcher events."""
+        moved_from = {}
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            
+            if mask & self.IN_Q_OVERFLOW:
+                self.emit(('rescan', None, None))
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            
+            if mask & self.IN_ISDIR:
+                if self.scanner.is_ignored(name):
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and self.recursive:
+                    try:
+                        self.add_tree(path)
+                    except OSError as e:
+                        rprint(f"[yellow]Warning: {str(e)}[/yellow]")
+                    self.emit(('dir_added', path, None))
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self.remove_tree(path)
+                    self.emit(('dir_removed', path, None))
+            elif mask & self.IN_MOVED_FROM:
+                moved_from[cookie] = path
+            elif mask & self.IN_MOVED_TO:
+                src = moved_from.pop(cookie, None)
+                self.emit(('moved', path, src) if src else ('changed', path, None))
+            elif mask & self.IN_CLOSE_WRITE:
+                self.emit(('changed', path, None))
+            elif mask & self.IN_DELETE:
+                self.emit(('deleted', path, None))
+        
+        # Files moved out of the watched tree
+        for src in moved_from.values():
+            self.emit(('deleted', src, None))
+    
+    def close(self):
+        """Release the inotify descriptor."""
+        os.close(self._fd)
+
+class PollingBackend:
+    """Raw change events from periodic stat snapshots.
+    
+    Every poll stats only the known directories. A directory whose mtime
+    changed had entries added, removed or renamed, and just that directory
+    is listed again. Rewriting a file in place leaves its directory alone,
+    so file signatures are compared on a slower sweep. The first snapshot
+    takes signatures from the library index rows where it has them.
+    """
+    
+    def __init__(self, scanner: FileScanner, directory: str, recursive: bool, emit: Callable,
+                 interval: float = DEFAULT_POLL_INTERVAL, sweep_interval: float = DEFAULT_SWEEP_INTERVAL):
+        self.scanner = scanner
+        self.directory = directory
+        self.recursive = recursive
+        self.emit = emit
+        self.interval = interval
+        self.sweep_interval = sweep_interval
+        self._dirs = {}   # directory -> (dev, inode, mtime_ns)
+        self._files = {}  # directory -> {music file: (size, mtime_ns, inode)}
+    
+    def prepare(self):
+        """Take the first snapshot."""
+        self._add_tree(self.directory, baseline=True)
+    
+    def paths(self) -> set:
+        """Music files in the current snapshot."""
+        return set().union(*self._files.values())
+    
+    def run(self, stop: threading.Event):
+        """Poll until stop is set."""
+        next_sweep = time.monotonic() + self.sweep_interval
+        while not stop.wait(self.interval):
+            sweep = time.monotonic() >= next_sweep
+            if sweep:
+                next_sweep = time.monotonic() + self.sweep_interval
+            self.poll(sweep)
+            
+    def poll(self, sweep: bool = False):
+        """Compare the tree against the snapshot and emit the differences."""
+        added, modified, removed = {}, {}, {}
+        for directory in list(self._dirs):
+            if directory not in self._dirs:
+                continue  # Dropped along with its parent
+            try:
+                st = os.stat(directory)
+            except OSError:
+                self._drop_tree(directory, removed)
+                continue
+            
+            if (st.st_dev, st.st_ino, st.st_mtime_ns) != self._dirs[directory]:
+                self._relist(directory, added, modified, removed)
+            elif sweep:
+                for path, sig in self._files[directory].items():
+                    try:
+                        current = self._signature(os.stat(path))
+                    except OSError:
+                        continue  # Gone, the directory mtime reports it next poll
+                    if current != sig:
+                        self._files[directory][path] = modified[path] = current
+            
+        moved_by_sig = {sig: path for path, sig in removed.items() if sig[2]}
+        for path, sig in added.items():
+            src = moved_by_sig.pop(sig, None)
+            if src:
+                del removed[src]
+                self.emit(('moved', path, src))
+            else:
+                self.emit(('changed', path, None))
+        for path in modified:
+            self.emit(('changed', path, None))
+        for path in removed:
+            self.emit(('deleted', path, None))
+    
+    def _relist(self, directory: str, added: Dict, modified: Dict, removed: Dict):
+        """List a changed directory again and record what differs."""
+        listing = self._read_dir(directory)
+        if listing is None:
+            self._drop_tree(directory, removed)
+            return
+        st, files, subdirs = listing
+        previous = self._files[directory]
+        self._dirs[directory] = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        self._files[directory] = files
+        
+        for path, sig in previous.items():
+            if path not in files:
+                removed[path] = sig
+        for path, sig in files.items():
+            if path not in previous:
+                added[path] = sig
+            elif previous[path] != sig:
+                modified[path] = sig
+        
+        prefix = directory + os.sep
+        known = {d for d in self._dirs if d.startswith(prefix) and os.path.dirname(d) == directory}
+        for subdir in known.difference(subdirs):
+            self._drop_tree(subdir, removed)
+        for subdir in subdirs:
+            if subdir not in known:
+                self._add_tree(subdir, added)
+    
+    def _add_tree(self, directory: str, added: Optional[Dict] = None, baseline: bool = False):
+        """Snapshot a directory, and its subdirectories when recursive."""
+        index = self.scanner.index if baseline else None
+        seen = {sig[:2] for sig in self._dirs.values()}
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            listing = self._read_dir(current, index.signatures(current) if index else None)
+            if listing is None:
+                continue
+            st, files, subdirs = listing
+            if (st.st_dev, st.st_ino) in seen:
+                continue  # Symlink loop
+            seen.add((st.st_dev, st.st_ino))
+            self._dirs[current] = (st.st_dev, st.st_ino, st.st_mtime_ns)
+            self._files[current] = files
+            if added is not None:
+                added.update(files)
+            pending.extend(subdirs)
+    
+    def _drop_tree(self, directory: str, removed: Dict):
+        """Forget a directory that disappeared, reporting its files as removed."""
+        prefix = directory + os.sep
+        for known in [d for d in self._dirs if d == directory or d.startswith(prefix)]:
+            del self._dirs[known]
+            removed.update(self._files.pop(known))
+    
+    def _read_dir(self, directory: str, known: Optional[Dict] = None):
+        """
+        Stat and list one directory.
+        
+        Args:
+            directory: Directory to read
+            known: Signatures to trust instead of stat'ing the files again
+        
+        Returns:
+            (stat result, {music file: signature}, subdirectories), or None if unreadable
+        """
+        files, subdirs = {}, []
+        try:
+            st = os.stat(directory)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self.scanner.is_ignored(entry.name):
+                        continue
+                    try:
+                        if entry.is_file():
+                            if self.scanner.accepts(entry.name):
+                                sig = known.get(entry.path) if known else None
+                                files[entry.path] = sig or self._signature(entry.stat())
+                        elif self.recursive and entry.is_dir():
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return st, files, subdirs
+    
+    @staticmethod
+    def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+        """Size, mtime and inode, the values the library index compares."""
+        return st.st_size, st.st_mtime_ns, st.st_ino
+    
+    def close(self):
+        """Nothing to release."""
+        pass
+
+class LibraryWatcher:
+    """Watch a library folder and report changed music files.
+    
+    Uses inotify on Linux and falls back to polling elsewhere. Raw events are
+    debounced, then only the affected files are re-read through the scanner
+    (and therefore its library index). The callback runs on the watcher
+    thread with a list of WatchEvent; frontends marshal it to their UI thread.
+    """
+    
+    def __init__(self, scanner: FileScanner, directory, callback: Callable[[List[WatchEvent]], None],
+                 recursive: bool = False, debounce: float = 0.25, max_delay: float = 1.0,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        """
+        Initialize the watcher.
+        
+        Args:
+            scanner: Scanner used to read changed files
+            directory: Library folder to watch
+            callback: Receives batches of WatchEvent
+            recursive: Whether to watch subdirectories
+            debounce: Quiet period before a batch of changes is processed
+            max_delay: Longest a change may wait while events keep arriving
+            poll_interval: Seconds between directory checks when polling
+            use_inotify: Try inotify before falling back to polling
+        """
+        self.scanner = scanner
+        # Same paths as the scanner and library index, also below a symlinked library
+        self.directory = os.path.realpath(os.fspath(directory))
+        self.callback = callback
+        self.recursive = recursive
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode = None
+        
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        self._backend = None
+        self._known = set()
+        self._ready = threading.Event()
+    
+    def start(self):
+        """Start watching in background threads.
+        
+        Walking the tree can take a while on a large library, so it happens
+        on the watcher thread; changes made meanwhile are queued, not lost.
+        """
+        if self.use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._backend = InotifyBackend(self.scanner, self.directory, self.recursive, self._queue.put)
+                self.mode = 'inotify'
+            except OSError as e:
+                rprint(f"[yellow]Warning: inotify unavailable ({str(e)}), polling instead[/yellow]")
+        if self._backend is None:
+            self._backend = self._polling_backend()
+        
+        for target, name in ((self._watch, 'library-watch'), (self._dispatch_loop, 'library-events')):
+            thread = threading.Thread(target=target, args=(self._stop,), name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self):
+        """Stop watching; the watcher thread releases the backend."""
+        self._stop.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2)
+        self._threads = []
+    
+    def _polling_backend(self) -> PollingBackend:
+        """Create the polling fallback."""
+        self.mode = 'polling'
+        return PollingBackend(self.scanner, self.directory, self.recursive,
+                              self._queue.put, self.poll_interval)
+    
+    def _watch(self, stop: threading.Event):
+        """Take the initial snapshot, then run the backend until stop is set."""
+        backend = self._backend
+        try:
+            try:
+                backend.prepare()
+            except OSError as e:
+                rprint(f"[yellow]Warning: inotify unavailable ({str(e)}), polling instead[/yellow]")
+                backend.close()
+                backend = self._backend = self._polling_backend()
+                backend.prepare()
+            
+            if isinstance(backend, PollingBackend):
+                self._known = backend.paths()
+            else:
+                self._known = {entry.path for entry in self.scanner.walk(self.directory, self.recursive)}
+            self._ready.set()
+            backend.run(stop)
+        except Exception as e:
+            rprint(f"[yellow]Error watching {self.directory}: {str(e)}[/yellow]")
+        finally:
+            backend.close()
+    
+    def _dispatch_loop(self, stop: threading.Event):
+        """Collect raw events into debounced batches and report them."""
+        # Events are only resolved against a complete initial snapshot
+        while not self._ready.wait(0.5):
+            if stop.is_set():
+                return
+        
+        while not stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            
+            start = last = time.monotonic()
+            while True:
+                wait = min(last + self.debounce, start + self.max_delay) - time.monotonic()
+                if wait <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=wait))
+                    last = time.monotonic()
+                except queue.Empty:
+                    break
+            
+            try:
+                events = self._resolve(batch)
+                if events and not stop.is_set():
+                    self.callback(events)
+            except Exception as e:
+                rprint(f"[yellow]Error processing library changes: {str(e)}[/yellow]")
+    
+    def _coalesce(self, batch: List[Tuple]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Reduce raw events to one pending operation per path."""
+        pending = {}
+        for kind, path, src in batch:
+            if kind == 'rescan':
+                current = {entry.path for entry in self.scanner.walk(self.directory, self.recursive)}
+                for gone in self._known - current:
+                    pending[gone] = ('deleted', None)
+                for path in current - self._known:
+                    pending[path] = ('changed', None)
+            elif kind == 'dir_added':
+                for entry in self.scanner.walk(path, True):
+                    pending[entry.path] = ('changed', None)
+            elif kind == 'dir_removed':
+                prefix = path + os.sep
+                for known in self._known:
+                    if known.startswith(prefix):
+                        pending[known] = ('deleted', None)
+            elif kind == 'moved':
+                previous = pending.pop(src, None)
+                if previous and previous[0] == 'moved':
+                    src = previous[1]  # Chained renames keep the original source
+                pending[path] = ('moved', src)
+            elif kind == 'changed' and path in pending and pending[path][0] == 'moved':
+                continue  # Will be re-read as part of the move
+            else:
+                pending[path] = (kind, None)
+        return pending
+    
+    def _resolve(self, batch: List[Tuple]) -> List[WatchEvent]:
+        """Re-read affected files and build the events to report."""
+        events = []
+        removed = []
+        for path, (kind, src) in self._coalesce(batch).items():
+            if kind == 'deleted':
+                if path in self._known:
+                    self._known.discard(path)
+                    removed.append(path)
+                    events.append(WatchEvent('deleted', path))
+                continue
+            
+            file = self.scanner.scan_file(path)
+            if kind == 'moved' and src in self._known:
+                self._known.discard(src)
+                removed.append(src)
+                if file:
+                    self._known.add(path)
+                    events.append(WatchEvent('moved', path, file, src))
+                else:
+                    events.append(WatchEvent('deleted', src))
+            elif file:
+                events.append(WatchEvent('modified' if path in self._known else 'added', path, file))
+                self._known.add(path)
+        
+        if removed and self.scanner.index:
+            self.scanner.index.remove(removed)
+        return events
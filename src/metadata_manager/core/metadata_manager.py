@@ -1,5 +1,11 @@
 """Core metadata manager."""
-from typing import Dict, List, Optional
+import re
+import time
+import asyncio
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from rich import print as rprint
 from rich.prompt import Prompt, Confirm  # Añadir import de Prompt
 
@@ -11,12 +17,60 @@ from .providers.spotify_provider import SpotifyProvider
 from .providers.itunes_provider import ITunesProvider
 from .providers.deezer_provider import DeezerProvider
 
+from . import circuit_breaker, deadline
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .config import get_setting
 from .display import display_results_table  # Nuevo import desde el mismo directorio
+from .entity_cache import EntityCache
+from .singleflight import SingleFlight
+from .lazy_tracks import fill_details, track_count
+
+class ProviderResult(NamedTuple):
+    """One provider's answer to a search, as streamed by the iter_search methods."""
+    provider: str
+    matches: List[Dict]
+    # Seconds from the start of the search until this provider answered
+    elapsed: float
+    # Exception raised by the provider, TimeoutError if it did not answer in time
+    error: Optional[BaseException] = None
+
+def describe_error(result: ProviderResult) -> str:
+    """Message for a failed provider result."""
+    if isinstance(result.error, TimeoutError):
+        return f"{result.provider} {result.error}"
+    if isinstance(result.error, deadline.DeadlineExceeded):
+        return f"{result.provider} ran out of time ({result.error})"
+    if isinstance(result.error, CircuitOpenError):
+        return f"{result.provider} skipped ({result.error})"
+    return f"Error with {result.provider}: {str(result.error)}"
 
 class MetadataManager:
-    def __init__(self, enabled_providers: Optional[List[str]] = None):
+    # Upper bound on provider calls running at the same time
+    MAX_WORKERS = 16
+    # Calls per provider that may run at once, e.g. from overlapping searches
+    CALLS_PER_PROVIDER = 4
+    # Seconds to wait for each provider before its results are dropped
+    PROVIDER_TIMEOUT = 15.0
+    # Seconds a provider's answer to a query is reused; empty answers expire sooner
+    QUERY_TTL = 3600
+    NEGATIVE_QUERY_TTL = 300
+    QUERY_MEMO_SIZE = 4096
+    # Unattended searches: seconds to wait for a match scoring at least
+    # [search] min_score before giving up
+    RACE_DEADLINE = 5.0
+    MIN_SCORE = 0.85
+    
+    def __init__(self, enabled_providers: Optional[List[str]] = None,
+                 provider_timeout: Optional[float] = None):
         """Initialize with all providers."""
         self.providers = []
+        self.provider_timeout = self.PROVIDER_TIMEOUT if provider_timeout is None else provider_timeout
+        self._executor = None
+        self._query_hits = EntityCache(self.QUERY_MEMO_SIZE, float(get_setting('cache', 'query_ttl', self.QUERY_TTL)))
+        self._query_misses = EntityCache(self.QUERY_MEMO_SIZE,
+                                         float(get_setting('cache', 'negative_query_ttl', self.NEGATIVE_QUERY_TTL)))
+        self._query_flights = SingleFlight()
+        self._breakers: Dict[str, CircuitBreaker] = {}
         rprint("[cyan]Initializing metadata providers...[/cyan]")
         
         # Initialize all providers in order
@@ -70,32 +124,453 @@ class MetadataManager:
 
     def search_all(self, files: List[Dict], search_type: str = "album") -> Dict[str, List]:
         """Search across all providers."""
-        results = {}
         print(f"\nSearching with providers: {[p.name for p in self.providers]}")  # Debug
         
-        for provider in self.providers:
+        search = self._files_search(files, search_type)
+        return self._fan_out(search) if search else {}
+    
+    async def search_all_async(self, files: List[Dict], search_type: str = "album") -> Dict[str, List]:
+        """Search across all providers without blocking the event loop."""
+        search = self._files_search_async(files, search_type)
+        return await self._fan_out_async(search) if search else {}
+    
+    def iter_search(self, files: List[Dict], search_type: str = "album") -> Iterator[ProviderResult]:
+        """
+        Search across all providers, yielding each provider's results as they arrive.
+        
+        Args:
+            files: Files to find metadata for
+            search_type: "album" to search a group of files as one album
+        
+        Yields:
+            ProviderResult per provider, fastest first
+        """
+        search = self._files_search(files, search_type)
+        return self._iter_fan_out(search) if search else iter(())
+    
+    def aiter_search(self, files: List[Dict], search_type: str = "album") -> AsyncIterator[ProviderResult]:
+        """Async iterator over each provider's results as they arrive."""
+        return self._aiter_fan_out(self._files_search_async(files, search_type))
+    
+    def race_search(self, files: List[Dict], search_type: str = "album",
+                    min_score: Optional[float] = None, deadline: Optional[float] = None) -> Optional[Dict]:
+        """
+        Search across all providers for an unattended match.
+        
+        Returns as soon as a provider yields a match scoring at least
+        min_score. Weaker matches are never picked unattended, so once the
+        deadline passes without one there is no result. Provider calls that
+        have not started by then are cancelled.
+        
+        Args:
+            files: Files to search metadata for
+            search_type: "album" or "track"
+            min_score: Score needed to stop early, as a fraction of 1 (default [search] min_score)
+            deadline: Seconds to wait for such a match (default [search] race_deadline)
+        
+        Returns:
+            The best match scoring at least min_score, or None
+        """
+        search = self._files_search(files, search_type)
+        if search is None:
+            return None
+        threshold = self._race_threshold(min_score)
+        results = self._iter_fan_out(search, self._race_deadline(deadline))
+        best = None
+        try:
+            for result in results:
+                best = self._race_best(best, result)
+                if best and best.get('score', 0) >= threshold:
+                    return best
+        finally:
+            results.close()
+        return None
+    
+    async def race_search_async(self, files: List[Dict], search_type: str = "album",
+                                min_score: Optional[float] = None, deadline: Optional[float] = None) -> Optional[Dict]:
+        """Async counterpart of race_search(); outstanding provider calls are cancelled."""
+        search = self._files_search_async(files, search_type)
+        if search is None:
+            return None
+        threshold = self._race_threshold(min_score)
+        results = self._aiter_fan_out(search, self._race_deadline(deadline))
+        best = None
+        try:
+            async for result in results:
+                best = self._race_best(best, result)
+                if best and best.get('score', 0) >= threshold:
+                    return best
+        finally:
+            await results.aclose()
+        return None
+    
+    def _race_threshold(self, min_score: Optional[float]) -> float:
+        """Score a match needs to end a race, on the providers' 0-100 scale."""
+        if min_score is None:
+            min_score = float(get_setting('search', 'min_score', self.MIN_SCORE))
+        return min_score * 100
+    
+    def _race_deadline(self, deadline: Optional[float]) -> float:
+        """Seconds a race may take, never more than provider_timeout."""
+        if deadline is None:
+            deadline = float(get_setting('search', 'race_deadline', self.RACE_DEADLINE))
+        return min(deadline, self.provider_timeout)
+    
+    @staticmethod
+    def _race_best(best: Optional[Dict], result: ProviderResult) -> Optional[Dict]:
+        """Better of the best match so far and a provider's top match."""
+        if result.error is not None:
+            # Running out the deadline is how a race ends, not a failure
+            if not isinstance(result.error, (TimeoutError, deadline.DeadlineExceeded, CircuitOpenError)):
+                rprint(f"[yellow]{describe_error(result)}[/yellow]")
+            return best
+        for match in result.matches:
+            if best is None or match.get('score', 0) > best.get('score', 0):
+                best = match
+                best.setdefault('provider', result.provider)
+        return best
+    
+    def _files_search(self, files: List[Dict], search_type: str) -> Optional[Callable[[MetadataProvider], List[Dict]]]:
+        """Per-provider search for a set of files, or None if they give nothing to search for."""
+        if search_type == "album" and len(files) > 1:
+            album, artist = self._album_query(files)
+            if not (album and artist):
+                return None
+            return lambda provider: self._search_provider(provider, 'album', album, artist)
+        
+        queries = self._track_queries(files)
+        if not queries:
+            return None
+        
+        def search_tracks(provider: MetadataProvider) -> List[Dict]:
+            matches = []
+            for title, artist in queries:
+                matches.extend(self._search_provider(provider, 'track', title, artist))
+            return matches
+        
+        return search_tracks
+    
+    def _files_search_async(self, files: List[Dict], search_type: str):
+        """Async counterpart of _files_search()."""
+        if search_type == "album" and len(files) > 1:
+            album, artist = self._album_query(files)
+            if not (album and artist):
+                return None
+            return lambda provider: self._search_provider_async(provider, 'album', album, artist)
+        
+        queries = self._track_queries(files)
+        if not queries:
+            return None
+        
+        async def search_tracks(provider: MetadataProvider) -> List[Dict]:
+            found = await asyncio.gather(*(self._search_provider_async(provider, 'track', title, artist)
+                                           for title, artist in queries))
+            return [match for matches in found for match in matches or []]
+        
+        return search_tracks
+    
+    def search_album(self, album: str, artist: Optional[str] = None) -> Dict[str, List]:
+        """
+        Search an album on all providers at once.
+        
+        Args:
+            album: Album title
+            artist: Album artist
+        
+        Returns:
+            Dict mapping provider name to its matches
+        """
+        return self._fan_out(lambda provider: self._search_provider(provider, 'album', album, artist))
+    
+    async def search_album_async(self, album: str, artist: Optional[str] = None) -> Dict[str, List]:
+        """Search an album on all providers without blocking the event loop."""
+        return await self._fan_out_async(lambda provider: self._search_provider_async(provider, 'album', album, artist))
+    
+    def iter_search_album(self, album: str, artist: Optional[str] = None) -> Iterator[ProviderResult]:
+        """Search an album on all providers, yielding each provider's results as they arrive."""
+        return self._iter_fan_out(lambda provider: self._search_provider(provider, 'album', album, artist))
+    
+    def aiter_search_album(self, album: str, artist: Optional[str] = None) -> AsyncIterator[ProviderResult]:
+        """Async iterator over each provider's album results as they arrive."""
+        return self._aiter_fan_out(lambda provider: self._search_provider_async(provider, 'album', album, artist))
+    
+    def _search_provider(self, provider: MetadataProvider, kind: str, name: str,
+                         artist: Optional[str] = None) -> List[Dict]:
+        """
+        Search one provider, reusing its answer to an equivalent query.
+        
+        Equivalent queries already running, e.g. from another fan-out
+        worker, are joined instead of sent again.
+        
+        Args:
+            provider: Provider to ask
+            kind: 'track' or 'album'
+            name: Track or album title
+            artist: Artist name
+        
+        Returns:
+            The provider's matches, empty if it found none
+        """
+        key = self._query_key(name, artist)
+        cached = self._memo_get(provider, kind, key)
+        if cached is not None:
+            return cached
+        
+        def search() -> List[Dict]:
+            search_kind = provider.search_track if kind == 'track' else provider.search_album
+            started = self._start_call(provider)
             try:
-                print(f"\nTrying provider: {provider.name}")  # Debug
-                if search_type == "album" and len(files) > 1:
-                    album = files[0]['metadata'].get('album', [''])[0]
-                    artist = files[0]['metadata'].get('artist', [''])[0]
-                    if album and artist:
-                        matches = provider.search_album(album, artist)
-                        if matches:
-                            results[provider.name] = matches
+                matches = search_kind(name, artist) or []
+            except BaseException as e:
+                self._end_call(provider, started, e)
+                raise
+            self._end_call(provider, started)
+            self._memo_set(provider, kind, key, matches)
+            return matches
+        
+        return self._copy_matches(self._query_flights.do((provider.name, kind, key), search))
+    
+    async def _search_provider_async(self, provider: MetadataProvider, kind: str, name: str,
+                                     artist: Optional[str] = None) -> List[Dict]:
+        """Search one provider without blocking the event loop, reusing equivalent queries."""
+        key = self._query_key(name, artist)
+        cached = self._memo_get(provider, kind, key)
+        if cached is not None:
+            return cached
+        
+        async def search() -> List[Dict]:
+            search_kind = provider.search_track_async if kind == 'track' else provider.search_album_async
+            started = self._start_call(provider)
+            try:
+                matches = await search_kind(name, artist) or []
+            except BaseException as e:
+                self._end_call(provider, started, e)
+                raise
+            self._end_call(provider, started)
+            self._memo_set(provider, kind, key, matches)
+            return matches
+        
+        return self._copy_matches(await self._query_flights.do_async((provider.name, kind, key), search))
+    
+    def provider_status(self) -> Dict[str, str]:
+        """Circuit state of every provider, e.g. 'closed' or 'open, retry in 42s'."""
+        return {provider.name: self._breaker(provider).describe() for provider in self.providers}
+    
+    def _breaker(self, provider: MetadataProvider) -> CircuitBreaker:
+        """Circuit breaker of a provider, configured from [providers] in config.toml."""
+        breaker = self._breakers.get(provider.name)
+        if breaker is None:
+            breaker = self._breakers.setdefault(provider.name, CircuitBreaker(
+                failure_rate=float(get_setting('providers', 'circuit_failure_rate',
+                                               circuit_breaker.DEFAULT_FAILURE_RATE)),
+                slow_call=float(get_setting('providers', 'circuit_slow_call', circuit_breaker.DEFAULT_SLOW_CALL)),
+                window=int(get_setting('providers', 'circuit_window', circuit_breaker.DEFAULT_WINDOW)),
+                min_calls=int(get_setting('providers', 'circuit_min_calls', circuit_breaker.DEFAULT_MIN_CALLS)),
+                open_seconds=float(get_setting('providers', 'circuit_open_seconds',
+                                               circuit_breaker.DEFAULT_OPEN_SECONDS))
+            ))
+        return breaker
+    
+    def _start_call(self, provider: MetadataProvider) -> float:
+        """Check a provider's circuit before calling it.
+        
+        Raises:
+            CircuitOpenError: If the provider is failing and must not be called
+        """
+        breaker = self._breaker(provider)
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit {breaker.describe()}")
+        return time.monotonic()
+    
+    def _end_call(self, provider: MetadataProvider, started: float, error: Optional[BaseException] = None):
+        """Record the outcome of a provider call, reporting when its circuit opens.
+        
+        Only transport errors count as failures; a 4xx reply or a bug in the
+        provider's parsing means it answered. Calls cut short by the caller,
+        because the search ran out of time or was cancelled, say nothing
+        about the provider unless they had already taken longer than a slow
+        call.
+        """
+        breaker = self._breaker(provider)
+        elapsed = time.monotonic() - started
+        if isinstance(error, Exception) and not self._cut_short(error) and not provider.is_transport_error(error):
+            error = None
+        if error is not None and self._cut_short(error):
+            if elapsed < breaker.slow_call:
+                breaker.release()
+                return
+            error = None  # Counted as a slow call, not a failure
+        if breaker.record(error is None, elapsed, error):
+            reason = f": {str(breaker.last_error)}" if breaker.last_error else ""
+            rprint(f"[yellow]{provider.name} failing or slow, skipped for the next "
+                   f"{breaker.open_seconds:g}s{reason}[/yellow]")
+    
+    @staticmethod
+    def _cut_short(error: BaseException) -> bool:
+        """Whether a call ended because of the caller's budget or cancellation, not the provider."""
+        if isinstance(error, deadline.DeadlineExceeded) or not isinstance(error, Exception):
+            return True
+        # Request timeouts capped to the time left also end when the budget does
+        left = deadline.remaining()
+        return left is not None and left <= 0
+    
+    @staticmethod
+    def _query_key(name: str, artist: Optional[str] = None) -> str:
+        """Query normalized so case, spacing and punctuation differences match."""
+        def normalize(term: Optional[str]) -> str:
+            term = unicodedata.normalize('NFKC', term or '').casefold()
+            return ' '.join(re.sub(r'[^\w\s]', ' ', term).split())
+        return f"{normalize(name)}|{normalize(artist)}"
+    
+    def _memo_get(self, provider: MetadataProvider, kind: str, key: str) -> Optional[List[Dict]]:
+        """Remembered matches for a query, [] for a remembered miss, None if unknown."""
+        for memo in (self._query_hits, self._query_misses):
+            cached = memo.get(provider.name, kind, key)
+            if cached is not None:
+                return self._copy_matches(cached)
+        return None
+    
+    def _memo_set(self, provider: MetadataProvider, kind: str, key: str, matches: List[Dict]):
+        """Remember a provider's answer to a query."""
+        memo = self._query_hits if matches else self._query_misses
+        memo.set(provider.name, kind, key, self._copy_matches(matches))
+    
+    @staticmethod
+    def _copy_matches(matches: List[Dict]) -> List[Dict]:
+        """Copies of remembered matches, which callers are free to change."""
+        return [dict(match) for match in matches]
+    
+    @staticmethod
+    def _album_query(files: List[Dict]) -> Tuple[str, str]:
+        """Album and artist to search for a group of files."""
+        metadata = files[0]['metadata']
+        return metadata.get('album', [''])[0], metadata.get('artist', [''])[0]
+    
+    @staticmethod
+    def _track_queries(files: List[Dict]) -> List[Tuple[str, str]]:
+        """Title and artist of every file that has both."""
+        queries = []
+        for file in files:
+            metadata = file['metadata']
+            title = metadata.get('title', [''])[0]
+            artist = metadata.get('artist', [''])[0]
+            if title and artist:
+                queries.append((title, artist))
+        return queries
+    
+    def _fan_out(self, search: Callable[[MetadataProvider], List[Dict]]) -> Dict[str, List]:
+        """Run a search on every provider concurrently.
+        
+        Wall time is that of the slowest provider, capped at provider_timeout.
+        A provider that fails or times out is reported and left out of the
+        results, the others are unaffected. Results keep provider order.
+        """
+        return self._collect(self._iter_fan_out(search))
+    
+    async def _fan_out_async(self, search: Callable[[MetadataProvider], Awaitable[List[Dict]]]) -> Dict[str, List]:
+        """Run a search on every provider concurrently on the running event loop."""
+        return self._collect([result async for result in self._aiter_fan_out(search)])
+        
+    def _iter_fan_out(self, search: Callable[[MetadataProvider], List[Dict]],
+                      timeout: Optional[float] = None) -> Iterator[ProviderResult]:
+        """Run a search on every provider concurrently, yielding results as providers finish.
+        
+        Closing the iterator early cancels the calls that have not started.
+        """
+        if not self.providers:
+            return
+        
+        timeout = self.provider_timeout if timeout is None else timeout
+        executor = self._get_executor()
+        started = time.monotonic()
+        # Requests a provider makes, including retries and track lookups, stop at the timeout
+        with deadline.scope(timeout):
+            futures = {deadline.submit(executor, self._timed_search, search, provider, started): provider
+                       for provider in self.providers}
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                pending.discard(future)
+                yield future.result()
+        except FuturesTimeoutError:
+            for future in list(pending):
+                pending.discard(future)
+                if future.done():  # Finished just as time ran out
+                    yield future.result()
                 else:
-                    for file in files:
-                        metadata = file['metadata']
-                        title = metadata.get('title', [''])[0]
-                        artist = metadata.get('artist', [''])[0]
-                        if title and artist:
-                            matches = provider.search_track(title, artist)
-                            if matches:
-                                results.setdefault(provider.name, []).extend(matches)
+                    future.cancel()
+                    yield self._timeout_result(futures[future], started, timeout)
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    async def _aiter_fan_out(self, search, timeout: Optional[float] = None) -> AsyncIterator[ProviderResult]:
+        """Run a search on every provider on the running event loop, yielding results as they arrive.
+        
+        Closing the iterator early cancels the searches still running.
+        """
+        if search is None or not self.providers:
+            return
+        
+        timeout = self.provider_timeout if timeout is None else timeout
+        started = time.monotonic()
+        
+        async def run(provider: MetadataProvider) -> ProviderResult:
+            try:
+                with deadline.scope(timeout):
+                    matches = await asyncio.wait_for(search(provider), timeout)
+            except asyncio.TimeoutError:
+                return self._timeout_result(provider, started, timeout)
             except Exception as e:
-                print(f"Error with {provider.name}: {str(e)}")
+                return ProviderResult(provider.name, [], time.monotonic() - started, e)
+            return ProviderResult(provider.name, matches or [], time.monotonic() - started)
         
-        return results
+        tasks = [asyncio.ensure_future(run(provider)) for provider in self.providers]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _timed_search(search: Callable[[MetadataProvider], List[Dict]], provider: MetadataProvider,
+                      started: float) -> ProviderResult:
+        """Run one provider's search, capturing its outcome and latency."""
+        try:
+            matches = search(provider) or []
+        except Exception as e:
+            return ProviderResult(provider.name, [], time.monotonic() - started, e)
+        return ProviderResult(provider.name, matches, time.monotonic() - started)
+    
+    @staticmethod
+    def _timeout_result(provider: MetadataProvider, started: float, timeout: float) -> ProviderResult:
+        """Result for a provider that did not answer in time."""
+        return ProviderResult(provider.name, [], time.monotonic() - started,
+                              TimeoutError(f"timed out after {timeout:g}s"))
+    
+    def _collect(self, results: Iterable[ProviderResult]) -> Dict[str, List]:
+        """Matches by provider in provider order, reporting failures."""
+        found = {}
+        for result in results:
+            if isinstance(result.error, CircuitOpenError):
+                continue  # Reported once when the circuit opened
+            if result.error is not None:
+                rprint(f"[yellow]{describe_error(result)}[/yellow]")
+            elif result.matches:
+                found[result.provider] = result.matches
+        return {provider.name: found[provider.name] for provider in self.providers if provider.name in found}
+        
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Shared pool for provider calls.
+        
+        Kept for the manager's lifetime rather than per search, so a hung
+        provider never blocks the caller on pool shutdown.
+        """
+        if self._executor is None:
+            workers = max(1, min(self.MAX_WORKERS, self.CALLS_PER_PROVIDER * len(self.providers)))
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="provider")
+        return self._executor
     
     def _format_display_title(self, match: Dict) -> str:
         """Format title with year for display."""
@@ -123,12 +598,13 @@ class MetadataManager:
                             result['year'] = other['year']
                             break
 
-                # Try to get tracks from other results if missing
-                if not result.get('tracks'):
+                # Try to get tracks from other results if missing,
+                # without fetching lazy track lists just to compare
+                if track_count(result.get('tracks')) == 0:
                     for other in all_results:
                         if (other['title'].lower() == result['title'].lower() and
                             other['artist'].lower() == result['artist'].lower() and
-                            other.get('tracks')):
+                            track_count(other.get('tracks')) != 0):
                             result['tracks'] = other['tracks']
                             break
                 
@@ -156,6 +632,8 @@ class MetadataManager:
                     return None
                 elif 1 <= choice_num <= len(all_results):
                     match = all_results[choice_num - 1]
+                    if match.get('tracks'):
+                        fill_details(match)
                     
                     # Show detailed info
                     rprint("\n[bold]Selected match details:[/bold]")
@@ -174,15 +652,16 @@ class MetadataManager:
                 rprint("[yellow]Invalid choice, try again[/yellow]")
 
     def _normalize_query(self, query: str) -> List[Dict[str, str]]:
-        """Generate multiple query variations for better matching."""
+        """Generate query variations for better matching, most likely first."""
         query = query.strip()
+        # (rank, variation) pairs, lower ranks are tried first
         variations = []
         
         # Clean query first
         query = query.replace('_', ' ').strip()
         
         # Try the full query as both album and artist
-        variations.append({'title': query})
+        variations.append((1, {'title': query}))
         
         # Split by common separators and try different combinations
         separators = [' - ', ' – ', ' / ', ' : ', ' by ', '-', '–', '/', ':']
@@ -190,19 +669,11 @@ class MetadataManager:
             if separator in query:
                 parts = [p.strip() for p in query.split(separator, 1)]
                 if len(parts) == 2:
-                    # Both orders with original parts
+                    # Both orders, "Artist - Title" being the usual one
                     variations.extend([
-                        {'artist': parts[0], 'title': parts[1]},
-                        {'artist': parts[1], 'title': parts[0]}
+                        (0, {'artist': parts[0], 'title': parts[1]}),
+                        (2, {'artist': parts[1], 'title': parts[0]})
                     ])
-                    
-                    # Clean and normalize parts
-                    clean_parts = [self._clean_term(p) for p in parts]
-                    if clean_parts != parts:
-                        variations.extend([
-                            {'artist': clean_parts[0], 'title': clean_parts[1]},
-                            {'artist': clean_parts[1], 'title': clean_parts[0]}
-                        ])
                 break  # Stop after first matching separator
         
         # If no separator found, try smart splitting
@@ -212,22 +683,23 @@ class MetadataManager:
                 # Try first half as title, second half as artist and vice versa
                 mid = len(words) // 2
                 variations.extend([
-                    {
+                    (3, {
                         'title': ' '.join(words[:mid]),
                         'artist': ' '.join(words[mid:])
-                    },
-                    {
+                    }),
+                    (3, {
                         'artist': ' '.join(words[:mid]),
                         'title': ' '.join(words[mid:])
-                    }
+                    })
                 ])
         
-        # Remove duplicates while preserving order
+        # Remove variations that only differ in noise words, case or
+        # punctuation, keeping the most likely first
         seen = set()
         unique_variations = []
-        for var in variations:
-            key = f"{var.get('artist', '')}-{var.get('title', '')}"
-            if key not in seen:
+        for _, var in sorted(variations, key=lambda item: item[0]):
+            key = (self._clean_term(var.get('artist', '')), self._clean_term(var.get('title', '')))
+            if key[1] and key not in seen:
                 seen.add(key)
                 unique_variations.append(var)
         
@@ -249,43 +721,11 @@ class MetadataManager:
     def manual_search(self, query: str, files: List[Dict]) -> Optional[Dict]:
         """Perform manual search across all providers."""
         rprint(f"\n[cyan]Searching all sources for:[/cyan] {query}")
-        results = {}
         
         # Generate query variations
         variations = self._normalize_query(query)
         rprint("\n[dim]Trying different query variations...[/dim]")
-        
-        for provider in self.providers:
-            matches = []
-            try:
-                for variation in variations:
-                    if not matches:  # Only try next variation if no matches yet
-                        artist = variation.get('artist')
-                        title = variation.get('title')
-                        
-                        if len(files) > 1:
-                            # Album search
-                            if artist:
-                                matches = provider.search_album(title, artist)
-                            if not matches:
-                                matches = provider.search_album(title)
-                        else:
-                            # Track search with fallback to album
-                            if artist:
-                                matches = provider.search_track(title, artist)
-                                if not matches:
-                                    matches = provider.search_album(title, artist)
-                            if not matches:
-                                matches = provider.search_track(title)
-                                if not matches:
-                                    matches = provider.search_album(title)
-                        
-                        if matches:
-                            rprint(f"[green]Found matches using: {variation}[/green]")
-                            results[provider.name] = matches
-                            break
-            except Exception as e:
-                rprint(f"[red]Error with {provider.name}: {str(e)}[/red]")
+        results = self._search_variations(variations, album=len(files) > 1)
         
         if not results:
             rprint("[yellow]No matches found with any variation[/yellow]")
@@ -296,13 +736,92 @@ class MetadataManager:
         
         return self.select_metadata(results, files)
     
+    @staticmethod
+    def _variation_searches(variations: List[Dict[str, str]], album: bool) -> List[Tuple[str, str, Optional[str], Dict]]:
+        """Searches to try for query variations, in order, without equivalent repeats."""
+        searches = []
+        seen = set()
+        for variation in variations:
+            title = variation.get('title')
+            artist = variation.get('artist')
+            if album:
+                # Album search
+                kinds = [('album', artist)] if artist else []
+                kinds.append(('album', None))
+            else:
+                # Track search with fallback to album
+                kinds = [('track', artist), ('album', artist)] if artist else []
+                kinds.extend([('track', None), ('album', None)])
+            for kind, search_artist in kinds:
+                key = (kind, MetadataManager._query_key(title, search_artist))
+                if key not in seen:
+                    seen.add(key)
+                    searches.append((kind, title, search_artist, variation))
+        return searches
+    
+    def _search_variations(self, variations: List[Dict[str, str]], album: bool) -> Dict[str, List]:
+        """
+        Try query variations on all providers at once.
+        
+        Each provider works through the searches in ranked order, one at a
+        time, and stops at the first whose top match scores at least
+        [search] min_score. Less likely searches are never sent once a good
+        match is found.
+        
+        Args:
+            variations: Output of _normalize_query()
+            album: Search albums only, for a group of files
+        
+        Returns:
+            Dict mapping provider name to its matches
+        """
+        searches = self._variation_searches(variations, album)
+        if not searches:
+            return {}
+        threshold = self._race_threshold(None)
+        return self._collect(self._iter_fan_out(
+            lambda provider: self._search_provider_variations(provider, searches, threshold)))
+        
+    def _search_provider_variations(self, provider: MetadataProvider,
+                                    searches: List[Tuple[str, str, Optional[str], Dict]],
+                                    threshold: float) -> List[Dict]:
+        """
+        A provider's answer to query variations.
+        
+        Returns:
+            Matches of the first search clearing threshold, else of the
+            best-ranked search with any matches
+        """
+        fallback = None
+        for kind, title, artist, variation in searches:
+            try:
+                matches = self._search_provider(provider, kind, title, artist)
+            except (CircuitOpenError, deadline.DeadlineExceeded):
+                break  # Later searches would fail the same way
+            except Exception as e:
+                rprint(f"[red]Error with {provider.name}: {str(e)}[/red]")
+                continue
+            if not matches:
+                continue
+            if max(match.get('score', 0) for match in matches) >= threshold:
+                fallback = (variation, matches)
+                break
+            if fallback is None:
+                fallback = (variation, matches)
+        
+        if fallback is None:
+            return []
+        variation, matches = fallback
+        rprint(f"[green]Found matches using: {variation}[/green]")
+        return matches
+    
     def _sort_matches(self, matches: List[Dict], reference: Dict) -> List[Dict]:
         """Sort matches by similarity score."""
         # Simple Python fallback without Rust
         return sorted(matches, 
             key=lambda x: (
                 x.get('year', '') == reference.get('year', ''),
-                len(x.get('tracks', [])) > 0,
+                track_count(x.get('tracks')) != 0,
                 x.get('title', '').lower() == reference.get('title', '').lower()
             ), 
             reverse=True
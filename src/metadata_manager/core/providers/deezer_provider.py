@@ -1,15 +1,17 @@
-from typing import Dict, List
-import requests
+import functools
+from typing import Dict, List, Tuple
 from rich import print as rprint
 
 from .provider_base import MetadataProvider
+from ..entity_cache import get_entity_cache
+from ..http_client import get_json, get_json_async
+from ..lazy_tracks import LazyTracks
 from ...core.utils import string_similarity  # Añadir import correcto
 
 class DeezerProvider(MetadataProvider):
     """Deezer metadata provider using public API."""
     
     def __init__(self):
-        self.session = requests.Session()
         self.base_url = "https://api.deezer.com"
         rprint("[cyan]Deezer provider initialized[/cyan]")
     
@@ -19,97 +21,182 @@ class DeezerProvider(MetadataProvider):
     
     def search_track(self, title: str, artist: str = None) -> List[Dict]:
         try:
-            query = f"{artist} {title}" if artist else title
-            response = self.session.get(
-                f"{self.base_url}/search/track",
-                params={'q': query, 'limit': 5}
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = get_json(f"{self.base_url}/search/track",
+                            params=self._search_params(title, artist))
+            return self._rank([self._format_track(track, score) for track, score in self._match_tracks(data, title, artist)])
             
-            parsed = []
-            for track in data.get('data', []):
-                title_score = string_similarity(title, track.get('title', ''))
-                artist_score = string_similarity(artist, track['artist']['name']) if artist else 100
+        except Exception as e:
+            return self.search_failed(e, "Deezer track search error")
                 
-                if title_score > 60 and artist_score > 60:
-                    # Get highest quality artwork
-                    artwork_url = track['album'].get('cover_xl') or track['album'].get('cover_big')
-                    
-                    parsed.append(self.format_result({
-                        'title': track['title'],
-                        'artist': track['artist']['name'],
-                        'album': track['album']['title'],
-                        'year': str(track.get('album', {}).get('release_date', ''))[:4],  # Extraer año
-                        'tracks': self._get_album_tracks(track['album']['id']) if track.get('album') else [],  # Get tracks
-                        'score': (title_score + artist_score) / 2,
-                        'artwork_url': artwork_url,
-                        'deezer_id': track['id']
-                    }))
-            
-            return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
+    async def search_track_async(self, title: str, artist: str = None) -> List[Dict]:
+        try:
+            data = await get_json_async(f"{self.base_url}/search/track",
+                                        params=self._search_params(title, artist))
+            return self._rank([self._format_track(track, score) for track, score in self._match_tracks(data, title, artist)])
             
         except Exception as e:
-            rprint(f"[red]Deezer track search error: {str(e)}[/red]")
-            return []
+            return self.search_failed(e, "Deezer track search error")
     
     def search_album(self, album: str, artist: str = None) -> List[Dict]:
         try:
-            query = f"{artist} {album}" if artist else album
-            response = self.session.get(
-                f"{self.base_url}/search/album",
-                params={'q': query, 'limit': 5}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            parsed = []
-            for album_data in data.get('data', []):
-                album_score = string_similarity(album, album_data.get('title', ''))
-                artist_score = string_similarity(artist, album_data['artist']['name']) if artist else 100
+            data = get_json(f"{self.base_url}/search/album",
+                            params=self._search_params(album, artist))
+            matches = self._match_albums(data, album, artist)
+            details = self._album_details(matches[0][0]['id']) if matches else {}
+            return self._format_albums(matches, details)
                 
-                if album_score > 60 and artist_score > 60:
-                    # Get full album info to get release date and tracks
-                    album_info = self.session.get(f"{self.base_url}/album/{album_data['id']}").json()
-                    tracks = self._get_album_tracks(album_data['id'])
-                    release_date = album_info.get('release_date', '').split('-')[0]  # Get year
-                    
-                    # Get highest quality artwork
-                    artwork_url = album_data.get('cover_xl') or album_data.get('cover_big')
+        except Exception as e:
+            return self.search_failed(e, "Deezer album search error")
                     
-                    parsed.append(self.format_result({
-                        'title': album_data['title'],
-                        'artist': album_data['artist']['name'],
-                        'year': release_date,  # Use extracted year
-                        'tracks': tracks,
-                        'score': (album_score + artist_score) / 2,
-                        'artwork_url': artwork_url,
-                        'deezer_id': album_data['id']
-                    }, "album"))
-            
-            return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
+    async def search_album_async(self, album: str, artist: str = None) -> List[Dict]:
+        try:
+            data = await get_json_async(f"{self.base_url}/search/album",
+                                        params=self._search_params(album, artist))
+            matches = self._match_albums(data, album, artist)
+            details = await self._album_details_async(matches[0][0]['id']) if matches else {}
+            return self._format_albums(matches, details)
             
         except Exception as e:
-            rprint(f"[red]Deezer album search error: {str(e)}[/red]")
-            return []
+            return self.search_failed(e, "Deezer album search error")
+    
+    def _get_album(self, album_id: int) -> Dict:
+        """Release year and tracks of an album, fetched once per process."""
+        def fetch():
+            return self._parse_album(get_json(f"{self.base_url}/album/{album_id}"))
+        return get_entity_cache().get_or_fetch(self.name, 'album', album_id, fetch)
     
-    def _get_album_tracks(self, album_id: int) -> List[Dict]:
-        """Get tracks for an album."""
+    async def _get_album_async(self, album_id: int) -> Dict:
+        """Async counterpart of _get_album()."""
+        async def fetch():
+            return self._parse_album(await get_json_async(f"{self.base_url}/album/{album_id}"))
+        return await get_entity_cache().get_or_fetch_async(self.name, 'album', album_id, fetch)
+    
+    def _album_details(self, album_id: int) -> Dict:
+        """Album details for a search result, {} if they could not be fetched."""
         try:
-            response = self.session.get(f"{self.base_url}/album/{album_id}/tracks")
-            response.raise_for_status()
-            data = response.json()
-            
-            tracks = []
-            for i, track in enumerate(data.get('data', []), 1):
-                tracks.append({
-                    'title': track['title'],
-                    'position': str(i),
-                    'duration': str(track.get('duration', 0))
-                })
-            
-            return tracks
-            
+            return self._get_album(album_id)
+        except Exception as e:
+            rprint(f"[yellow]Error getting album details: {str(e)}[/yellow]")
+            return {}
+    
+    async def _album_details_async(self, album_id: int) -> Dict:
+        """Async counterpart of _album_details()."""
+        try:
+            return await self._get_album_async(album_id)
+        except Exception as e:
+            rprint(f"[yellow]Error getting album details: {str(e)}[/yellow]")
+            return {}
+    
+    def _parse_album(self, album_info: Dict) -> Dict:
+        """Release year and tracks from an album details response."""
+        return {
+            'year': album_info.get('release_date', '').split('-')[0],  # Get year
+            'tracks': self._parse_album_tracks(album_info.get('tracks', {}))
+        }
+    
+    def _get_album_tracks(self, album_id: int) -> Dict:
+        """Get tracks of an album together with its release year."""
+        if not album_id:
+            return {}
+        try:
+            return self._get_album(album_id)
         except Exception as e:
             rprint(f"[red]Error getting album tracks: {str(e)}[/red]")
-            return []
+            return {}
+    
+    @staticmethod
+    def _search_params(name: str, artist: str = None) -> Dict:
+        """Query parameters for a search endpoint."""
+        query = f"{artist} {name}" if artist else name
+        return {'q': query, 'limit': 5}
+    
+    @staticmethod
+    def _rank(parsed: List[Dict]) -> List[Dict]:
+        """Best matches first."""
+        return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
+    
+    def _match_tracks(self, data: Dict, title: str, artist: str = None) -> List[Tuple[Dict, float]]:
+        """Track search results close enough to the query, with their scores."""
+        matches = []
+        for track in data.get('data', []):
+            title_score = string_similarity(title, track.get('title', ''))
+            artist_score = string_similarity(artist, track['artist']['name']) if artist else 100
+            
+            if title_score > 60 and artist_score > 60:
+                matches.append((track, (title_score + artist_score) / 2))
+        return matches
+    
+    def _match_albums(self, data: Dict, album: str, artist: str = None) -> List[Tuple[Dict, float]]:
+        """Album search results close enough to the query, best first, with their scores."""
+        matches = []
+        for album_data in data.get('data', []):
+            album_score = string_similarity(album, album_data.get('title', ''))
+            artist_score = string_similarity(artist, album_data['artist']['name']) if artist else 100
+            
+            if album_score > 60 and artist_score > 60:
+                matches.append((album_data, (album_score + artist_score) / 2))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+    
+    def _format_track(self, track: Dict, score: float) -> Dict:
+        """Common result for a track match, with its album's tracks fetched on first use."""
+        # Get highest quality artwork
+        artwork_url = track['album'].get('cover_xl') or track['album'].get('cover_big')
+        
+        result = self.format_result({
+            'title': track['title'],
+            'artist': track['artist']['name'],
+            'album': track['album']['title'],
+            'year': str(track.get('album', {}).get('release_date', ''))[:4],  # Extraer año
+            'score': score,
+            'artwork_url': artwork_url,
+            'deezer_id': track['id']
+        })
+        result['tracks'] = LazyTracks(functools.partial(self._get_album_tracks, track.get('album', {}).get('id')))
+        return result
+    
+    def _format_albums(self, matches: List[Tuple[Dict, float]], details: Dict) -> List[Dict]:
+        """Common results for ranked album matches, with details for the best one only.
+        
+        Search results carry no release date, and the details request that
+        has it costs one round trip per album. Only the top match, the one
+        auto mode applies, gets its year and tracks up front.
+        """
+        return [self._format_album(album_data, score, details if i == 0 else {})
+                for i, (album_data, score) in enumerate(matches)]
+    
+    def _format_album(self, album_data: Dict, score: float, details: Dict) -> Dict:
+        """Common result for an album match.
+        
+        The year and track list come from the album details. Without
+        details the year is left empty and the tracks are fetched on first use.
+        """
+        # Get highest quality artwork
+        artwork_url = album_data.get('cover_xl') or album_data.get('cover_big')
+        
+        result = self.format_result({
+            'title': album_data['title'],
+            'artist': album_data['artist']['name'],
+            'year': details.get('year', ''),
+            'score': score,
+            'artwork_url': artwork_url,
+            'deezer_id': album_data['id']
+        }, "album")
+        if details:
+            result['tracks'] = details['tracks']
+        else:
+            result['tracks'] = LazyTracks(functools.partial(self._get_album_tracks, album_data['id']),
+                                          count=album_data.get('nb_tracks'))
+        return result
+    
+    @staticmethod
+    def _parse_album_tracks(data: Dict) -> List[Dict]:
+        """Track list from an album tracks response."""
+        tracks = []
+        for i, track in enumerate(data.get('data', []), 1):
+            tracks.append({
+                'title': track['title'],
+                'position': str(i),
+                'duration': str(track.get('duration', 0))
+            })
+        
+        return tracks
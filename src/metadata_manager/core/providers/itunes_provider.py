@@ -1,15 +1,17 @@
-from typing import Dict, List
-import requests
+import functools
+from typing import Dict, List, Tuple
 from rich import print as rprint
 
 from .provider_base import MetadataProvider
+from ..entity_cache import get_entity_cache
+from ..http_client import get_json, get_json_async
+from ..lazy_tracks import LazyTracks
 from ...core.utils import string_similarity  # Añadir import correcto
 
 class ITunesProvider(MetadataProvider):
     """iTunes/Apple Music metadata provider."""
     
     def __init__(self):
-        self.session = requests.Session()
         self.lookup_url = "https://itunes.apple.com/lookup"
         self.search_url = "https://itunes.apple.com/search"
         rprint("[cyan]iTunes provider initialized[/cyan]")
@@ -20,109 +22,136 @@ class ITunesProvider(MetadataProvider):
     
     def search_track(self, title: str, artist: str = None) -> List[Dict]:
         try:
-            query = f"{artist} {title}" if artist else title
-            params = {
-                'term': query,
-                'media': 'music',
-                'entity': 'song',
-                'limit': 5
-            }
+            data = get_json(self.search_url, params=self._search_params(title, artist, 'song'))
+            return self._parse_tracks(data, title, artist)
             
-            response = self.session.get(self.search_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = data.get('results', [])
-            
-            parsed = []
-            for result in results:
-                title_score = string_similarity(title, result.get('trackName', ''))
-                artist_score = string_similarity(artist, result.get('artistName', '')) if artist else 100
-                
-                if title_score > 60 and artist_score > 60:
-                    parsed.append(self.format_result({
-                        'title': result.get('trackName', ''),
-                        'artist': result.get('artistName', ''),
-                        'album': result.get('collectionName', ''),
-                        'year': str(result.get('releaseDate', ''))[:4],
-                        'tracks': [],
-                        'score': (title_score + artist_score) / 2,
-                        'artwork_url': result.get('artworkUrl100', '').replace('100x100', '600x600')
-                    }))
+        except Exception as e:
+            return self.search_failed(e, "iTunes error")
             
-            return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
+    async def search_track_async(self, title: str, artist: str = None) -> List[Dict]:
+        try:
+            data = await get_json_async(self.search_url, params=self._search_params(title, artist, 'song'))
+            return self._parse_tracks(data, title, artist)
         
         except Exception as e:
-            rprint(f"[red]iTunes error: {str(e)}[/red]")
-            return []
+            return self.search_failed(e, "iTunes error")
     
     def search_album(self, album: str, artist: str = None) -> List[Dict]:
         try:
             # First search for the album
-            query = f"{artist} {album}" if artist else album
-            params = {
-                'term': query,
-                'media': 'music',
-                'entity': 'album',
-                'limit': 5
-            }
-            
-            response = self.session.get(self.search_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            for album_data in data.get('results', []):
-                album_score = string_similarity(album, album_data.get('collectionName', ''))
-                artist_score = string_similarity(artist, album_data.get('artistName', '')) if artist else 100
-                
-                if album_score > 60 and artist_score > 60:
-                    # Get tracks for this album
-                    tracks = self._get_tracks_for_album(album_data.get('collectionId'))
+            data = get_json(self.search_url, params=self._search_params(album, artist, 'album'))
+            return self._parse_albums(data, album, artist)
                     
-                    if tracks:  # Only include albums with tracks
-                        results.append(self.format_result({
-                            'title': album_data.get('collectionName', ''),
-                            'artist': album_data.get('artistName', ''),
-                            'year': str(album_data.get('releaseDate', ''))[:4],
-                            'tracks': tracks,
-                            'score': (album_score + artist_score) / 2,
-                            'artwork_url': album_data.get('artworkUrl100', '').replace('100x100', '600x600')
-                        }, "album"))
+        except Exception as e:
+            return self.search_failed(e, "iTunes error")
             
-            return sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+    async def search_album_async(self, album: str, artist: str = None) -> List[Dict]:
+        try:
+            data = await get_json_async(self.search_url, params=self._search_params(album, artist, 'album'))
+            return self._parse_albums(data, album, artist)
             
         except Exception as e:
-            rprint(f"[red]iTunes error: {str(e)}[/red]")
-            return []
+            return self.search_failed(e, "iTunes error")
     
     def _get_tracks_for_album(self, album_id: str) -> List[Dict]:
-        """Get all tracks for a specific album ID."""
+        """Get all tracks for a specific album ID, fetched once per process."""
+        def fetch():
+            data = get_json(self.lookup_url, params=self._lookup_params(album_id))
+            return self._parse_album_tracks(data)
+        
         try:
-            # Lookup album tracks
-            params = {
-                'id': album_id,
-                'entity': 'song',
-                'limit': 200  # Get all tracks
-            }
-            
-            response = self.session.get(self.lookup_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            tracks = []
-            for track in data.get('results', [])[1:]:  # Skip first result (album)
-                if track.get('kind') == 'song':  # Ensure it's a song
-                    tracks.append({
-                        'title': track.get('trackName', ''),
-                        'position': str(track.get('trackNumber', '')),
-                        'duration': str(track.get('trackTimeMillis', '') // 1000)
-                    })
-            
-            # Sort tracks by position
-            tracks.sort(key=lambda x: int(x['position']) if x['position'].isdigit() else 999)
-            return tracks
+            return get_entity_cache().get_or_fetch(self.name, 'album', album_id, fetch)
             
         except Exception as e:
             rprint(f"[red]Error getting album tracks: {str(e)}[/red]")
             return []
+
+    
+    @staticmethod
+    def _search_params(name: str, artist: str, entity: str) -> Dict:
+        """Query parameters for a search request."""
+        query = f"{artist} {name}" if artist else name
+        return {
+            'term': query,
+            'media': 'music',
+            'entity': entity,
+            'limit': 5
+        }
+    
+    @staticmethod
+    def _lookup_params(album_id: str) -> Dict:
+        """Query parameters for an album track lookup."""
+        return {
+            'id': album_id,
+            'entity': 'song',
+            'limit': 200  # Get all tracks
+        }
+    
+    def _parse_tracks(self, data: Dict, title: str, artist: str = None) -> List[Dict]:
+        """Track results close enough to the query, best first."""
+        parsed = []
+        for result in data.get('results', []):
+            title_score = string_similarity(title, result.get('trackName', ''))
+            artist_score = string_similarity(artist, result.get('artistName', '')) if artist else 100
+            
+            if title_score > 60 and artist_score > 60:
+                parsed.append(self.format_result({
+                    'title': result.get('trackName', ''),
+                    'artist': result.get('artistName', ''),
+                    'album': result.get('collectionName', ''),
+                    'year': str(result.get('releaseDate', ''))[:4],
+                    'tracks': [],
+                    'score': (title_score + artist_score) / 2,
+                    'artwork_url': result.get('artworkUrl100', '').replace('100x100', '600x600')
+                }))
+        
+        return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
+    
+    def _parse_albums(self, data: Dict, album: str, artist: str = None) -> List[Dict]:
+        """Album results close enough to the query, best first."""
+        results = [
+            self._format_album(album_data, score)
+            for album_data, score in self._match_albums(data, album, artist)
+            if album_data.get('trackCount', 1) > 0  # Only include albums with tracks
+        ]
+        return sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+    
+    def _match_albums(self, data: Dict, album: str, artist: str = None) -> List[Tuple[Dict, float]]:
+        """Album results close enough to the query, with their scores."""
+        matches = []
+        for album_data in data.get('results', []):
+            album_score = string_similarity(album, album_data.get('collectionName', ''))
+            artist_score = string_similarity(artist, album_data.get('artistName', '')) if artist else 100
+            
+            if album_score > 60 and artist_score > 60:
+                matches.append((album_data, (album_score + artist_score) / 2))
+        return matches
+    
+    def _format_album(self, album_data: Dict, score: float) -> Dict:
+        """Common result for an album match, with its tracks looked up on first use."""
+        tracks = LazyTracks(functools.partial(self._get_tracks_for_album, album_data.get('collectionId')),
+                            count=album_data.get('trackCount'))
+        return self.format_result({
+            'title': album_data.get('collectionName', ''),
+            'artist': album_data.get('artistName', ''),
+            'year': str(album_data.get('releaseDate', ''))[:4],
+            'tracks': tracks,
+            'score': score,
+            'artwork_url': album_data.get('artworkUrl100', '').replace('100x100', '600x600')
+        }, "album")
+    
+    @staticmethod
+    def _parse_album_tracks(data: Dict) -> List[Dict]:
+        """Track list from an album lookup response."""
+        tracks = []
+        for track in data.get('results', [])[1:]:  # Skip first result (album)
+            if track.get('kind') == 'song':  # Ensure it's a song
+                tracks.append({
+                    'title': track.get('trackName', ''),
+                    'position': str(track.get('trackNumber', '')),
+                    'duration': str(track.get('trackTimeMillis', '') // 1000)
+                })
+        
+        # Sort tracks by position
+        tracks.sort(key=lambda x: int(x['position']) if x['position'].isdigit() else 999)
+        return tracks
@@ -1,14 +1,16 @@
 """MusicBrainz metadata provider."""
-import time
+import functools
 from typing import Dict, List, Optional
-import musicbrainzngs as mb
 from rich import print as rprint
-import socket
-from urllib.error import URLError
 
 from .provider_base import MetadataProvider
+from ..entity_cache import get_entity_cache
+from ..http_client import get_json, get_json_async
+from ..lazy_tracks import LazyTracks
 
 class MusicBrainzProvider(MetadataProvider):
+    """MusicBrainz metadata provider using the JSON web service (WS/2)."""
+    
     @property  # Añadir el decorador que faltaba
     def name(self) -> str:
         """Provider name."""
@@ -16,86 +18,86 @@ class MusicBrainzProvider(MetadataProvider):
 
     def __init__(self, app_name: str = "MetadataManager", version: str = "0.1.0"):
         """Initialize MusicBrainz client."""
-        mb.set_useragent(app_name, version)
-        # Configure shorter timeouts
-        socket.setdefaulttimeout(3)  # 3 segundos de timeout global
-        
-    def _retry_request(self, func, *args, max_retries=3, **kwargs):
-        """Ejecuta una request con reintentos."""
-        for attempt in range(max_retries):
-            try:
-                return func(*args, **kwargs)
-            except (URLError, socket.timeout) as e:
-                if attempt == max_retries - 1:
-                    raise
-                time.sleep(1)
-                continue
+        self.base_url = "https://musicbrainz.org/ws/2"
+        # MusicBrainz asks every application to identify itself
+        self.headers = {'User-Agent': f"{app_name}/{version}", 'Accept': 'application/json'}
     
     def search_track(self, title: str, artist: str = None) -> List[Dict]:
         """Search for a track."""
         try:
-            query = f'recording:"{title}"'
-            if artist:
-                query += f' AND artist:"{artist}"'
+            data = get_json(f"{self.base_url}/recording", params=self._search_params(
+                'recording', title, artist, limit=5  # Aumentado de 1 a 5
+            ), headers=self.headers)
+            return self._parse_track_results(data.get('recordings', []))
                 
-            result = self._retry_request(
-                mb.search_recordings,
-                query=query,
-                limit=5  # Aumentado de 1 a 5
-            )
+        except Exception as e:
+            return self.search_failed(e, "MusicBrainz search error")
             
-            if not result or 'recording-list' not in result:
-                return []
-                
-            return self._parse_track_results(result['recording-list'])
+    async def search_track_async(self, title: str, artist: str = None) -> List[Dict]:
+        """Search for a track without blocking the event loop."""
+        try:
+            data = await get_json_async(f"{self.base_url}/recording", params=self._search_params(
+                'recording', title, artist, limit=5
+            ), headers=self.headers)
+            return self._parse_track_results(data.get('recordings', []))
             
         except Exception as e:
-            rprint(f"[yellow]MusicBrainz search error: {str(e)}[/yellow]")
-            return []
+            return self.search_failed(e, "MusicBrainz search error")
 
     def search_album(self, album: str, artist: str = None) -> List[Dict]:
         """Search for an album."""
         try:
-            query = f'release:"{album}"'
-            if artist:
-                query += f' AND artist:"{artist}"'
-                
-            result = self._retry_request(
-                mb.search_releases,
-                query=query,
-                limit=5
-            )
-            
-            if not result or 'release-list' not in result:
-                return []
-                
-            return self._parse_album_results(result['release-list'])
+            data = get_json(f"{self.base_url}/release", params=self._search_params(
+                'release', album, artist, limit=5
+            ), headers=self.headers)
+            return self._parse_album_results(data.get('releases', []))
             
         except Exception as e:
-            rprint(f"[yellow]MusicBrainz search error: {str(e)}[/yellow]")
-            return []
+            return self.search_failed(e, "MusicBrainz search error")
+    
+    async def search_album_async(self, album: str, artist: str = None) -> List[Dict]:
+        """Search for an album without blocking the event loop."""
+        try:
+            data = await get_json_async(f"{self.base_url}/release", params=self._search_params(
+                'release', album, artist, limit=5
+            ), headers=self.headers)
+            return self._parse_album_results(data.get('releases', []))
+        
+        except Exception as e:
+            return self.search_failed(e, "MusicBrainz search error")
+    
+    @staticmethod
+    def _search_params(field: str, name: str, artist: str = None, limit: int = 5) -> Dict:
+        """Query parameters for a Lucene search on a name and, if given, its artist."""
+        def phrase(term: str) -> str:
+            return '"' + term.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        
+        query = f'{field}:{phrase(name)}'
+        if artist:
+            query += f' AND artist:{phrase(artist)}'
+        return {'query': query, 'limit': limit, 'fmt': 'json'}
 
     def _parse_track_results(self, tracks: List[Dict]) -> List[Dict]:
         """Parse track search results."""
         results = []
         for track in tracks:
             try:
-                artist = track['artist-credit'][0]['name'] if 'artist-credit' in track else ''
+                artist = track['artist-credit'][0]['name'] if track.get('artist-credit') else ''
                 
-                # Get release info and tracks
+                # Get release info, tracks are fetched on first use
                 album = None
                 year = ''
-                track_list = []
-                if track.get('release-list'):
-                    album = track['release-list'][0]
-                    # Try to get year and tracks
-                    for release in track['release-list']:
-                        if 'date' in release:
+                releases = track.get('releases', [])
+                if releases:
+                    album = releases[0]
+                    for release in releases:
+                        if release.get('date'):
                             year = release['date'][:4]
-                        if not track_list:  # Get tracks from first release that has them
-                            track_list = self._get_album_tracks(release.get('id', ''))
-                        if year and track_list:  # If we have both, stop looking
                             break
+                track_list = LazyTracks(
+                    functools.partial(self._get_first_release_tracks, [r.get('id', '') for r in releases]),
+                    count=self._release_track_count(album) if album else 0
+                )
                 
                 result = {
                     'title': track.get('title', ''),
@@ -103,7 +105,7 @@ class MusicBrainzProvider(MetadataProvider):
                     'album': album.get('title', '') if album else '',
                     'year': year,
                     'tracks': track_list,  # Add tracks here
-                    'score': float(track.get('ext:score', 0)),
+                    'score': float(track.get('score', 0)),
                     'id': track.get('id', ''),
                     'provider': 'musicbrainz'
                 }
@@ -118,11 +120,12 @@ class MusicBrainzProvider(MetadataProvider):
         results = []
         for album in albums:
             try:
-                artist = album['artist-credit'][0]['name'] if 'artist-credit' in album else ''
-                date = album.get('date', '')[:4] if 'date' in album else ''
-                score = float(album.get('ext:score', 0))
+                artist = album['artist-credit'][0]['name'] if album.get('artist-credit') else ''
+                date = (album.get('date') or '')[:4]
+                score = float(album.get('score', 0))
                 
-                tracks = self._get_album_tracks(album.get('id', ''))
+                tracks = LazyTracks(functools.partial(self._get_album_tracks, album.get('id', '')),
+                                    count=self._release_track_count(album))
                 
                 result = {
                     'title': album.get('title', ''),
@@ -140,39 +143,57 @@ class MusicBrainzProvider(MetadataProvider):
                 
         return results
     
+    @staticmethod
+    def _release_track_count(release: Dict) -> Optional[int]:
+        """Track count of a release from search results, if reported."""
+        try:
+            if 'track-count' in release:
+                return int(release['track-count'])
+            return sum(int(medium['track-count']) for medium in release['media'])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _get_first_release_tracks(self, release_ids: List[str]) -> List[Dict]:
+        """Get tracks from the first release that has them."""
+        for release_id in release_ids:
+            tracks = self._get_album_tracks(release_id)
+            if tracks:
+                return tracks
+        return []
+    
     def _get_album_tracks(self, album_id: str) -> List[Dict]:
-        """Get tracks for an album with rate limiting."""
+        """
+        Get tracks for a release, fetched once per process.
+        
+        Raises:
+            TRANSPORT_ERRORS: If the release could not be fetched, so no empty list is remembered
+        """
         if not album_id:
             return []
             
         try:
-            for attempt in range(3):  # 3 intentos
-                try:
-                    release = mb.get_release_by_id(album_id, includes=['recordings'])
-                    tracks = []
-                    
-                    if 'release' in release and 'medium-list' in release['release']:
-                        for medium in release['release']['medium-list']:
-                            if 'track-list' in medium:
-                                for track in medium['track-list']:
-                                    tracks.append({
-                                        'title': track['recording']['title'],
-                                        'position': track['position'],
-                                        'id': track['recording']['id']
-                                    })
-                    return tracks
-                    
-                except mb.NetworkError:
-                    if attempt < 2:  # Si no es el último intento
-                        time.sleep(1)  # Esperar 1 segundo antes de reintentar
-                        continue
-                    raise
-                except Exception as e:
-                    rprint(f"[yellow]Error fetching tracks: {str(e)}[/yellow]")
-                    return []
-            
-            return []  # Si todos los intentos fallan
-            
+            return get_entity_cache().get_or_fetch(
+                self.name, 'release', album_id,
+                functools.partial(self._fetch_release_tracks, album_id)
+            )
         except Exception as e:
+            if self.is_transport_error(e):
+                raise
             rprint(f"[yellow]Error fetching tracks: {str(e)}[/yellow]")
             return []
+
+    def _fetch_release_tracks(self, album_id: str) -> List[Dict]:
+        """Fetch tracks for a release with rate limiting."""
+        # Recordings are the only include needed for titles and IDs
+        release = get_json(f"{self.base_url}/release/{album_id}",
+                           params={'inc': 'recordings', 'fmt': 'json'}, headers=self.headers)
+        
+        tracks = []
+        for medium in release.get('media', []):
+            for track in medium.get('tracks', []):
+                tracks.append({
+                    'title': track['recording']['title'],
+                    'position': str(track['position']),
+                    'id': track['recording']['id']
+                })
+        return tracks
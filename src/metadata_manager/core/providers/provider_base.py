@@ -1,10 +1,17 @@
 """Base class for metadata providers."""
 from abc import ABC, abstractmethod
 from typing import Dict, List
+from rich import print as rprint
+
+from .. import deadline
+from ..http_client import TRANSPORT_ERRORS, is_transport_error
 
 class MetadataProvider(ABC):
     """Base class for metadata providers."""
     
+    # Exceptions that mean the provider itself is failing, besides 429 and 5xx replies
+    TRANSPORT_ERRORS = TRANSPORT_ERRORS
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -21,6 +28,35 @@ class MetadataProvider(ABC):
         """Search for an album."""
         pass
     
+    async def search_track_async(self, title: str, artist: str = None) -> List[Dict]:
+        """Search for a track without blocking the event loop.
+        
+        Providers with an async HTTP client override this; by default the
+        blocking search runs on the loop's executor, keeping the search's
+        time budget.
+        """
+        return await deadline.to_thread(self.search_track, title, artist)
+    
+    async def search_album_async(self, album: str, artist: str = None) -> List[Dict]:
+        """Search for an album without blocking the event loop."""
+        return await deadline.to_thread(self.search_album, album, artist)
+    
+    def is_transport_error(self, error: BaseException) -> bool:
+        """Whether an error means this provider is unreachable or failing."""
+        return is_transport_error(error, self.TRANSPORT_ERRORS)
+    
+    def search_failed(self, error: Exception, message: str) -> List[Dict]:
+        """Handle an exception raised while searching.
+        
+        Transport errors are re-raised, so MetadataManager can tell a failing
+        provider from one without matches and stop calling it. Anything else,
+        including 4xx replies, is reported and treated as no results.
+        """
+        if self.is_transport_error(error):
+            raise error
+        rprint(f"[yellow]{message}: {str(error)}[/yellow]")
+        return []
+    
     def format_result(self, data: Dict, type: str = "track") -> Dict:
         """Format provider-specific data to common format."""
         formatted = {
@@ -1,17 +1,31 @@
+import functools
 from typing import Dict, List
 import ytmusicapi
 from rich import print as rprint
 
 from .provider_base import MetadataProvider
+from .. import rate_limit, retry
+from ..entity_cache import get_entity_cache
+from ..http_client import get_session
+from ..lazy_tracks import LazyTracks
 from ...core.utils import string_similarity  # Añadir import faltante
 
+# Importaciones opcionales
+try:
+    from ytmusicapi.exceptions import YTMusicServerError
+    SERVER_ERRORS = (YTMusicServerError,)
+except ImportError:  # Older ytmusicapi raises plain exceptions
+    SERVER_ERRORS = ()
+
 class YouTubeMusicProvider(MetadataProvider):
     """YouTube Music metadata provider."""
     
+    TRANSPORT_ERRORS = MetadataProvider.TRANSPORT_ERRORS + SERVER_ERRORS
+    
     def __init__(self):
         """Initialize YouTube Music client."""
         try:
-            self.client = ytmusicapi.YTMusic()
+            self.client = ytmusicapi.YTMusic(requests_session=get_session())
             rprint("[cyan]YouTube Music provider initialized[/cyan]")
         except Exception as e:
             rprint(f"[yellow]Error initializing YouTube Music: {str(e)}[/yellow]")
@@ -21,6 +35,10 @@ class YouTubeMusicProvider(MetadataProvider):
     def name(self) -> str:
         return "youtube"
     
+    def _call(self, func, *args, **kwargs):
+        """Call the client under the shared rate limit and retry policy."""
+        return retry.call(self.name, functools.partial(rate_limit.call, self.name, func, *args, **kwargs))
+    
     def search_track(self, title: str, artist: str = None) -> List[Dict]:
         """Search for a track."""
         if not self.client:
@@ -28,7 +46,7 @@ class YouTubeMusicProvider(MetadataProvider):
             
         try:
             query = f"{artist} - {title}" if artist else title
-            results = self.client.search(query, filter="songs", limit=10)
+            results = self._call(self.client.search, query, filter="songs", limit=10)
             
             parsed = []
             for result in results:
@@ -38,37 +56,26 @@ class YouTubeMusicProvider(MetadataProvider):
                     title_score = string_similarity(title, result.get('title', ''))
                     artist_score = string_similarity(artist, artist_name) if artist else 100
                     
-                    # Get album info with tracks
-                    year = ''
-                    tracks = []
-                    if result.get('album', {}).get('id'):
-                        try:
-                            album_data = self.client.get_album(result['album']['id'])
-                            year = album_data.get('year', '')
-                            tracks = [{
-                                'title': t['title'],
-                                'position': str(i + 1)
-                            } for i, t in enumerate(album_data.get('tracks', []))]
-                        except:
-                            pass
-                    
                     if title_score > 60 and artist_score > 60:
-                        parsed.append(self.format_result({
+                        formatted = self.format_result({
                             'title': result.get('title', ''),
                             'artist': artist_name,
-                            'album': result.get('album', {}).get('name', ''),
-                            'year': year,
-                            'tracks': tracks,  # Include tracks here
+                            'album': (result.get('album') or {}).get('name', ''),
+                            'year': result.get('year') or '',
                             'score': min(100, ((title_score + artist_score) / 2)),
                             'provider': 'youtube',
                             'id': result.get('videoId')
-                        }))
+                        })
+                        # Album info with tracks and year, fetched on first use
+                        formatted['tracks'] = LazyTracks(functools.partial(
+                            self._get_album_tracks, (result.get('album') or {}).get('id')
+                        ))
+                        parsed.append(formatted)
             
             return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)[:5]
             
         except Exception as e:
-            rprint(f"[yellow]YouTube Music search error: {str(e)}[/yellow]")
-            return []
+            return self.search_failed(e, "YouTube Music search error")
     
     def search_album(self, album: str, artist: str = None) -> List[Dict]:
         """Search for an album."""
@@ -77,7 +84,7 @@ class YouTubeMusicProvider(MetadataProvider):
             
         try:
             query = f"{artist} {album}" if artist else album
-            results = self.client.search(query, filter="albums", limit=5)
+            results = self._call(self.client.search, query, filter="albums", limit=5)
             
             parsed = []
             for result in results:
@@ -85,39 +92,49 @@ class YouTubeMusicProvider(MetadataProvider):
                     # Get artist name
                     artist_name = result['artists'][0]['name'] if result.get('artists') else ''
                     
-                    # Get album tracks y año
-                    tracks = []
-                    year = ''
-                    try:
-                        album_id = result.get('browseId')
-                        if album_id:
-                            album_data = self.client.get_album(album_id)
-                            year = album_data.get('year', '')
-                            tracks = [{
-                                'title': track['title'],
-                                'position': str(i + 1),
-                                'duration': track.get('duration', ''),
-                                'id': track.get('videoId', '')
-                            } for i, track in enumerate(album_data.get('tracks', []))]
-                    except:
-                        pass
-                    
-                    parsed.append(self.format_result({
+                    formatted = self.format_result({
                         'title': result.get('title', ''),
                         'artist': artist_name,
-                        'year': year,
-                        'tracks': tracks,
+                        'year': result.get('year') or '',
                         'score': self._calculate_score(album, result.get('title', ''),
                                                      artist, artist_name),
                         'provider': 'youtube',
                         'id': result.get('browseId')
-                    }, "album"))
+                    }, "album")
+                    # Get album tracks y año on first use
+                    formatted['tracks'] = LazyTracks(functools.partial(
+                        self._get_album_tracks, result.get('browseId')
+                    ))
+                    parsed.append(formatted)
             
             return sorted(parsed, key=lambda x: x.get('score', 0), reverse=True)
             
         except Exception as e:
-            rprint(f"[yellow]YouTube Music search error: {str(e)}[/yellow]")
-            return []
+            return self.search_failed(e, "YouTube Music search error")
+    
+    def _get_album_tracks(self, album_id: str) -> Dict:
+        """Get tracks for an album result together with its year."""
+        if not album_id:
+            return {}
+        try:
+            return get_entity_cache().get_or_fetch(
+                self.name, 'album', album_id, functools.partial(self._fetch_album, album_id)
+            )
+        except Exception:
+            return {}
+    
+    def _fetch_album(self, album_id: str) -> Dict:
+        """Fetch year and tracks of an album."""
+        album_data = self._call(self.client.get_album, album_id)
+        return {
+            'year': album_data.get('year') or '',
+            'tracks': [{
+                'title': track['title'],
+                'position': str(i + 1),
+                'duration': track.get('duration', ''),
+                'id': track.get('videoId', '')
+            } for i, track in enumerate(album_data.get('tracks', []))]
+        }
     
     def _calculate_score(self, query_title: str, result_title: str,
                         query_artist: str = None, result_artist: str = None) -> float:
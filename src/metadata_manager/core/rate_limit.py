@@ -0,0 +1,139 @@
+"""Per-provider request rate limiting."""
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from . import deadline
+from .config import get_setting
+
+# Requests per second and burst size, overridable in config.toml as
+# <name>_rate_limit and <name>_burst under [providers]
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'musicbrainz': (1.0, 1),    # One request per second per client
+    'deezer': (10.0, 10),       # 50 requests per 5 seconds
+    'itunes': (0.33, 20),       # About 20 requests per minute
+    'spotify': (5.0, 5),
+    'youtube': (5.0, 5),
+    'lastfm': (5.0, 5),
+}
+
+# API hosts and the limiter their requests count against
+RATE_LIMIT_HOSTS = {
+    'musicbrainz.org': 'musicbrainz',
+    'api.deezer.com': 'deezer',
+    'itunes.apple.com': 'itunes',
+    'api.spotify.com': 'spotify',
+    'accounts.spotify.com': 'spotify',
+    'ws.audioscrobbler.com': 'lastfm',
+}
+
+class TokenBucket:
+    """Token bucket shared by threads and event loops.
+    
+    Callers reserve a token under a lock and then wait outside it, so
+    concurrent callers queue up at exactly the configured rate and nobody
+    holds the lock while sleeping. A caller whose wait would outlast its
+    search's budget takes no token, and one whose wait is cut short gives
+    its token back, so failed callers do not delay the ones after them.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second (0 or less disables limiting)
+            burst: Most tokens that can be saved up
+        """
+        self.rate = rate
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        Take a token and return how long to wait before using it.
+        
+        Raises:
+            DeadlineExceeded: Without taking a token, if the wait would outlast the search's budget
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            left = deadline.remaining()
+            if delay > 0 and left is not None and delay >= left:
+                raise deadline.DeadlineExceeded("search deadline exceeded")
+            self._tokens -= 1
+            return delay
+    
+    def _refund(self):
+        """Give back a token that was reserved but not used."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+    
+    def acquire(self):
+        """Block until a request may be sent, failing early if the search would run out of time."""
+        delay = self._reserve()
+        if delay > 0:
+            try:
+                deadline.sleep(delay)
+            except BaseException:
+                self._refund()
+                raise
+    
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            try:
+                await deadline.sleep_async(delay)
+            except BaseException:
+                # Also when the task is cancelled while waiting
+                self._refund()
+                raise
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str) -> TokenBucket:
+    """Process-wide limiter for a provider, configured from config.toml."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rate, burst = DEFAULT_RATE_LIMITS.get(name, (0.0, 1))
+            rate = float(get_setting('providers', f'{name}_rate_limit', rate))
+            burst = int(get_setting('providers', f'{name}_burst', burst))
+            limiter = _limiters[name] = TokenBucket(rate, burst)
+        return limiter
+
+def provider_for_url(url: str) -> Optional[str]:
+    """Name of the API a URL belongs to, if it is a known one."""
+    return RATE_LIMIT_HOSTS.get(urlsplit(url).hostname or '')
+
+def limiter_for_url(url: str) -> Optional[TokenBucket]:
+    """Limiter for the API a URL belongs to, if it has one."""
+    name = provider_for_url(url)
+    return get_limiter(name) if name else None
+
+def throttle(url: str):
+    """Block until a request to url may be sent."""
+    limiter = limiter_for_url(url)
+    if limiter:
+        limiter.acquire()
+
+async def throttle_async(url: str):
+    """Wait until a request to url may be sent."""
+    limiter = limiter_for_url(url)
+    if limiter:
+        await limiter.acquire_async()
+
+def call(name: str, func: Callable, *args, **kwargs):
+    """Call a client library function once the provider's limiter allows it."""
+    get_limiter(name).acquire()
+    return func(*args, **kwargs)
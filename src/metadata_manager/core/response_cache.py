@@ -0,0 +1,222 @@
+"""Persistent cache of provider API responses."""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from rich import print as rprint
+
+from .config import get_setting
+from .rate_limit import RATE_LIMIT_HOSTS, provider_for_url
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 50000
+
+def default_response_cache_path() -> Path:
+    """Location of the shared response cache."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(cache_home) / 'music-dlp' / 'responses.db'
+
+def cache_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """Key for a request, independent of parameter order and URL vs params placement."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(str(k), str(v)) for k, v in (params or {}).items() if v is not None]
+    normalized = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+    return hashlib.sha1(f"{method.upper()} {normalized}".encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """SQLite cache of response bodies keyed by method, URL and parameters.
+    
+    Entries expire after a per-provider TTL and the least recently used
+    ones are evicted once the cache grows past max_entries. The database
+    runs in WAL mode, so several processes can share one file. Lookups
+    read through a connection of their own thread without taking the
+    cache's lock, so they never queue behind a write. Access times of hits
+    are written in batches, together with the next insert.
+    """
+    
+    SCHEMA_VERSION = 1
+    # Inserts between checks of the size bound
+    EVICT_INTERVAL = 100
+    # Hits whose access times are kept before they are written anyway
+    TOUCH_BATCH = 100
+    
+    def __init__(self, db_path: Optional[os.PathLike] = None, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, ttls: Optional[Dict[str, float]] = None):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            db_path: SQLite file to use, defaults to default_response_cache_path()
+            ttl: Seconds a response stays valid
+            max_entries: Responses kept before the least recently used are evicted
+            ttls: TTL overrides by provider name
+        """
+        self.db_path = Path(db_path) if db_path else default_response_cache_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._inserts = 0
+        # Access times of hits not written yet, by key
+        self._touched: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(self.db_path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        # Read-only connection per thread, closed when its thread ends
+        self._local = threading.local()
+    
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's connection for lookups."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+        return conn
+    
+    def _create_schema(self):
+        """Create tables, discarding rows written by an older schema."""
+        with self._lock, self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS responses")
+                self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    expires REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+    
+    def ttl_for(self, url: str) -> float:
+        """TTL of responses from the provider a URL belongs to."""
+        return self.ttls.get(provider_for_url(url), self.ttl)
+    
+    def get(self, method: str, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """Cached response body, or None if missing or expired."""
+        key = cache_key(method, url, params)
+        now = time.time()
+        try:
+            row = self._reader().execute(
+                "SELECT body FROM responses WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            rprint(f"[yellow]Warning: Response cache read failed - {str(e)}[/yellow]")
+            return None
+        
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                try:
+                    with self._conn:
+                        self._flush_touched()
+                except sqlite3.Error as e:
+                    rprint(f"[yellow]Warning: Response cache write failed - {str(e)}[/yellow]")
+        return row[0]
+    
+    def set(self, method: str, url: str, params: Optional[Dict], body: str):
+        """Store a response body."""
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._flush_touched()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, host, body, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (cache_key(method, url, params), urlsplit(url).hostname or '', body, now + ttl, now)
+                )
+                self._inserts += 1
+                if self._inserts % self.EVICT_INTERVAL == 0:
+                    self._evict(now)
+        except sqlite3.Error as e:
+            rprint(f"[yellow]Warning: Response cache write failed - {str(e)}[/yellow]")
+    
+    def _flush_touched(self):
+        """Write pending access times; called with the lock held, inside a transaction."""
+        if self._touched:
+            self._conn.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+    
+    def _evict(self, now: float):
+        """Drop expired responses and the least recently used beyond max_entries."""
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters of this process, and the number of stored responses."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+    
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._touched.clear()
+    
+    def close(self):
+        """Write pending access times and close the database."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._flush_touched()
+            except sqlite3.Error as e:
+                rprint(f"[yellow]Warning: Response cache write failed - {str(e)}[/yellow]")
+            self._conn.close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Cache shared by all HTTP lookups, or None if disabled in config.toml."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            # False marks the cache as disabled, so setup is not retried
+            _response_cache = False
+            if not get_setting('cache', 'http_cache', True):
+                return None
+            ttls = {
+                name: float(get_setting('cache', f'{name}_http_ttl'))
+                for name in set(RATE_LIMIT_HOSTS.values())
+                if get_setting('cache', f'{name}_http_ttl') is not None
+            }
+            try:
+                _response_cache = ResponseCache(
+                    ttl=float(get_setting('cache', 'http_ttl', DEFAULT_TTL)),
+                    max_entries=int(get_setting('cache', 'http_max_entries', DEFAULT_MAX_ENTRIES)),
+                    ttls=ttls
+                )
+            except (OSError, sqlite3.Error) as e:
+                rprint(f"[yellow]Warning: Response cache disabled - {str(e)}[/yellow]")
+        return _response_cache or None
@@ -0,0 +1,181 @@
+"""Retry policy shared by all provider requests."""
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import requests
+
+from . import deadline
+from .config import get_setting
+
+# Importaciones opcionales
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_MAX_RETRY_TIME = 15.0
+
+# Statuses worth asking again for: rate limiting and temporary server trouble
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Failures to connect or get an answer in time
+TRANSIENT_ERRORS: Tuple[type, ...] = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+if HAS_HTTPX:
+    TRANSIENT_ERRORS += (httpx.TransportError,)
+
+class RetryPolicy:
+    """When and how long to wait before repeating a failed request.
+    
+    Delays grow exponentially with full jitter, so clients that failed
+    together do not retry in lockstep. A Retry-After header from the server
+    takes precedence. Retrying stops after max_attempts, once max_retry_time
+    has passed since the first attempt, or when the next wait would outlast
+    the current search's deadline; the last error is raised then.
+    """
+    
+    def __init__(self, max_attempts: int = DEFAULT_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, max_retry_time: float = DEFAULT_MAX_RETRY_TIME):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_attempts: Attempts in total, 1 disables retrying
+            base_delay: Upper bound of the first random delay, in seconds
+            max_delay: Upper bound of any computed delay, in seconds
+            max_retry_time: Seconds after the first attempt when no retry is started anymore
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_time = max_retry_time
+    
+    @staticmethod
+    def is_retryable(error: BaseException, retryable: Tuple[type, ...] = ()) -> bool:
+        """Whether an error is transient; HTTP errors are judged by their status."""
+        status = getattr(error, 'status', None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUSES
+        if isinstance(error, deadline.DeadlineExceeded):
+            return False
+        return isinstance(error, TRANSIENT_ERRORS + tuple(retryable))
+    
+    def delay(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number `attempt` (starting at 1)."""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+    
+    def _next_delay(self, attempt: int, error: BaseException, started: float,
+                    retryable: Tuple[type, ...]) -> Optional[float]:
+        """Wait before the next attempt, or None if the error should be raised."""
+        if attempt >= self.max_attempts or not self.is_retryable(error, retryable):
+            return None
+        delay = self.delay(attempt, error)
+        if time.monotonic() + delay - started > self.max_retry_time:
+            return None
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            return None
+        return delay
+    
+    def call(self, name: str, func: Callable[[], object], retryable: Tuple[type, ...] = ()):
+        """
+        Call func, retrying transient failures.
+        
+        Args:
+            name: Provider the request goes to, for the retry counters
+            func: Called without arguments for each attempt
+            retryable: Extra exception types to treat as transient
+        
+        Returns:
+            What func returned
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started, retryable)
+                if delay is None:
+                    raise
+            _count_retry(name)
+            time.sleep(delay)
+            attempt += 1
+    
+    async def call_async(self, name: str, func: Callable[[], Awaitable[object]],
+                         retryable: Tuple[type, ...] = ()):
+        """Async counterpart of call(); func returns a new awaitable for each attempt."""
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started, retryable)
+                if delay is None:
+                    raise
+            _count_retry(name)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by a Retry-After header on an HTTP error, if any."""
+    headers = getattr(error, 'headers', None) or {}
+    value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_policies: Dict[str, RetryPolicy] = {}
+_retries: Dict[str, int] = {}
+_lock = threading.Lock()
+
+def get_policy(name: str) -> RetryPolicy:
+    """Policy for a provider, configured from [providers] in config.toml.
+    
+    retry_attempts and retry_max_time apply to all providers and can be
+    overridden as <name>_retry_attempts and <name>_retry_max_time.
+    """
+    with _lock:
+        policy = _policies.get(name)
+        if policy is None:
+            attempts = get_setting('providers', 'retry_attempts', DEFAULT_ATTEMPTS)
+            max_time = get_setting('providers', 'retry_max_time', DEFAULT_MAX_RETRY_TIME)
+            policy = _policies[name] = RetryPolicy(
+                max_attempts=int(get_setting('providers', f'{name}_retry_attempts', attempts)),
+                max_retry_time=float(get_setting('providers', f'{name}_retry_max_time', max_time))
+            )
+        return policy
+
+def call(name: str, func: Callable[[], object], retryable: Tuple[type, ...] = ()):
+    """Call func under the provider's retry policy."""
+    return get_policy(name).call(name, func, retryable)
+
+async def call_async(name: str, func: Callable[[], Awaitable[object]], retryable: Tuple[type, ...] = ()):
+    """Await func() under the provider's retry policy."""
+    return await get_policy(name).call_async(name, func, retryable)
+
+def _count_retry(name: str):
+    with _lock:
+        _retries[name] = _retries.get(name, 0) + 1
+
+def retry_stats() -> Dict[str, int]:
+    """Retries made so far, by provider."""
+    with _lock:
+        return dict(_retries)
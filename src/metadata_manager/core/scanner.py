@@ -4,6 +4,9 @@ import pathlib
 from typing import Dict, List, Optional, Union
 from rich import print as rprint
 
+from .image_info import get_image_size
+from .library_scanner import ARTWORK, AUDIO, LibraryScanner
+
 # Importaciones opcionales
 try:
     from PIL import Image
@@ -19,14 +22,13 @@ except ImportError:
     HAS_FUZZY = False
     rprint("[yellow]Warning: Enhanced string matching disabled. Install fuzzywuzzy for better results.[/yellow]")
 
-class MusicScanner:
+class MusicScanner(LibraryScanner):
     """Music file scanning and matching."""
     
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
         """Initialize scanner."""
-        self.supported_extensions = {'.mp3', '.flac', '.m4a', '.ogg', '.opus'}
-        self.image_extensions = {'.jpg', '.jpeg', '.png'} if HAS_PIL else set()
-        self.ignored_patterns = {'.*', 'Thumbs.db', 'desktop.ini', '.DS_Store'}
+        super().__init__(*args, **kwargs)
+        self.supported_extensions = self.audio_extensions
     
     def scan_directory(self, directory: Union[str, pathlib.Path], recursive: bool = False) -> Dict:
         """
@@ -45,43 +47,34 @@ class MusicScanner:
             
         result = {
             'music_files': [],
-            'artwork': [] if HAS_PIL else None,
+            'artwork': [],
             'path': str(directory)
         }
         
-        for entry in directory.iterdir():
-            # Skip ignored files
-            if any(entry.match(pattern) for pattern in self.ignored_patterns):
-                continue
-                
-            if entry.is_file():
-                ext = entry.suffix.lower()
-                if ext in self.supported_extensions:
-                    result['music_files'].append(str(entry))
-                elif HAS_PIL and ext in self.image_extensions:
-                    try:
-                        with Image.open(entry) as img:
-                            result['artwork'].append({
-                                'path': str(entry),
-                                'size': img.size
-                            })
-                    except Exception as e:
-                        rprint(f"[yellow]Error reading image {entry}: {e}[/yellow]")
-            
-            elif recursive and entry.is_dir():
-                try:
-                    subdir_result = self.scan_directory(entry, recursive=True)
-                    result['music_files'].extend(subdir_result['music_files'])
-                    if HAS_PIL and subdir_result['artwork']:
-                        result['artwork'].extend(subdir_result['artwork'])
-                except Exception as e:
-                    rprint(f"[yellow]Error scanning subdirectory {entry}: {e}[/yellow]")
+        # Paths only, so no tags are read
+        for kind, item in self.iter_scan(directory, recursive, tags=False):
+            if kind == AUDIO:
+                result['music_files'].append(item['path'])
+            elif kind == ARTWORK:
+                result['artwork'].append(item)
         
         return result
     
+    def _get_image_size(self, path: str) -> Optional[tuple]:
+        """Get image dimensions from the file header, decoding with PIL only as a fallback."""
+        size = get_image_size(path)
+        if size or not HAS_PIL:
+            return size
+        try:
+            with Image.open(path) as img:
+                return img.size
+        except Exception as e:
+            rprint(f"[yellow]Error reading image {path}: {e}[/yellow]")
+            return None
+    
     def find_best_artwork(self, artwork_list: List[Dict]) -> Optional[str]:
         """Find the best artwork file from a list based on common naming and size."""
-        if not HAS_PIL or not artwork_list:
+        if not artwork_list:
             return None
             
         # Score each artwork file
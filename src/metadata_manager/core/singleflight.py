@@ -0,0 +1,117 @@
+"""Coalescing of identical concurrent calls."""
+import asyncio
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from . import deadline
+from .deadline import DeadlineExceeded
+
+class _Call:
+    """A call in progress and its outcome."""
+    
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Runs a call once for all callers asking for the same key at the same time.
+    
+    The first caller for a key does the work; callers that arrive while it
+    is running wait for it and get the same result or exception. Nothing is
+    kept once the call finishes, so this complements caches rather than
+    replacing them.
+    
+    Waiting callers keep their own deadline. If the running call fails
+    because the first caller's budget ran out, a waiter with time left
+    makes the call again instead of sharing that failure.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+    
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Call func, or wait for the running call with the same key.
+        
+        Args:
+            key: Identity of the call
+            func: Called without arguments by the first caller
+        
+        Returns:
+            The shared result
+        
+        Raises:
+            DeadlineExceeded: If the caller's budget ends while it waits
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+            
+            if not call.done.wait(deadline.remaining()):
+                raise DeadlineExceeded("search deadline exceeded")
+            if isinstance(call.error, DeadlineExceeded) and not self._out_of_time():
+                continue  # Only the leader ran out of time
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await func(), or the running call with the same key on this event loop.
+        
+        The call runs as its own task, so a caller that gives up (e.g. on a
+        timeout) does not cancel it for the others. Deadlines work as in do().
+        """
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one loop
+        flight_key = (id(loop), key)
+        while True:
+            task = self._tasks.get(flight_key)
+            leader = task is None or task.done()
+            if leader:
+                task = loop.create_task(func())
+                self._tasks[flight_key] = task
+                task.add_done_callback(functools.partial(self._finish, flight_key))
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded("search deadline exceeded") from None
+            except DeadlineExceeded:
+                if leader or self._out_of_time():
+                    raise
+                continue  # Only the leader ran out of time
+    
+    @staticmethod
+    def _out_of_time() -> bool:
+        """Whether the caller's own budget is spent."""
+        left = deadline.remaining()
+        return left is not None and left <= 0
+    
+    def _finish(self, flight_key: Hashable, task: asyncio.Task):
+        """Forget a finished task."""
+        if self._tasks.get(flight_key) is task:
+            self._tasks.pop(flight_key)
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved in case every caller gave up
@@ -0,0 +1,149 @@
+"""Audio tag reading."""
+import os
+import pathlib
+from typing import Dict, Optional
+from rich import print as rprint
+import mutagen
+from mutagen.id3 import ID3
+from mutagen.mp3 import MP3
+from mutagen.mp4 import MP4
+from mutagen.asf import ASF
+from mutagen.oggvorbis import OggVorbis
+from mutagen.oggopus import OggOpus
+from mutagen.flac import StreamInfo, VCFLACDict
+
+# Tag names per format, built once rather than for every file
+ID3_TAG_MAPPING = {
+    'title': ['TIT2'],
+    'artist': ['TPE1', 'TPE2'],
+    'album': ['TALB'],
+    'date': ['TDRC', 'TYER'],
+    'track': ['TRCK'],
+    'genre': ['TCON'],
+    'album_artist': ['TPE2'],
+}
+
+VORBIS_TAG_MAPPING = {
+    'title': ['title'],
+    'artist': ['artist'],
+    'album': ['album'],
+    'date': ['date', 'year'],
+    'track': ['tracknumber'],
+    'genre': ['genre'],
+    'album_artist': ['albumartist'],
+}
+
+# Format class per extension, so mutagen.File does not probe every format
+FORMAT_BY_EXTENSION = {
+    '.mp3': MP3,
+    '.m4a': MP4,
+    '.ogg': OggVorbis,
+    '.opus': OggOpus,
+    '.wma': ASF,
+}
+
+class FLACHeader:
+    """Vorbis comments and stream info read straight from FLAC metadata blocks."""
+    
+    __slots__ = ('tags', 'info')
+    
+    STREAMINFO = 0
+    VORBIS_COMMENT = 4
+    
+    def __init__(self, tags: Optional[VCFLACDict], info: StreamInfo):
+        self.tags = tags
+        self.info = info
+    
+    @classmethod
+    def read(cls, file_path: pathlib.Path) -> Optional['FLACHeader']:
+        """
+        Parse only the blocks needed for scanning.
+        
+        Embedded pictures, seek tables and padding are skipped with a seek,
+        so the bytes read stay small even for files with large cover art.
+        
+        Returns:
+            FLACHeader, or None if the file needs the full mutagen parser
+        """
+        with open(file_path, 'rb') as f:
+            if f.read(4) != b'fLaC':
+                return None  # e.g. ID3-prefixed FLAC
+            
+            info = tags = None
+            while True:
+                header = f.read(4)
+                if len(header) != 4:
+                    return None
+                code = header[0] & 0x7F
+                size = int.from_bytes(header[1:], 'big')
+                
+                if code == cls.STREAMINFO:
+                    info = StreamInfo(f.read(size))
+                elif code == cls.VORBIS_COMMENT and tags is None:
+                    tags = VCFLACDict(f.read(size))
+                else:
+                    f.seek(size, os.SEEK_CUR)
+                
+                if header[0] & 0x80:  # Last metadata block
+                    break
+            
+            if info is None:
+                return None
+            
+            # Same estimate mutagen uses: audio bytes over duration
+            audio_size = os.fstat(f.fileno()).st_size - f.tell()
+            info.bitrate = int(audio_size * 8 / info.length) if info.length else 0
+            return cls(tags, info)
+
+def read_metadata(file_path: pathlib.Path) -> Dict:
+    """Extract metadata from a music file."""
+    try:
+        audio = open_audio(file_path)
+        if not audio:
+            return {}
+        
+        # Extract basic metadata
+        metadata = {}
+        
+        # Handle different tag formats
+        if isinstance(audio.tags, ID3):
+            # ID3 tags (MP3)
+            for key, tag_names in ID3_TAG_MAPPING.items():
+                for tag in tag_names:
+                    if tag in audio.tags:
+                        metadata[key] = [str(value) for value in audio.tags[tag].text]
+                        break
+        
+        elif hasattr(audio, 'tags') and audio.tags:
+            # Common tag format (FLAC, OGG, etc.)
+            for key, tag_names in VORBIS_TAG_MAPPING.items():
+                for tag in tag_names:
+                    if tag in audio.tags:
+                        metadata[key] = [str(value) for value in audio.tags[tag]]
+                        break
+        
+        # Add file info
+        metadata['duration'] = str(int(audio.info.length)) if hasattr(audio.info, 'length') else '0'
+        metadata['bitrate'] = str(getattr(audio.info, 'bitrate', 0))
+        metadata['sample_rate'] = str(getattr(audio.info, 'sample_rate', 0))
+        
+        return metadata
+    
+    except Exception as e:
+        rprint(f"[yellow]Error extracting metadata from {file_path.name}: {str(e)}[/yellow]")
+        return {}
+
+def open_audio(file_path: pathlib.Path):
+    """Load tags with the reader chosen by extension, probing only as a fallback."""
+    ext = file_path.suffix.lower()
+    try:
+        if ext == '.flac':
+            header = FLACHeader.read(file_path)
+            if header:
+                return header
+        elif ext in FORMAT_BY_EXTENSION:
+            return FORMAT_BY_EXTENSION[ext](file_path)
+    except (mutagen.MutagenError, ValueError, EOFError):
+        pass  # Mislabelled or unusual file, let mutagen probe it
+    
+    return mutagen.File(file_path)
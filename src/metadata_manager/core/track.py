@@ -0,0 +1,132 @@
+"""Compact records for scanned music files."""
+import os
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple, Union
+
+# Text tags, in slot order
+TAG_FIELDS = ('title', 'artist', 'album', 'date', 'track', 'genre', 'album_artist')
+# Tags repeated across many tracks, so every track shares one string object
+INTERNED_FIELDS = frozenset({'artist', 'album', 'date', 'genre', 'album_artist'})
+# Stream properties, stored as ints
+NUMERIC_FIELDS = ('duration', 'bitrate', 'sample_rate')
+
+# One string for the usual single value, a tuple for multi-valued tags
+TagValue = Union[None, str, Tuple[str, ...]]
+
+def _pack(values: List, intern: bool) -> TagValue:
+    """Store a list of tag values in the smallest form."""
+    if not values:
+        return None
+    values = [sys.intern(str(value)) if intern else str(value) for value in values]
+    return values[0] if len(values) == 1 else tuple(values)
+
+def _to_int(value) -> int:
+    """Parse a numeric stream property, treating junk as 0."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+class Track(Mapping):
+    """Immutable record of a scanned music file.
+    
+    Uses __slots__ and integer stream properties instead of nested dicts of
+    lists. For existing callers it still reads like the old file dict:
+    track['path'], track['filename'] and track['metadata'].get('title', [''])[0]
+    all work.
+    """
+    
+    __slots__ = ('path',) + TAG_FIELDS + NUMERIC_FIELDS
+    
+    def __init__(self, path: str, title: TagValue = None, artist: TagValue = None,
+                 album: TagValue = None, date: TagValue = None, track: TagValue = None,
+                 genre: TagValue = None, album_artist: TagValue = None,
+                 duration: int = 0, bitrate: int = 0, sample_rate: int = 0):
+        values = (path, title, artist, album, date, track, genre, album_artist,
+                  duration, bitrate, sample_rate)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+    
+    @classmethod
+    def from_metadata(cls, path: str, metadata: Dict) -> 'Track':
+        """
+        Build a track from extracted tag metadata.
+        
+        Args:
+            path: File path
+            metadata: Dict of tag lists and stream properties, as read from the file
+        
+        Returns:
+            Track record
+        """
+        tags = [_pack(metadata.get(name), name in INTERNED_FIELDS) for name in TAG_FIELDS]
+        numbers = [_to_int(metadata.get(name)) for name in NUMERIC_FIELDS]
+        return cls(path, *tags, *numbers)
+    
+    @property
+    def filename(self) -> str:
+        """Base name of the file."""
+        return os.path.basename(self.path)
+    
+    @property
+    def metadata(self) -> 'TrackMetadata':
+        """Dict-style view of the tags, as the scanner used to return them."""
+        return TrackMetadata(self)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Track is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Track is immutable")
+    
+    def __reduce__(self):
+        return Track, tuple(getattr(self, name) for name in self.__slots__)
+    
+    # File dict compatibility
+    
+    _KEYS = ('path', 'filename', 'metadata')
+    
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def __repr__(self) -> str:
+        return f"Track({self.path!r}, title={self.title!r}, artist={self.artist!r})"
+
+class TrackMetadata(Mapping):
+    """Read-only view of a track's tags in the old dict-of-lists shape."""
+    
+    __slots__ = ('_track',)
+    
+    def __init__(self, track: Track):
+        self._track = track
+    
+    def __getitem__(self, key: str):
+        if key in NUMERIC_FIELDS:
+            return str(getattr(self._track, key))
+        if key not in TAG_FIELDS:
+            raise KeyError(key)
+        value = getattr(self._track, key)
+        if value is None:
+            raise KeyError(key)
+        return list(value) if isinstance(value, tuple) else [value]
+    
+    def __iter__(self) -> Iterator[str]:
+        for name in TAG_FIELDS:
+            if getattr(self._track, name) is not None:
+                yield name
+        yield from NUMERIC_FIELDS
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
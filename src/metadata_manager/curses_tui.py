@@ -6,11 +6,16 @@ import curses
 import os
 import sys
 import time
+import queue
+import threading
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
 from .core.file_scanner import FileScanner
-from .core.metadata_manager import MetadataManager
+from .core.lazy_tracks import fill_details
+from .core.library_index import open_library_index
+from .core.library_watcher import LibraryWatcher
+from .core.metadata_manager import MetadataManager, describe_error
 
 # Constants for UI layout
 HEADER_HEIGHT = 3
@@ -20,6 +25,7 @@ KEY_Q = 113
 KEY_R = 114
 KEY_S = 115
 KEY_A = 97
+KEY_W = 119
 KEY_ENTER = 10
 KEY_TAB = 9
 
@@ -29,7 +35,7 @@ class CursesTUI:
 
     def __init__(self):
         """Initialize the TUI."""
-        self.scanner = FileScanner()
+        self.scanner = FileScanner(index=open_library_index())
         self.manager = MetadataManager()
         self.current_path = Path.home() / "Music"  # Inicio en carpeta de música por defecto
         self.current_files = []
@@ -42,6 +48,11 @@ class CursesTUI:
         self.show_details = False
         self.visible_files = []
         self.flat_results = []  # Resultados aplanados para navegación más sencilla
+        self.watcher = None
+        self.watch_enabled = True
+        self.library_events = queue.Queue()
+        self.search_events = queue.Queue()
+        self.search_id = 0
 
     def run(self):
         """Run the TUI main loop."""
@@ -69,18 +80,23 @@ class CursesTUI:
         self.status_message = "Press 'r' to scan directory, 's' to search metadata, 'q' to quit"
         
         # Main loop
-        while True:
-            self.draw_ui()
-            try:
-                key = self.screen.getch()
-            except KeyboardInterrupt:
-                break
+        try:
+            while True:
+                self.apply_library_events()
+                self.apply_search_results()
+                self.draw_ui()
+                try:
+                    key = self.screen.getch()
+                except KeyboardInterrupt:
+                    break
                 
-            if key == KEY_Q or key == KEY_ESC:  # Quit on 'q' or ESC
-                break
+                if key == KEY_Q or key == KEY_ESC:  # Quit on 'q' or ESC
+                    break
                 
-            if self.handle_key(key):
-                continue
+                if self.handle_key(key):
+                    continue
+        finally:
+            self.stop_watching()
                 
     def handle_key(self, key):
         """Handle key press."""
@@ -95,6 +111,16 @@ class CursesTUI:
         elif key == KEY_A:  # Apply metadata
             self.apply_metadata()
             return True
+        
+        elif key == KEY_W:  # Toggle live updates
+            self.watch_enabled = not self.watch_enabled
+            if self.watch_enabled:
+                self.start_watching(self.current_path)
+                self.status_message = "Watch mode on"
+            else:
+                self.stop_watching()
+                self.status_message = "Watch mode off"
+            return True
             
         elif key == KEY_TAB:  # Switch focus
             self.focused_panel = (self.focused_panel + 1) % 2
@@ -189,59 +215,133 @@ class CursesTUI:
                 self.status_message = f"Found {len(files)} music files in {path}"
             else:
                 self.status_message = f"No music files in {path}"
+            
+            self.start_watching(path)
         except Exception as e:
             self.status_message = f"Error scanning directory: {str(e)}"
+    
+    def start_watching(self, path: Path):
+        """Watch the scanned directory so new downloads show up without a rescan."""
+        self.stop_watching()
+        if not self.watch_enabled:
+            return
+        try:
+            self.watcher = LibraryWatcher(self.scanner, path, self.library_events.put)
+            self.watcher.start()
+        except Exception as e:
+            self.watcher = None
+            self.status_message = f"Error starting watcher: {str(e)}"
+    
+    def stop_watching(self):
+        """Stop the library watcher if one is running."""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def apply_library_events(self):
+        """Apply pending watcher events to the file list in place."""
+        changed = 0
+        while True:
+            try:
+                events = self.library_events.get_nowait()
+            except queue.Empty:
+                break
+            
+            for event in events:
+                removed = event.src_path if event.kind == "moved" else event.path
+                if event.kind == "modified":
+                    files = [event.file if f["path"] == event.path else f for f in self.current_files]
+                else:
+                    files = [f for f in self.current_files if f["path"] != removed]
+                    if event.kind in ("added", "moved"):
+                        files.append(event.file)
+                self.current_files = files
+                changed += 1
+        
+        if not changed:
+            return
+        
+        # Directories stay as they are, only the music entries are rebuilt
+        self.visible_files = [item for item in self.visible_files if item.get("is_dir")]
+        for file in self.current_files:
+            metadata = file["metadata"]
+            name = metadata.get("title", [""])[0] or Path(file["path"]).name
+            self.visible_files.append({
+                "is_dir": False,
+                "name": name,
+                "file": file
+            })
+        self.selected_file_idx = min(self.selected_file_idx, max(0, len(self.visible_files) - 1))
+        self.status_message = f"Library updated ({changed} changes), {len(self.current_files)} music files"
             
     def search_metadata(self):
-        """Search metadata for current files."""
+        """Search metadata for current files in the background."""
         if not self.current_files:
             self.status_message = "No files to search metadata for."
             return
             
+        # Get album info from first file
+        first_file = self.current_files[0]
+        metadata = first_file["metadata"]
+        album = metadata.get("album", [""])[0]
+        artist = metadata.get("artist", [""])[0]
+        
+        # Results of an older search still streaming in are dropped
+        self.search_id += 1
+        self.current_results = {}
+        self.flat_results = []
+        self.selected_result_idx = 0  # Reset selection
+        
+        if not (album and artist):
+            self.status_message = "No metadata found"
+            return
+        
         self.status_message = "Searching metadata..."
-        self.draw_status_bar()
-        self.screen.refresh()
+        search_id = self.search_id
         
-        try:
-            # Get album info from first file
-            first_file = self.current_files[0]
-            metadata = first_file["metadata"]
-            album = metadata.get("album", [""])[0]
-            artist = metadata.get("artist", [""])[0]
-            
-            # Search all providers
-            results = {}
-            if album and artist:
-                for provider in self.manager.providers:
-                    try:
-                        matches = provider.search_album(album, artist)
-                        if matches:
-                            results[provider.name] = matches
-                    except Exception as e:
-                        self.status_message = f"Error with {provider.name}: {str(e)}"
-                        self.draw_status_bar()
-                        self.screen.refresh()
-                        time.sleep(1)  # Show error briefly
-            
-            self.current_results = results
-            self.selected_result_idx = 0  # Reset selection
-            
-            # Flatten results for easier navigation
-            self.flat_results = []
-            for provider, matches in results.items():
-                for match in matches:
-                    match['provider'] = provider  # Ensure provider is in match
+        def search_thread():
+            # Each provider's results are shown by the main loop as they arrive
+            try:
+                for result in self.manager.iter_search_album(album, artist):
+                    self.search_events.put((search_id, result))
+                self.search_events.put((search_id, None))
+            except Exception as e:
+                self.search_events.put((search_id, e))
+            
+        threading.Thread(target=search_thread, daemon=True).start()
+            
+    def apply_search_results(self):
+        """Add provider results that arrived since the last screen update."""
+        while True:
+            try:
+                search_id, result = self.search_events.get_nowait()
+            except queue.Empty:
+                break
+            if search_id != self.search_id:
+                continue
+            
+            if result is None:
+                if not self.flat_results:
+                    self.status_message = "No metadata found"
+                else:
+                    self.status_message = (f"Found {len(self.flat_results)} metadata matches "
+                                           f"from {len(self.current_results)} providers")
+            elif isinstance(result, Exception):
+                self.status_message = f"Error searching metadata: {str(result)}"
+            elif result.error is not None:
+                self.status_message = describe_error(result)
+            elif result.matches:
+                self.current_results[result.provider] = result.matches
+                
+                # Flatten results for easier navigation
+                for match in result.matches:
+                    match['provider'] = result.provider  # Ensure provider is in match
                     self.flat_results.append(match)
             
-            if not self.flat_results:
-                self.status_message = "No metadata found"
-            else:
-                self.status_message = f"Found {len(self.flat_results)} metadata matches from {len(results)} providers"
+                self.status_message = (f"Found {len(self.flat_results)} matches from {len(self.current_results)} "
+                                       f"providers ({result.provider} in {result.elapsed:.1f}s), searching...")
                 self.focused_panel = 1  # Switch focus to results
             
-        except Exception as e:
-            self.status_message = f"Error searching metadata: {str(e)}"
-            
     def apply_metadata(self):
         """Apply selected metadata to files."""
         if self.flat_results and 0 <= self.selected_result_idx < len(self.flat_results):
@@ -308,7 +408,7 @@ class CursesTUI:
         self.screen.addstr(1, 2, title, curses.color_pair(1) | curses.A_BOLD)
         
         # Draw help
-        help_text = "q:Quit  r:Refresh  s:Search  a:Apply  Tab:Switch Focus  Enter:Details"
+        help_text = "q:Quit  r:Refresh  s:Search  a:Apply  w:Watch  Tab:Switch Focus  Enter:Details"
         help_x = width - len(help_text) - 2
         if help_x > len(title) + 4:
             self.screen.addstr(1, help_x, help_text, curses.color_pair(1))
@@ -427,6 +527,8 @@ class CursesTUI:
             return
         
         metadata = self.selected_metadata
+        if metadata.get('tracks'):  # Fetched here anyway for the track list
+            fill_details(metadata)
         provider = metadata.get('provider', '').upper()
         title = metadata.get('title', '')
         artist = metadata.get('artist', '')
@@ -7,11 +7,14 @@ from pathlib import Path
 import threading
 from PIL import Image, ImageTk, ImageDraw
 import io
-import requests
 
 from .core.file_scanner import FileScanner
-from .core.metadata_manager import MetadataManager
+from .core.lazy_tracks import LazyTracks, fill_details, format_track_count
+from .core.library_index import open_library_index
+from .core.library_watcher import LibraryWatcher
+from .core.metadata_manager import MetadataManager, describe_error
 from .core.artwork_finder import find_artwork
+from .core.http_client import HTTPStatusError, get_content
 
 class MetadataManagerGUI:
     def __init__(self, root):
@@ -21,11 +24,14 @@ class MetadataManagerGUI:
         self.root.geometry("1000x600")
         
         # Initialize backend components
-        self.scanner = FileScanner()
+        self.scanner = FileScanner(index=open_library_index())
         self.manager = MetadataManager()
         self.current_files = []
         self.current_results = {}
+        self.search_id = None
         self.selected_metadata = None
+        self.watcher = None
+        self.watch_var = tk.BooleanVar(value=True)
         
         # Create the main layout
         self.create_menu()
@@ -47,6 +53,8 @@ class MetadataManagerGUI:
         actionmenu.add_command(label="Scan Files", command=self.scan_folder)
         actionmenu.add_command(label="Search Metadata", command=self.search_metadata)
         actionmenu.add_command(label="Apply Metadata", command=self.apply_metadata)
+        actionmenu.add_separator()
+        actionmenu.add_checkbutton(label="Watch Folder", variable=self.watch_var, command=self.toggle_watch)
         menubar.add_cascade(label="Actions", menu=actionmenu)
         
         # Help menu
@@ -178,9 +186,71 @@ class MetadataManagerGUI:
             
             # Update UI in main thread
             self.root.after(0, lambda: self.update_file_list(files))
+            self.root.after(0, lambda: self.start_watching(path, recursive))
         
         threading.Thread(target=scan_thread).start()
     
+    def start_watching(self, path, recursive=True):
+        """Watch the scanned folder so new and changed files appear without a rescan."""
+        self.stop_watching()
+        if not self.watch_var.get():
+            return
+        try:
+            self.watcher = LibraryWatcher(self.scanner, path, self.on_library_events, recursive=recursive)
+            self.watcher.start()
+        except Exception as e:
+            self.watcher = None
+            print(f"Error starting watcher: {e}")
+    
+    def stop_watching(self):
+        """Stop the folder watcher if one is running."""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def toggle_watch(self):
+        """Turn live folder updates on or off."""
+        if self.watch_var.get() and hasattr(self, 'current_folder'):
+            self.start_watching(self.current_folder)
+        else:
+            self.stop_watching()
+    
+    def on_library_events(self, events):
+        """Receive watcher events on the watcher thread."""
+        self.root.after(0, lambda: self.apply_library_events(events))
+    
+    def apply_library_events(self, events):
+        """Update the file list in place for added, changed and removed files."""
+        for event in events:
+            removed = event.src_path if event.kind == "moved" else event.path
+            if event.kind in ("deleted", "moved"):
+                self.current_files = [f for f in self.current_files if f["path"] != removed]
+                if self.file_tree.exists(removed):
+                    self.file_tree.delete(removed)
+            
+            if event.kind == "modified":
+                self.current_files = [event.file if f["path"] == event.path else f for f in self.current_files]
+                if self.file_tree.exists(event.path):
+                    self.file_tree.item(event.path, values=self._file_values(event.file))
+            elif event.kind in ("added", "moved"):
+                self.current_files = [f for f in self.current_files if f["path"] != event.path]
+                self.current_files.append(event.file)
+                if not self.file_tree.exists(event.path):
+                    self.file_tree.insert("", tk.END, iid=event.path, text="", values=self._file_values(event.file))
+        
+        self.status_var.set(f"{len(self.current_files)} music files in {self.current_folder} (updated)")
+    
+    def _file_values(self, file):
+        """Values shown for a file in the file list."""
+        metadata = file["metadata"]
+        return (
+            metadata.get("track", [""])[0],
+            metadata.get("title", [""])[0] or os.path.basename(file["path"]),
+            metadata.get("artist", [""])[0],
+            metadata.get("album", [""])[0],
+            metadata.get("date", [""])[0]
+        )
+    
     def update_file_list(self, files):
         """Update file list in the treeview."""
         # Clear existing items
@@ -188,15 +258,8 @@ class MetadataManagerGUI:
             self.file_tree.delete(item)
         
         # Add files to the treeview
-        for i, file in enumerate(files):
-            metadata = file["metadata"]
-            track = metadata.get("track", [""])[0]
-            title = metadata.get("title", [""])[0] or os.path.basename(file["path"])
-            artist = metadata.get("artist", [""])[0]
-            album = metadata.get("album", [""])[0]
-            year = metadata.get("date", [""])[0]
-            
-            self.file_tree.insert("", tk.END, text="", values=(track, title, artist, album, year))
+        for file in files:
+            self.file_tree.insert("", tk.END, iid=file["path"], text="", values=self._file_values(file))
         
         self.status_var.set(f"Found {len(files)} music files in {self.current_folder}")
     
@@ -218,21 +281,18 @@ class MetadataManagerGUI:
             
             if album and artist:
                 try:
-                    # Search for album metadata
-                    results = {}
-                    for provider in self.manager.providers:
-                        matches = provider.search_album(album, artist)
-                        if matches:
-                            results[provider.name] = matches
-                    
-                    self.current_results = results
-                    
-                    # Update UI in main thread
-                    self.root.after(0, lambda: self.update_results(results))
+                    # Search for album metadata on all providers at once,
+                    # showing each provider's matches as soon as it answers
+                    self.root.after(0, lambda: self.update_results({}))
+                    for result in self.manager.iter_search_album(album, artist):
+                        self.root.after(0, lambda result=result: self.add_provider_results(search_id, result))
+                    self.root.after(0, lambda: self.finish_results(search_id))
                 except Exception as e:
                     self.root.after(0, lambda: messagebox.showerror("Error", f"Search failed: {str(e)}"))
                     self.status_var.set("Search failed")
         
+        # Results of an older search still streaming in are dropped
+        search_id = self.search_id = object()
         threading.Thread(target=search_thread).start()
     
     def update_results(self, results):
@@ -240,26 +300,49 @@ class MetadataManagerGUI:
         # Clear existing items
         for item in self.results_tree.get_children():
             self.results_tree.delete(item)
+        self.current_results = {}
         
         # Add results to the treeview
         for provider, matches in results.items():
-            for match in matches:
-                self.results_tree.insert(
-                    "", 
-                    tk.END, 
-                    text="", 
-                    values=(
-                        provider.upper(),
-                        match.get('title', ''),
-                        match.get('artist', ''),
-                        match.get('album', ''),
-                        match.get('year', ''),
-                        len(match.get('tracks', []))
-                    )
-                )
+            self._insert_matches(provider, matches)
         
         self.status_var.set(f"Found metadata from {len(results)} providers")
     
+    def add_provider_results(self, search_id, result):
+        """Add one provider's results while the search is still running."""
+        if search_id is not self.search_id:
+            return
+        if result.error is not None:
+            self.status_var.set(describe_error(result))
+            return
+        if result.matches:
+            self._insert_matches(result.provider, result.matches)
+        self.status_var.set(f"Searching metadata... {result.provider} answered in {result.elapsed:.1f}s, "
+                            f"{len(self.current_results)} providers with matches so far")
+    
+    def finish_results(self, search_id):
+        """Show the final status of a search."""
+        if search_id is self.search_id:
+            self.status_var.set(f"Found metadata from {len(self.current_results)} providers")
+    
+    def _insert_matches(self, provider, matches):
+        """Add a provider's matches to the treeview."""
+        self.current_results[provider] = matches
+        for match in matches:
+            self.results_tree.insert(
+                "", 
+                tk.END, 
+                text="", 
+                values=(
+                    provider.upper(),
+                    match.get('title', ''),
+                    match.get('artist', ''),
+                    match.get('album', ''),
+                    match.get('year', ''),
+                    format_track_count(match.get('tracks'))
+                )
+            )
+    
     def on_file_double_click(self, event):
         """Handle double click on file item."""
         # Get selected item
@@ -270,10 +353,9 @@ class MetadataManagerGUI:
         item = selection[0]
         values = self.file_tree.item(item, "values")
         
-        # Get file index
-        idx = self.file_tree.index(item)
-        if idx < len(self.current_files):
-            file = self.current_files[idx]
+        # Rows are keyed by path, their order drifts from current_files once the watcher updates them
+        file = next((f for f in self.current_files if f["path"] == item), None)
+        if file:
             self.show_file_details(file)
     
     def on_result_selected(self, event):
@@ -317,8 +399,14 @@ class MetadataManagerGUI:
         self.details_text.delete(1.0, tk.END)
         self.details_text.insert(tk.END, "\n".join(details))
     
+    def refresh_metadata_details(self, metadata):
+        """Redraw details if the result is still the selected one."""
+        if metadata is self.selected_metadata:
+            self.show_metadata_details(metadata)
+    
     def show_metadata_details(self, metadata):
         """Show details for selected metadata."""
+        fill_details(metadata)
         # Format text for display
         details = [
             f"Provider: {metadata.get('provider', '').upper()}",
@@ -326,11 +414,21 @@ class MetadataManagerGUI:
             f"Artist: {metadata.get('artist', '')}",
             f"Album: {metadata.get('album', '')}",
             f"Year: {metadata.get('year', '')}",
-            f"\nTracks: {len(metadata.get('tracks', []))}"
+            f"\nTracks: {format_track_count(metadata.get('tracks')) or 0}"
         ]
         
+        tracks = metadata.get('tracks', [])
+        if isinstance(tracks, LazyTracks) and not tracks.resolved:
+            # Fetch the track list off the UI thread, then show it
+            def load_thread():
+                tracks.resolve()
+                self.root.after(0, lambda: self.refresh_metadata_details(metadata))
+            
+            threading.Thread(target=load_thread, daemon=True).start()
+            details.append("\nLoading tracks...")
+        
         # Add track listing
-        if tracks := metadata.get('tracks', []):
+        elif tracks:
             details.append("\nTrack Listing:")
             for track in tracks:
                 details.append(f"{track['position']}. {track['title']}")
@@ -362,14 +460,15 @@ class MetadataManagerGUI:
                     )
                 
                 if artwork_url:
-                    response = requests.get(artwork_url)
-                    if response.status_code == 200:
-                        image = Image.open(io.BytesIO(response.content))
-                        image = image.resize((200, 200), Image.LANCZOS)
-                        photo = ImageTk.PhotoImage(image)
-                        self.root.after(0, lambda: self.update_artwork(photo))
-                    else:
+                    try:
+                        content = get_content(artwork_url)
+                    except HTTPStatusError:
                         self.root.after(0, lambda: self.artwork_label.config(text="Artwork unavailable"))
+                        return
+                    image = Image.open(io.BytesIO(content))
+                    image = image.resize((200, 200), Image.LANCZOS)
+                    photo = ImageTk.PhotoImage(image)
+                    self.root.after(0, lambda: self.update_artwork(photo))
                 else:
                     # Si no hay URL, usar placeholder
                     self.root.after(0, lambda: self.load_placeholder_artwork())
@@ -467,6 +566,7 @@ def main():
     
     # Start main loop
     root.mainloop()
+    app.stop_watching()
 
 if __name__ == "__main__":
     main()
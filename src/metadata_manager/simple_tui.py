@@ -17,7 +17,9 @@ from rich.layout import Layout
 from rich import print as rprint
 
 from .core.file_scanner import FileScanner
-from .core.metadata_manager import MetadataManager
+from .core.lazy_tracks import fill_details, format_track_count
+from .core.library_index import open_library_index
+from .core.metadata_manager import MetadataManager, describe_error
 
 
 class SimpleTUI:
@@ -26,7 +28,7 @@ class SimpleTUI:
     def __init__(self):
         """Initialize the TUI."""
         self.console = Console()
-        self.scanner = FileScanner()
+        self.scanner = FileScanner(index=open_library_index())
         self.manager = MetadataManager()
         self.current_path = Path.home() / "Music"
         self.current_files = []
@@ -202,21 +204,21 @@ class SimpleTUI:
                 title = metadata.get("title", [""])[0] or Path(first_file["path"]).name
                 self.console.print(f"[bold]Looking for:[/bold] {title}")
             
-            # Search all providers
+            # Search all providers at once
+            self.console.print(f"[cyan]Searching {', '.join(p.name for p in self.manager.providers)}...[/cyan]")
             results = {}
-            for provider in self.manager.providers:
-                try:
-                    self.console.print(f"[cyan]Searching {provider.name}...[/cyan]")
-                    matches = provider.search_album(album, artist)
-                    if matches:
-                        results[provider.name] = matches
-                        self.console.print(f"[green]Found {len(matches)} matches in {provider.name}[/green]")
-                    else:
-                        self.console.print(f"[yellow]No results from {provider.name}[/yellow]")
-                except Exception as e:
-                    self.console.print(f"[red]Error with {provider.name}: {str(e)}[/red]")
+            for result in self.manager.iter_search_album(album, artist):
+                if result.error is not None:
+                    self.console.print(f"[yellow]{describe_error(result)}[/yellow]")
+                elif result.matches:
+                    results[result.provider] = result.matches
+                    self.console.print(f"[green]Found {len(result.matches)} matches in {result.provider} "
+                                       f"({result.elapsed:.1f}s)[/green]")
+                else:
+                    self.console.print(f"[yellow]No results from {result.provider} ({result.elapsed:.1f}s)[/yellow]")
             
-            self.current_results = results
+            # Keep provider order for the results list
+            self.current_results = {p.name: results[p.name] for p in self.manager.providers if p.name in results}
             self._display_results()
         except Exception as e:
             self.console.print(f"[red]Error searching metadata: {str(e)}[/red]")
@@ -249,7 +251,7 @@ class SimpleTUI:
             artist = result.get('artist', '')
             album = result.get('album', '') or title
             year = result.get('year', '')
-            tracks = len(result.get('tracks', []))
+            tracks = format_track_count(result.get('tracks')) or 0
             
             self.console.print(f"[cyan]{i+1}[/cyan]: [{provider}] {title} - {artist} ({year}) [{tracks} tracks]")
         
@@ -330,7 +332,7 @@ class SimpleTUI:
                     match.get("artist", ""),
                     match.get("album", ""),
                     str(match.get("year", "")),
-                    str(len(match.get("tracks", [])))
+                    format_track_count(match.get("tracks"))
                 )
                 
         self.console.print(table)
@@ -340,6 +342,8 @@ class SimpleTUI:
         self.console.clear()
         self._print_header()
         
+        if metadata.get('tracks'):  # Fetched here anyway for the track list
+            fill_details(metadata)
         provider = metadata.get('provider', '').upper()
         title = metadata.get('title', '')
         artist = metadata.get('artist', '')
@@ -6,11 +6,16 @@ from textual.containers import Container, Horizontal, Vertical
 from textual.binding import Binding
 from textual import work
 from pathlib import Path
+import asyncio
 import os
 from rich import print as rprint
 
+from .core import http_client
 from .core.file_scanner import FileScanner
-from .core.metadata_manager import MetadataManager
+from .core.lazy_tracks import LazyTracks, fill_details, format_track_count
+from .core.library_index import open_library_index
+from .core.library_watcher import LibraryWatcher
+from .core.metadata_manager import MetadataManager, describe_error
 
 class MusicDLPApp(App):
     """Main TUI application."""
@@ -20,17 +25,22 @@ class MusicDLPApp(App):
         Binding("r", "refresh", "Refresh", show=True),
         Binding("s", "search", "Search", show=True),
         Binding("a", "apply_metadata", "Apply Metadata"),
+        Binding("w", "toggle_watch", "Watch"),
         Binding("enter", "show_details", "Show Details")
     ]
     
     def __init__(self):
         super().__init__()
-        self.scanner = FileScanner()
+        self.scanner = FileScanner(index=open_library_index())
         self.manager = MetadataManager()
         self.current_files = []
         self.current_path = Path.home()
         self.current_results = {}  # Añadido para guardar resultados
         self.selected_metadata = None  # Añadido para guardar selección
+        self.watcher = None
+        self.watch_enabled = True
+        self.watch_target = None  # (path, recursive) of the last scan
+        self.file_columns = []
     
     def compose(self) -> ComposeResult:
         """Create child widgets."""
@@ -62,7 +72,7 @@ class MusicDLPApp(App):
     def on_mount(self) -> None:
         """Setup on app start."""
         # Configure files table
-        self.query_one("#files_table").add_columns(
+        self.file_columns = self.query_one("#files_table").add_columns(
             "Track", "Title", "Artist", "Album", "Year"
         )
         
@@ -126,34 +136,101 @@ class MusicDLPApp(App):
         
         # Scan directory with recursive flag
         files = self.scanner.scan_directory(path, recursive=recursive)
-        if not files:
-            return
             
         # Update files table
         self.current_files = files
         for file in files:
-            metadata = file["metadata"]
             self.call_from_thread(
                 self.query_one("#files_table", DataTable).add_row,
-                metadata.get("track", [""])[0],
-                metadata.get("title", [""])[0] or Path(file["path"]).name,
-                metadata.get("artist", [""])[0],
-                metadata.get("album", [""])[0],
-                metadata.get("date", [""])[0]
+                *self._file_row(file),
+                key=file["path"]
             )
+        
+        # Keep the table in sync with downloads and edits from now on
+        self.watch_target = (path, recursive)
+        self.call_from_thread(self.start_watching, path, recursive)
+    
+    def _file_row(self, file: Dict) -> tuple:
+        """Values shown for a file in the files table."""
+        metadata = file["metadata"]
+        return (
+            metadata.get("track", [""])[0],
+            metadata.get("title", [""])[0] or Path(file["path"]).name,
+            metadata.get("artist", [""])[0],
+            metadata.get("album", [""])[0],
+            metadata.get("date", [""])[0]
+        )
+    
+    def start_watching(self, path: Path, recursive: bool = False) -> None:
+        """Watch the scanned directory for added, changed and removed files."""
+        self.stop_watching()
+        if not self.watch_enabled:
+            return
+        try:
+            self.watcher = LibraryWatcher(self.scanner, path, self._on_library_events, recursive=recursive)
+            self.watcher.start()
+            self.sub_title = f"Watching {path} ({self.watcher.mode})"
+        except Exception as e:
+            self.watcher = None
+            print(f"Error starting watcher: {e}")
+    
+    def stop_watching(self) -> None:
+        """Stop the library watcher if one is running."""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            self.sub_title = ""
+    
+    def _on_library_events(self, events) -> None:
+        """Receive watcher events on the watcher thread."""
+        self.call_from_thread(self.apply_library_events, events)
+    
+    def apply_library_events(self, events) -> None:
+        """Update the files table in place for changed files.
+        
+        Rows may be missing, e.g. while a search has cleared the table; only
+        the file list is updated for those.
+        """
+        table = self.query_one("#files_table", DataTable)
+        for event in events:
+            removed = event.src_path if event.kind == "moved" else event.path
+            if event.kind in ("deleted", "moved"):
+                self.current_files = [f for f in self.current_files if f["path"] != removed]
+                if removed in table.rows:
+                    table.remove_row(removed)
+            
+            if event.kind == "modified":
+                self.current_files = [event.file if f["path"] == event.path else f for f in self.current_files]
+                if event.path in table.rows:
+                    for column, value in zip(self.file_columns, self._file_row(event.file)):
+                        table.update_cell(event.path, column, value)
+            elif event.kind in ("added", "moved"):
+                self.current_files = [f for f in self.current_files if f["path"] != event.path]
+                self.current_files.append(event.file)
+                if event.path not in table.rows:
+                    table.add_row(*self._file_row(event.file), key=event.path)
+    
+    def action_toggle_watch(self) -> None:
+        """Toggle live updates of the files table."""
+        self.watch_enabled = not self.watch_enabled
+        if self.watch_enabled:
+            if self.watch_target:
+                self.start_watching(*self.watch_target)
+        else:
+            self.stop_watching()
     
     def action_search(self) -> None:
         """Search metadata for current files."""
         if self.current_files:
             self.search_metadata()
     
-    @work(thread=True)
-    def search_metadata(self) -> None:
-        """Search metadata in background."""
+    @work(exclusive=True)
+    async def search_metadata(self) -> None:
+        """Search metadata on the app's event loop."""
         if not self.current_files:
             return
             
-        self.call_from_thread(self.clear_tables)
+        self.clear_tables()
         
         # Get first file info
         first_file = self.current_files[0]
@@ -161,58 +238,55 @@ class MusicDLPApp(App):
         album = metadata.get("album", [""])[0]
         artist = metadata.get("artist", [""])[0]
         
-        # Search albums first
+        # Search albums first, showing each provider as soon as it answers
         if album and artist:
-            for provider in self.manager.providers:
-                try:
-                    matches = provider.search_album(album, artist)
-                    if matches and len(matches) > 0:
-                        match = matches[0]
-                        self.current_results[provider.name] = matches
-                        
-                        # Add to preview table
-                        self.call_from_thread(
-                            self.query_one("#preview_table").add_row,
-                            provider.name,
-                            match.get('title', ''),
-                            match.get('artist', ''),
-                            match.get('year', ''),
-                            str(len(match.get('tracks', []))),
-                            f"{match.get('score', 0):.1f}"
-                        )
-                except Exception as e:
-                    print(f"Error with {provider.name}: {str(e)}")
+            preview_table = self.query_one("#preview_table")
+            async for result in self.manager.aiter_search_album(album, artist):
+                if result.error is not None:
+                    self.notify(describe_error(result), severity="warning")
+                    continue
+                if not result.matches:
                     continue
+                match = result.matches[0]
+                self.current_results[result.provider] = result.matches
+                        
+                # Add to preview table
+                preview_table.add_row(
+                    result.provider,
+                    match.get('title', ''),
+                    match.get('artist', ''),
+                    match.get('year', ''),
+                    format_track_count(match.get('tracks')),
+                    f"{match.get('score', 0):.1f}"
+                )
 
-        # Search individual tracks
+        # Search individual tracks, all files at once
+        queries = []
         for file in self.current_files:
             title = file["metadata"].get("title", [""])[0]
             artist = file["metadata"].get("artist", [""])[0]
+            if title:
+                queries.append({'metadata': {'title': [title], 'artist': [artist]}})
             
-            if not title:
-                continue
-                
-            results = self.manager.search_all([{
-                'metadata': {
-                    'title': [title],
-                    'artist': [artist]
-                }
-            }])
-            
-            if results:
-                for provider, matches in results.items():
-                    self.current_results[provider] = matches
-                    for match in matches:
-                        self.call_from_thread(
-                            self.query_one("#results_table").add_row,
-                            provider,
-                            match.get('title', ''),
-                            match.get('artist', ''),
-                            match.get('album', ''),
-                            match.get('year', ''),
-                            f"{match.get('score', 0):.1f}",
-                            str(len(match.get('tracks', [])))
-                        )
+        results_table = self.query_one("#results_table")
+        
+        async def stream_tracks(query: Dict) -> None:
+            async for result in self.manager.aiter_search([query], "track"):
+                if not result.matches:
+                    continue
+                self.current_results[result.provider] = result.matches
+                for match in result.matches:
+                    results_table.add_row(
+                        result.provider,
+                        match.get('title', ''),
+                        match.get('artist', ''),
+                        match.get('album', ''),
+                        match.get('year', ''),
+                        f"{match.get('score', 0):.1f}",
+                        format_track_count(match.get('tracks'))
+                    )
+        
+        await asyncio.gather(*(stream_tracks(query) for query in queries))
     
     def clear_tables(self) -> None:
         """Clear all tables."""
@@ -234,6 +308,8 @@ class MusicDLPApp(App):
     async def on_unmount(self) -> None:
         """Clean up on exit."""
         # Asegurar que todo se limpia
+        self.stop_watching()
+        await http_client.aclose()
         for provider in self.manager.providers:
             if hasattr(provider, 'client'):
                 provider.client = None
@@ -267,8 +343,7 @@ class MusicDLPApp(App):
                 print(f"Selected metadata: {match.get('title')} by {match.get('artist')}")
                 
                 # Update details display
-                details = self._format_metadata_details(match)
-                self.query_one("#metadata_details").update(details)
+                self.show_metadata_details(match)
         except Exception as e:
             print(f"Error handling preview selection: {e}")
     
@@ -289,11 +364,20 @@ class MusicDLPApp(App):
                     if match.get('title') == title and match.get('artist') == artist:
                         self.selected_metadata = match
                         # Update details display
-                        details = self._format_metadata_details(match)
-                        self.query_one("#metadata_details").update(details)
+                        self.show_metadata_details(match)
                         break
         except Exception as e:
             print(f"Error handling results selection: {e}")
+    
+    @work(exclusive=True, group="details")
+    async def show_metadata_details(self, metadata: Dict) -> None:
+        """Show a result's details once its track list has been fetched."""
+        tracks = metadata.get('tracks')
+        if isinstance(tracks, LazyTracks) and not tracks.resolved:
+            self.query_one("#metadata_details").update("[yellow]Loading tracks...[/yellow]")
+            await tracks.resolve_async()
+        fill_details(metadata)
+        self.query_one("#metadata_details").update(self._format_metadata_details(metadata))
 
     def _format_metadata_details(self, metadata: Dict) -> str:
         """Format metadata as rich text for display."""
@@ -315,8 +399,7 @@ class MusicDLPApp(App):
     def action_show_details(self) -> None:
         """Show details of selected metadata."""
         if self.selected_metadata:
-            details = self._format_metadata_details(self.selected_metadata)
-            self.query_one("#metadata_details").update(details)
+            self.show_metadata_details(self.selected_metadata)
         else:
             self.query_one("#metadata_details").update("[yellow]No metadata selected[/yellow]")
 
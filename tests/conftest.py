@@ -0,0 +1,14 @@
+"""Shared fixtures for the test suite."""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Run against the source tree without installing the package
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep caches written during tests out of the user's cache directory."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
@@ -0,0 +1,59 @@
+import time
+
+from metadata_manager.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+def make_breaker(**kwargs):
+    options = dict(failure_rate=0.5, slow_call=1.0, window=4, min_calls=3, open_seconds=0.05)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+def test_opens_after_enough_failures():
+    breaker = make_breaker()
+    assert not breaker.record(False, 0.1, OSError("down"))
+    assert not breaker.record(False, 0.1, OSError("down"))
+    assert breaker.record(False, 0.1, OSError("down"))
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert str(breaker.last_error) == "down"
+
+def test_stays_closed_below_failure_rate():
+    breaker = make_breaker()
+    for ok in (True, True, False, True):
+        breaker.record(ok, 0.1)
+    assert breaker.state == CLOSED
+
+def test_slow_successes_count_as_failures():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(True, 2.0)
+    assert breaker.state == OPEN
+
+def test_half_open_lets_one_probe_through():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+def test_released_probe_frees_the_slot():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
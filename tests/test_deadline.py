@@ -0,0 +1,41 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from metadata_manager.core import deadline
+
+def test_no_budget_by_default():
+    assert deadline.remaining() is None
+    assert deadline.request_timeout(10.0) == 10.0
+
+def test_nested_scope_never_extends_the_budget():
+    with deadline.scope(0.5):
+        with deadline.scope(10.0):
+            assert deadline.remaining() <= 0.5
+    assert deadline.remaining() is None
+
+def test_request_timeout_is_capped_and_fails_when_spent():
+    with deadline.scope(0.05):
+        assert deadline.request_timeout(10.0) <= 0.05
+        time.sleep(0.06)
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.request_timeout(10.0)
+
+def test_sleep_fails_early_when_it_would_outlast_the_budget():
+    started = time.monotonic()
+    with deadline.scope(0.1):
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.sleep(1.0)
+    assert time.monotonic() - started < 0.1
+
+def test_budget_follows_into_threads():
+    with ThreadPoolExecutor(1) as executor, deadline.scope(1.0):
+        left = deadline.submit(executor, deadline.remaining).result()
+    assert 0 < left <= 1.0
+    
+    async def run():
+        with deadline.scope(1.0):
+            return await deadline.to_thread(deadline.remaining)
+    assert 0 < asyncio.run(run()) <= 1.0
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from metadata_manager.core import entity_cache
+from metadata_manager.core.entity_cache import EntityCache
+from metadata_manager.core.lazy_tracks import LazyTracks
+from metadata_manager.core.providers import deezer_provider
+from metadata_manager.core.providers.deezer_provider import DeezerProvider
+
+SEARCH = {'data': [
+    {'id': 1, 'title': 'Blue Lines', 'artist': {'name': 'Massive Attack'}, 'nb_tracks': 9},
+    {'id': 2, 'title': 'Blue Lines (Remastered)', 'artist': {'name': 'Massive Attack'}, 'nb_tracks': 10},
+    {'id': 3, 'title': 'Mezzanine', 'artist': {'name': 'Massive Attack'}},
+]}
+ALBUM = {'release_date': '1991-04-08', 'tracks': {'data': [{'title': 'Safe from Harm', 'duration': 318}]}}
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Serve canned Deezer responses and record the requested URLs."""
+    urls = []
+    
+    def get_json(url, params=None):
+        urls.append(url)
+        return SEARCH if url.endswith('/search/album') else ALBUM
+    
+    async def get_json_async(url, params=None):
+        await asyncio.sleep(0.01)
+        return get_json(url, params)
+    monkeypatch.setattr(deezer_provider, 'get_json', get_json)
+    monkeypatch.setattr(deezer_provider, 'get_json_async', get_json_async)
+    monkeypatch.setattr(entity_cache, '_entity_cache', EntityCache())
+    return urls
+
+def test_album_search_fetches_details_of_the_best_match_only(requests):
+    results = DeezerProvider().search_album('Blue Lines', 'Massive Attack')
+    assert [result['raw_data']['deezer_id'] for result in results] == [1, 2]
+    assert requests == ['https://api.deezer.com/search/album', 'https://api.deezer.com/album/1']
+    
+    best, other = results
+    assert best['year'] == '1991'
+    assert best['tracks'] == [{'title': 'Safe from Harm', 'position': '1', 'duration': '318'}]
+    assert other['year'] == ''
+    assert isinstance(other['tracks'], LazyTracks) and not other['tracks'].resolved
+    assert len(requests) == 2
+
+def test_concurrent_async_searches_share_the_details_fetch(requests):
+    provider = DeezerProvider()
+    
+    async def run():
+        return await asyncio.gather(*(provider.search_album_async('Blue Lines', 'Massive Attack')
+                                      for _ in range(3)))
+    for results in asyncio.run(run()):
+        assert results[0]['year'] == '1991'
+    assert requests.count('https://api.deezer.com/album/1') == 1
@@ -0,0 +1,81 @@
+import time
+import threading
+
+import pytest
+
+from metadata_manager.core.entity_cache import EntityCache
+
+def test_get_or_fetch_fetches_once():
+    cache = EntityCache()
+    calls = []
+    
+    def fetch():
+        calls.append(None)
+        return {'tracks': [1, 2]}
+    assert cache.get_or_fetch('deezer', 'album', 1, fetch) == {'tracks': [1, 2]}
+    assert cache.get_or_fetch('deezer', 'album', 1, fetch) == {'tracks': [1, 2]}
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_failed_fetches_are_not_cached():
+    cache = EntityCache()
+    
+    def fail():
+        raise OSError("down")
+    with pytest.raises(OSError):
+        cache.get_or_fetch('deezer', 'album', 1, fail)
+    assert cache.get_or_fetch('deezer', 'album', 1, lambda: 'ok') == 'ok'
+
+def test_entries_expire():
+    cache = EntityCache(ttl=0.05)
+    cache.set('deezer', 'album', 1, 'value')
+    assert cache.get('deezer', 'album', 1) == 'value'
+    time.sleep(0.06)
+    assert cache.get('deezer', 'album', 1) is None
+    assert len(cache) == 0
+
+def test_least_recently_used_is_evicted():
+    cache = EntityCache(max_entries=2)
+    cache.set('p', 'album', 1, 'one')
+    cache.set('p', 'album', 2, 'two')
+    cache.get('p', 'album', 1)
+    cache.set('p', 'album', 3, 'three')
+    assert cache.get('p', 'album', 2) is None
+    assert cache.get('p', 'album', 1) == 'one'
+    assert cache.get('p', 'album', 3) == 'three'
+
+def test_ids_of_different_types_share_an_entry():
+    cache = EntityCache()
+    cache.set('p', 'album', 7, 'seven')
+    assert cache.get('p', 'album', '7') == 'seven'
+
+def test_persisted_entries_survive_a_restart(tmp_path):
+    db_path = tmp_path / 'entities.db'
+    cache = EntityCache(db_path=db_path)
+    cache.set('p', 'release', 'abc', [{'title': 'Song'}])
+    cache.close()
+    
+    reopened = EntityCache(db_path=db_path)
+    assert reopened.get('p', 'release', 'abc') == [{'title': 'Song'}]
+    reopened.close()
+
+def test_concurrent_misses_share_one_fetch():
+    cache = EntityCache()
+    calls = []
+    gate = threading.Event()
+    
+    def fetch():
+        calls.append(None)
+        gate.wait(2)
+        return 'album'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('p', 'album', 1, fetch)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert results == ['album'] * 4
+    assert len(calls) == 1
@@ -0,0 +1,45 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from metadata_manager.core import http_client
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """Answers every GET with its path, keeping the connection open."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(http_client, '_session', None)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JSONHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+    http_client.get_session().close()
+
+def test_requests_reuse_one_pooled_connection(server):
+    for i in range(3):
+        assert http_client.get_json(f'{server}/search', params={'q': f'song {i}'}) == \
+            {'path': f'/search?q=song+{i}'}
+    assert http_client.get_content(f'{server}/cover') == b'{"path": "/cover"}'
+    assert http_client.connection_stats()['127.0.0.1'] == {'requests': 4, 'connections': 1}
+
+def test_one_session_for_the_whole_application(server):
+    assert http_client.get_session() is http_client.get_session()
+    assert http_client.get_session().headers['User-Agent'] == http_client.USER_AGENT
@@ -0,0 +1,42 @@
+import os
+import struct
+
+from metadata_manager.core.image_info import PNG_SIGNATURE, get_image_size
+
+def png(width, height):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr + b'\0' * 4
+
+def jpeg(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\0' + b'\0' * 9
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    return b'\xff\xd8' + app0 + b'\xff\xff' + sof + b'\xff\xd9'
+
+def test_png_size(tmp_path):
+    path = tmp_path / 'cover.png'
+    path.write_bytes(png(600, 400))
+    assert get_image_size(path) == (600, 400)
+
+def test_jpeg_size_skips_segments_and_fill_bytes(tmp_path):
+    path = tmp_path / 'cover.jpg'
+    path.write_bytes(jpeg(1200, 1000))
+    assert get_image_size(path) == (1200, 1000)
+
+def test_jpeg_without_frame_header(tmp_path):
+    path = tmp_path / 'broken.jpg'
+    path.write_bytes(b'\xff\xd8\xff\xd9')
+    assert get_image_size(path) is None
+
+def test_other_files(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'not an image')
+    assert get_image_size(path) is None
+    assert get_image_size(tmp_path / 'missing.png') is None
+
+def test_changed_file_is_sniffed_again(tmp_path):
+    path = tmp_path / 'cover.png'
+    path.write_bytes(png(100, 100))
+    assert get_image_size(path) == (100, 100)
+    path.write_bytes(png(200, 100))
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    assert get_image_size(path) == (200, 100)
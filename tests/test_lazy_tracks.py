@@ -0,0 +1,47 @@
+import threading
+
+from metadata_manager.core.lazy_tracks import LazyTracks, fill_details, format_track_count, track_count
+
+def test_loads_once_on_first_use():
+    calls = []
+    
+    def load():
+        calls.append(None)
+        return [{'title': 'A'}, {'title': 'B'}]
+    tracks = LazyTracks(load, count=2)
+    assert track_count(tracks) == 2
+    assert not tracks.resolved
+    assert [track['title'] for track in tracks] == ['A', 'B']
+    assert len(tracks) == 2
+    assert len(calls) == 1
+
+def test_concurrent_access_loads_once():
+    calls = []
+    gate = threading.Event()
+    
+    def load():
+        calls.append(None)
+        gate.wait()
+        return [{'title': 'A'}]
+    tracks = LazyTracks(load)
+    threads = [threading.Thread(target=tracks.resolve) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+
+def test_format_track_count():
+    assert format_track_count(LazyTracks(list)) == "?"
+    assert format_track_count(LazyTracks(list, count=3)) == "3"
+    assert format_track_count([]) == ""
+
+def test_details_fill_only_empty_fields():
+    tracks = LazyTracks(lambda: {'year': '1999', 'tracks': [{'title': 'A'}]})
+    result = {'title': 'Album', 'year': '', 'tracks': tracks}
+    assert fill_details(result)['year'] == ''  # Not loaded yet
+    
+    assert list(tracks) == [{'title': 'A'}]
+    assert fill_details(result)['year'] == '1999'
+    assert fill_details({'year': '2001', 'tracks': tracks})['year'] == '2001'
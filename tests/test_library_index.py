@@ -0,0 +1,77 @@
+import os
+
+from metadata_manager.core.library_index import LibraryIndex
+
+def make_file(directory, name, content=b'audio'):
+    path = directory / name
+    path.write_bytes(content)
+    return str(path), path.stat()
+
+def test_lookup_returns_metadata_for_unchanged_files(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    path, st = make_file(tmp_path, 'a.mp3')
+    assert index.lookup(path, st) is None
+    index.store(path, st, {'title': ['A']})
+    assert index.lookup(path, st) == {'title': ['A']}
+    
+    with open(path, 'ab') as f:
+        f.write(b'more')
+    assert index.lookup(path, os.stat(path)) is None
+    index.close()
+
+def test_finish_scan_drops_files_not_seen(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    kept, kept_st = make_file(tmp_path, 'kept.mp3')
+    gone, gone_st = make_file(tmp_path, 'gone.mp3')
+    first = index.begin_scan()
+    index.store(kept, kept_st, {}, first)
+    index.store(gone, gone_st, {}, first)
+    
+    second = index.begin_scan()
+    assert second > first
+    assert index.lookup(kept, kept_st, second) == {}
+    assert index.finish_scan(str(tmp_path), False, second) == 1
+    assert index.lookup(gone, gone_st) is None
+    assert index.lookup(kept, kept_st) == {}
+    index.close()
+
+def test_recursive_finish_scan_stays_inside_the_directory(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    (tmp_path / 'lib' / 'sub').mkdir(parents=True)
+    (tmp_path / 'lib_other').mkdir()
+    inside, inside_st = make_file(tmp_path / 'lib' / 'sub', 'a.mp3')
+    outside, outside_st = make_file(tmp_path / 'lib_other', 'b.mp3')
+    index.store(inside, inside_st, {}, index.begin_scan())
+    index.store(outside, outside_st, {}, index.begin_scan())
+    
+    generation = index.begin_scan()
+    assert index.finish_scan(str(tmp_path / 'lib'), True, generation) == 1
+    assert index.lookup(outside, outside_st) == {}
+    index.close()
+
+def test_generations_continue_after_reopening(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    path, st = make_file(tmp_path, 'a.mp3')
+    generation = index.begin_scan()
+    index.store(path, st, {}, generation)
+    index.close()
+    
+    reopened = LibraryIndex(tmp_path / 'index.db')
+    assert reopened.begin_scan() > generation
+    reopened.close()
+
+def test_rows_below_skipped_directories_are_kept(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    (tmp_path / 'ok').mkdir()
+    (tmp_path / 'unreadable' / 'deep').mkdir(parents=True)
+    gone, gone_st = make_file(tmp_path / 'ok', 'gone.mp3')
+    hidden, hidden_st = make_file(tmp_path / 'unreadable' / 'deep', 'a.mp3')
+    first = index.begin_scan()
+    index.store(gone, gone_st, {}, first)
+    index.store(hidden, hidden_st, {}, first)
+    
+    second = index.begin_scan()
+    removed = index.finish_scan(str(tmp_path), True, second, skipped=[str(tmp_path / 'unreadable')])
+    assert removed == 1
+    assert index.lookup(hidden, hidden_st) == {}
+    index.close()
@@ -0,0 +1,109 @@
+import os
+
+from metadata_manager.core.library_index import LibraryIndex
+from metadata_manager.core.library_scanner import ARTWORK, AUDIO, FOLDER, LibraryScanner
+
+def make_tree(root, layout):
+    """Create files from a {relative path: content} mapping."""
+    for name, content in layout.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+def walk(scanner, root, recursive=True):
+    """(kind, path relative to root) pairs of a walk."""
+    return [(kind, os.path.relpath(entry if kind == FOLDER else entry.path, root))
+            for kind, entry in scanner._scan_path(root, recursive)]
+
+def test_folder_marker_follows_its_files(tmp_path):
+    make_tree(tmp_path, {'a/1.mp3': b'', 'a/cover.jpg': b'', 'a/b/2.flac': b'', 'notes.txt': b''})
+    entries = walk(LibraryScanner(), tmp_path)
+    
+    assert entries.index((AUDIO, 'a/1.mp3')) < entries.index((FOLDER, 'a'))
+    assert entries.index((ARTWORK, 'a/cover.jpg')) < entries.index((FOLDER, 'a'))
+    assert entries.index((AUDIO, 'a/b/2.flac')) < entries.index((FOLDER, 'a/b'))
+    assert entries[-1] == (FOLDER, 'a/b')
+    assert entries.count((FOLDER, '.')) == 1
+    assert all(path != 'notes.txt' for _, path in entries)
+
+def test_subdirectories_follow_their_parent_in_listing_order(tmp_path):
+    make_tree(tmp_path, {f'{name}/x.mp3': b'' for name in ('d1', 'd2', 'd3')})
+    folders = [path for kind, path in walk(LibraryScanner(), tmp_path) if kind == FOLDER]
+    listing = [entry.name for entry in os.scandir(tmp_path)]
+    assert folders == ['.'] + listing
+
+def test_non_recursive_walk_stays_in_the_directory(tmp_path):
+    make_tree(tmp_path, {'top.mp3': b'', 'sub/deep.mp3': b''})
+    assert walk(LibraryScanner(), tmp_path, recursive=False) == [(AUDIO, 'top.mp3'), (FOLDER, '.')]
+
+def test_hidden_and_ignored_entries_are_skipped(tmp_path):
+    make_tree(tmp_path, {'.hidden.mp3': b'', '.git/x.mp3': b'', 'song.MP3': b''})
+    scanner = LibraryScanner()
+    scanner.ignored_patterns.add('song*')
+    assert walk(scanner, tmp_path) == [(FOLDER, '.')]
+
+def test_symlink_loops_are_visited_once(tmp_path):
+    make_tree(tmp_path, {'a/x.mp3': b''})
+    os.symlink(tmp_path, tmp_path / 'a' / 'loop')
+    entries = walk(LibraryScanner(), tmp_path)
+    assert entries.count((AUDIO, 'a/x.mp3')) == 1
+
+def test_unreadable_directory_does_not_stop_the_walk(tmp_path, monkeypatch):
+    make_tree(tmp_path, {'bad/x.mp3': b'', 'good/y.mp3': b''})
+    scandir = os.scandir
+    
+    def failing_scandir(path):
+        if os.path.basename(path) == 'bad':
+            raise PermissionError("denied")
+        return scandir(path)
+    monkeypatch.setattr(os, 'scandir', failing_scandir)
+    entries = walk(LibraryScanner(), tmp_path)
+    assert (AUDIO, 'good/y.mp3') in entries
+    assert all(path != 'bad/x.mp3' for _, path in entries)
+
+class FakeTagScanner(LibraryScanner):
+    """Scanner reading the title from the file's content; files containing 'boom' fail."""
+    
+    @staticmethod
+    def _extract_metadata(path):
+        content = path.read_text()
+        if content == 'boom':
+            raise ValueError("corrupt file")
+        return {'title': [content]} if content else {}
+
+def scanned_titles(scanner, root):
+    return [(kind, item.title if kind == AUDIO else os.path.relpath(item.path, root))
+            for kind, item in scanner.iter_scan(root, recursive=True, artwork=False)]
+
+def test_parallel_scan_keeps_walk_order(tmp_path):
+    make_tree(tmp_path, {f'd{i}/{j:02}.mp3': f'{i}-{j}'.encode() for i in range(3) for j in range(20)})
+    serial = scanned_titles(FakeTagScanner(workers=1), tmp_path)
+    parallel = scanned_titles(FakeTagScanner(workers=8), tmp_path)
+    assert parallel == serial
+    assert len([kind for kind, _ in serial if kind == AUDIO]) == 60
+
+def test_unreadable_files_are_skipped(tmp_path):
+    make_tree(tmp_path, {'a.mp3': b'first', 'b.mp3': b'boom', 'c.mp3': b'', 'd.mp3': b'last'})
+    for workers in (1, 4):
+        titles = sorted(title for kind, title in scanned_titles(FakeTagScanner(workers=workers), tmp_path)
+                        if kind == AUDIO)
+        assert titles == ['first', 'last']
+
+def test_index_keeps_files_of_unreadable_directories(tmp_path, monkeypatch):
+    library = tmp_path / 'library'
+    make_tree(library, {'bad/x.mp3': b'x', 'good/y.mp3': b'y'})
+    index = LibraryIndex(tmp_path / 'index.db')
+    assert len(list(FakeTagScanner(workers=1, index=index).iter_scan(library, recursive=True))) == 4
+    
+    scandir = os.scandir
+    
+    def failing_scandir(path):
+        if os.path.basename(path) == 'bad':
+            raise PermissionError("denied")
+        return scandir(path)
+    monkeypatch.setattr(os, 'scandir', failing_scandir)
+    list(FakeTagScanner(workers=1, index=index).iter_scan(library, recursive=True))
+    
+    bad = str((library / 'bad' / 'x.mp3').resolve())
+    assert index.lookup(bad, os.stat(bad)) == {'title': ['x']}
+    index.close()
@@ -0,0 +1,142 @@
+import os
+import queue
+import shutil
+
+from metadata_manager.core.file_scanner import FileScanner
+from metadata_manager.core.library_index import LibraryIndex
+from metadata_manager.core.library_watcher import LibraryWatcher, PollingBackend
+
+class FakeTagScanner(FileScanner):
+    """Scanner reading the title from the file's content."""
+    
+    @staticmethod
+    def _extract_metadata(path):
+        content = path.read_text()
+        return {'title': [content]} if content else {}
+
+def backdate(*paths):
+    """Give directories an old mtime, so the next change is always visible."""
+    for path in paths:
+        os.utime(path, ns=(0, 0))
+
+def polled(backend, *dirs):
+    """Events of one poll, after which dirs look unchanged again."""
+    events = []
+    backend.emit = events.append
+    backend.poll()
+    backdate(*dirs)
+    backend.poll()
+    return [(kind, os.path.basename(path), src and os.path.basename(src)) for kind, path, src in events]
+
+def test_polling_reports_added_moved_and_deleted_files(tmp_path):
+    (tmp_path / 'old.mp3').write_text('old')
+    backdate(tmp_path)
+    backend = PollingBackend(FakeTagScanner(), str(tmp_path), False, None)
+    backend.prepare()
+    assert backend.paths() == {str(tmp_path / 'old.mp3')}
+    
+    (tmp_path / 'new.mp3').write_text('new')
+    (tmp_path / 'notes.txt').write_text('')
+    assert polled(backend, tmp_path) == [('changed', 'new.mp3', None)]
+    
+    os.rename(tmp_path / 'new.mp3', tmp_path / 'renamed.mp3')
+    assert polled(backend, tmp_path) == [('moved', 'renamed.mp3', 'new.mp3')]
+    
+    os.remove(tmp_path / 'old.mp3')
+    assert polled(backend, tmp_path) == [('deleted', 'old.mp3', None)]
+
+def test_polling_follows_added_and_removed_subdirectories(tmp_path):
+    backdate(tmp_path)
+    backend = PollingBackend(FakeTagScanner(), str(tmp_path), True, None)
+    backend.prepare()
+    
+    (tmp_path / 'album').mkdir()
+    (tmp_path / 'album' / 'a.flac').write_text('a')
+    assert polled(backend, tmp_path, tmp_path / 'album') == [('changed', 'a.flac', None)]
+    
+    shutil.rmtree(tmp_path / 'album')
+    assert polled(backend, tmp_path) == [('deleted', 'a.flac', None)]
+
+def test_in_place_rewrites_wait_for_the_sweep(tmp_path):
+    song = tmp_path / 'song.mp3'
+    song.write_text('before')
+    backdate(tmp_path)
+    backend = PollingBackend(FakeTagScanner(), str(tmp_path), False, None)
+    backend.prepare()
+    
+    song.write_text('after, longer')
+    backdate(tmp_path)
+    events = []
+    backend.emit = events.append
+    backend.poll()
+    assert events == []
+    backend.poll(sweep=True)
+    assert events == [('changed', str(song), None)]
+
+def test_first_snapshot_uses_index_signatures(tmp_path):
+    library = tmp_path / 'library'
+    library.mkdir()
+    song = library / 'song.mp3'
+    song.write_text('tags')
+    index = LibraryIndex(tmp_path / 'index.db')
+    index.store(str(song), os.stat(song), {'title': ['tags']})
+    
+    backend = PollingBackend(FakeTagScanner(index=index), str(library), False, None)
+    backend.prepare()
+    assert backend.paths() == {str(song)}
+    
+    # The index row is out of date, which the sweep notices
+    os.utime(song, ns=(1, 1))
+    index.store(str(song), os.stat(song), {'title': ['tags']})
+    os.utime(song, ns=(2, 2))
+    backend = PollingBackend(FakeTagScanner(index=index), str(library), False, None)
+    backend.prepare()
+    events = []
+    backend.emit = events.append
+    backend.poll(sweep=True)
+    assert events == [('changed', str(song), None)]
+    index.close()
+
+def test_resolve_reads_changed_files_and_updates_the_index(tmp_path):
+    index = LibraryIndex(tmp_path / 'index.db')
+    library = tmp_path / 'library'
+    library.mkdir()
+    watcher = LibraryWatcher(FakeTagScanner(index=index), library, lambda events: None)
+    first, second = str(library / 'a.mp3'), str(library / 'b.mp3')
+    
+    (library / 'a.mp3').write_text('one')
+    [event] = watcher._resolve([('changed', first, None)])
+    assert (event.kind, event.path, event.file.title) == ('added', first, 'one')
+    
+    (library / 'a.mp3').write_text('two')
+    [event] = watcher._resolve([('changed', first, None), ('changed', first, None)])
+    assert (event.kind, event.file.title) == ('modified', 'two')
+    
+    os.rename(first, second)
+    [event] = watcher._resolve([('moved', second, first), ('changed', second, None)])
+    assert (event.kind, event.path, event.src_path) == ('moved', second, first)
+    assert index.signatures(str(library)).keys() == {second}
+    
+    os.remove(second)
+    [event] = watcher._resolve([('deleted', second, None)])
+    assert (event.kind, event.path, event.file) == ('deleted', second, None)
+    assert index.signatures(str(library)) == {}
+    assert watcher._resolve([('deleted', second, None)]) == []
+    index.close()
+
+def test_watcher_reports_new_files(tmp_path):
+    (tmp_path / 'old.mp3').write_text('old')
+    backdate(tmp_path)
+    batches = queue.Queue()
+    watcher = LibraryWatcher(FakeTagScanner(), tmp_path, batches.put, debounce=0.01,
+                             poll_interval=0.02, use_inotify=False)
+    watcher.start()
+    try:
+        assert watcher._ready.wait(5)
+        assert watcher._known == {str(tmp_path / 'old.mp3')}
+        (tmp_path / 'new.mp3').write_text('new')
+        [event] = batches.get(timeout=5)
+        assert (event.kind, event.file.title) == ('added', 'new')
+    finally:
+        watcher.stop()
+    assert watcher.mode == 'polling'
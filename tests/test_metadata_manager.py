@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from metadata_manager.core import deadline
+from metadata_manager.core.http_client import HTTPStatusError, is_transport_error
+from metadata_manager.core.lazy_tracks import LazyTracks
+from metadata_manager.core.metadata_manager import MetadataManager
+from metadata_manager.core.providers.provider_base import MetadataProvider
+
+class FakeProvider(MetadataProvider):
+    """Provider answering from a fixed score, optionally after a delay."""
+    
+    def __init__(self, name='fake', score=90, delay=0.0, error=None):
+        self._name = name
+        self.score = score
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+    
+    @property
+    def name(self) -> str:
+        return self._name
+    
+    def search_track(self, title, artist=None):
+        self.calls += 1
+        if self.delay:
+            deadline.sleep(self.delay)
+        if self.error:
+            raise self.error
+        result = self.format_result({'title': title, 'artist': artist, 'score': self.score})
+        result['tracks'] = LazyTracks(lambda: {'year': '1999', 'tracks': [{'title': title}]})
+        return [result]
+    
+    def search_album(self, album, artist=None):
+        return self.search_track(album, artist)
+
+@pytest.fixture
+def manager():
+    manager = MetadataManager(enabled_providers=['none'], provider_timeout=2.0)
+    yield manager
+    if manager._executor is not None:
+        manager._executor.shutdown(wait=False)
+
+def files(title='Song', artist='Artist'):
+    return [{'metadata': {'title': [title], 'artist': [artist]}}]
+
+def test_equivalent_queries_are_answered_from_the_memo(manager):
+    provider = FakeProvider()
+    manager.providers = [provider]
+    manager._search_provider(provider, 'track', 'Song', 'Artist')
+    manager._search_provider(provider, 'track', '  song ', 'ARTIST!')
+    assert provider.calls == 1
+
+def test_remembered_matches_are_copies(manager):
+    provider = FakeProvider()
+    manager.providers = [provider]
+    first = manager._search_provider(provider, 'track', 'Song', 'Artist')[0]
+    first['year'] = 'changed'
+    first['extra'] = True
+    second = manager._search_provider(provider, 'track', 'Song', 'Artist')[0]
+    assert second['year'] == ''
+    assert 'extra' not in second
+
+class VariationProvider(FakeProvider):
+    """Provider scoring each title from a table; its first `failures` calls raise."""
+    
+    def __init__(self, scores, failures=0):
+        super().__init__()
+        self.scores = scores
+        self.failures = failures
+        self.queries = []
+    
+    def search_track(self, title, artist=None):
+        self.queries.append((title, artist))
+        if len(self.queries) <= self.failures:
+            raise ConnectionError("reset")
+        if title not in self.scores:
+            return []
+        return [self.format_result({'title': title, 'artist': artist, 'score': self.scores[title]})]
+
+def test_variations_stop_at_the_first_good_match(manager):
+    provider = VariationProvider({'Title': 95, 'Artist - Title': 95})
+    manager.providers = [provider]
+    results = manager._search_variations(manager._normalize_query('Artist - Title'), album=False)
+    assert results['fake'][0]['title'] == 'Title'
+    assert provider.queries == [('Title', 'Artist')]
+
+def test_weak_matches_keep_trying_less_likely_variations(manager):
+    provider = VariationProvider({'Title': 40, 'Artist - Title': 90})
+    manager.providers = [provider]
+    results = manager._search_variations(manager._normalize_query('Artist - Title'), album=False)
+    assert results['fake'][0]['title'] == 'Artist - Title'
+
+def test_without_a_good_match_the_most_likely_answer_wins(manager):
+    provider = VariationProvider({'Title': 40, 'Artist': 50})
+    manager.providers = [provider]
+    results = manager._search_variations(manager._normalize_query('Artist - Title'), album=False)
+    assert results['fake'][0]['title'] == 'Title'
+    assert len(provider.queries) > 1
+
+def test_a_failed_variation_does_not_drop_the_rest(manager):
+    provider = VariationProvider({'Artist - Title': 90}, failures=1)
+    manager.providers = [provider]
+    results = manager._search_variations(manager._normalize_query('Artist - Title'), album=False)
+    assert results['fake'][0]['title'] == 'Artist - Title'
+
+def test_results_stream_fastest_first(manager):
+    manager.providers = [FakeProvider('slow', delay=0.2), FakeProvider('fast'),
+                         FakeProvider('broken', error=ValueError("bad reply"))]
+    results = list(manager.iter_search(files(), 'track'))
+    assert [result.provider for result in results][-1] == 'slow'
+    by_name = {result.provider: result for result in results}
+    assert by_name['fast'].matches[0]['title'] == 'Song'
+    assert by_name['fast'].elapsed < by_name['slow'].elapsed
+    assert isinstance(by_name['broken'].error, ValueError)
+    assert by_name['broken'].matches == []
+
+def test_async_results_stream_fastest_first(manager):
+    manager.providers = [FakeProvider('slow', delay=0.2), FakeProvider('fast')]
+    
+    async def run():
+        return [result.provider async for result in manager.aiter_search(files(), 'track')]
+    assert asyncio.run(run()) == ['fast', 'slow']
+
+def test_race_returns_the_first_match_above_the_threshold(manager):
+    manager.providers = [FakeProvider('low', score=60), FakeProvider('high', score=95)]
+    best = manager.race_search(files(), 'track', min_score=0.9, deadline=1.0)
+    assert best['provider'] == 'high'
+
+def test_race_without_a_good_enough_match_returns_none(manager):
+    manager.providers = [FakeProvider('low', score=60), FakeProvider('high', score=95)]
+    assert manager.race_search(files(), 'track', min_score=0.99, deadline=1.0) is None
+    
+    async def run():
+        return await manager.race_search_async(files('Other'), 'track', min_score=0.99, deadline=1.0)
+    assert asyncio.run(run()) is None
+
+def test_deadline_hits_do_not_open_the_circuit(manager):
+    slow = FakeProvider('slow', delay=0.5)
+    manager.providers = [slow]
+    for i in range(5):
+        manager.race_search(files(f'Song {i}'), 'track', deadline=0.1)
+    assert manager.provider_status() == {'slow': 'closed'}
+
+def test_failing_provider_is_skipped(manager):
+    broken = FakeProvider('broken', error=ConnectionError("refused"))
+    manager.providers = [broken]
+    for i in range(5):
+        manager.search_all(files(f'Song {i}'), 'track')
+    assert manager.provider_status()['broken'].startswith('open')
+    assert broken.calls < 5
+
+def test_client_errors_do_not_open_the_circuit(manager):
+    rejected = FakeProvider('rejected', error=HTTPStatusError(404, 'https://example.com/search'))
+    manager.providers = [rejected]
+    for i in range(5):
+        manager.search_all(files(f'Song {i}'), 'track')
+    assert manager.provider_status() == {'rejected': 'closed'}
+    assert rejected.calls == 5
+
+def test_transport_errors():
+    assert is_transport_error(ConnectionError("refused"))
+    assert is_transport_error(HTTPStatusError(503, 'https://example.com/'))
+    assert is_transport_error(HTTPStatusError(429, 'https://example.com/'))
+    assert not is_transport_error(HTTPStatusError(400, 'https://example.com/'))
+    assert not is_transport_error(FileNotFoundError("config.toml"))
+    assert not is_transport_error(ValueError("unexpected reply"))
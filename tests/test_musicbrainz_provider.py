@@ -0,0 +1,82 @@
+import pytest
+
+from metadata_manager.core import entity_cache
+from metadata_manager.core.entity_cache import EntityCache
+from metadata_manager.core.lazy_tracks import LazyTracks
+from metadata_manager.core.providers import musicbrainz_provider
+from metadata_manager.core.providers.musicbrainz_provider import MusicBrainzProvider
+
+RECORDINGS = {'recordings': [{
+    'id': 'rec-1',
+    'score': 100,
+    'title': 'Teardrop',
+    'artist-credit': [{'name': 'Massive Attack'}],
+    'releases': [
+        {'id': 'rel-1', 'title': 'Mezzanine', 'track-count': 11},
+        {'id': 'rel-2', 'title': 'Mezzanine', 'date': '1998-04-20', 'media': [{'track-count': 11}]},
+    ],
+}]}
+RELEASES = {'releases': [{
+    'id': 'rel-2',
+    'score': 97,
+    'title': 'Mezzanine',
+    'date': '1998-04-20',
+    'artist-credit': [{'name': 'Massive Attack'}],
+    'media': [{'track-count': 1}, {'track-count': 1}],
+}]}
+RELEASE = {'media': [
+    {'tracks': [{'position': 1, 'recording': {'id': 'rec-0', 'title': 'Angel'}}]},
+    {'tracks': [{'position': 1, 'recording': {'id': 'rec-1', 'title': 'Teardrop'}}]},
+]}
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Serve canned web service documents; queue exceptions in `failures` to raise first."""
+    failures = []
+    
+    def get_json(url, params=None, headers=None):
+        if failures:
+            raise failures.pop(0)
+        if url.endswith('/recording'):
+            return RECORDINGS
+        if url.endswith('/release'):
+            return RELEASES
+        return RELEASE
+    monkeypatch.setattr(musicbrainz_provider, 'get_json', get_json)
+    monkeypatch.setattr(entity_cache, '_entity_cache', EntityCache())
+    return failures
+
+def common_fields(result):
+    return {key: value for key, value in result.items() if key not in ('tracks', 'raw_data')}
+
+def test_track_search_results(responses):
+    [result] = MusicBrainzProvider().search_track('Teardrop', 'Massive Attack')
+    assert common_fields(result) == {
+        'title': 'Teardrop', 'artist': 'Massive Attack', 'album': 'Mezzanine',
+        'year': '1998', 'score': 100.0, 'provider': 'musicbrainz',
+    }
+    assert isinstance(result['tracks'], LazyTracks) and result['tracks'].count == 11
+    assert [track['title'] for track in result['tracks']] == ['Angel', 'Teardrop']
+
+def test_album_search_results(responses):
+    [result] = MusicBrainzProvider().search_album('Mezzanine', 'Massive Attack')
+    assert common_fields(result) == {
+        'title': 'Mezzanine', 'artist': 'Massive Attack', 'album': '',
+        'year': '1998', 'score': 97.0, 'provider': 'musicbrainz',
+    }
+    assert result['tracks'].count == 2
+    assert list(result['tracks']) == [
+        {'title': 'Angel', 'position': '1', 'id': 'rec-0'},
+        {'title': 'Teardrop', 'position': '1', 'id': 'rec-1'},
+    ]
+
+def test_search_quotes_lucene_phrases():
+    params = MusicBrainzProvider._search_params('release', 'Say "Hi"', 'AC/DC')
+    assert params == {'query': 'release:"Say \\"Hi\\"" AND artist:"AC/DC"', 'limit': 5, 'fmt': 'json'}
+
+def test_failed_track_fetch_is_tried_again(responses):
+    [result] = MusicBrainzProvider().search_album('Mezzanine', 'Massive Attack')
+    responses.append(ConnectionError("reset"))
+    assert result['tracks'].resolve() == []
+    assert not result['tracks'].resolved
+    assert len(result['tracks']) == 2
@@ -0,0 +1,58 @@
+import time
+import asyncio
+
+import pytest
+
+from metadata_manager.core import deadline
+from metadata_manager.core.rate_limit import TokenBucket, provider_for_url
+
+def test_burst_is_free_then_callers_wait():
+    bucket = TokenBucket(rate=20.0, burst=2)
+    started = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - started < 0.04
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.04
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(rate=0, burst=1)
+    for _ in range(100):
+        bucket.acquire()
+
+def test_caller_out_of_time_takes_no_token():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.acquire()
+    for _ in range(5):
+        with deadline.scope(0.1):
+            with pytest.raises(deadline.DeadlineExceeded):
+                bucket.acquire()
+    # Refusals must not push the bucket into debt
+    assert bucket._tokens > -0.5
+
+def test_token_is_refunded_when_wait_is_cut_short(monkeypatch):
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.acquire()
+    
+    def interrupted(seconds):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(deadline, 'sleep', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        bucket.acquire()
+    assert bucket._tokens > -0.5
+
+def test_async_caller_out_of_time_takes_no_token():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.acquire()
+    
+    async def run():
+        with deadline.scope(0.1):
+            await bucket.acquire_async()
+    with pytest.raises(deadline.DeadlineExceeded):
+        asyncio.run(run())
+    assert bucket._tokens > -0.5
+
+def test_provider_for_url():
+    assert provider_for_url('https://musicbrainz.org/ws/2/recording') == 'musicbrainz'
+    assert provider_for_url('https://accounts.spotify.com/api/token') == 'spotify'
+    assert provider_for_url('https://example.com/') is None
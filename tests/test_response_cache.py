@@ -0,0 +1,54 @@
+import time
+
+from metadata_manager.core.response_cache import ResponseCache, cache_key
+
+def test_cache_key_ignores_parameter_order_and_placement():
+    assert cache_key('GET', 'https://API.deezer.com/search?q=a&limit=5') == \
+        cache_key('get', 'https://api.deezer.com/search', {'limit': 5, 'q': 'a'})
+    assert cache_key('GET', 'https://api.deezer.com/search', {'q': 'a'}) != \
+        cache_key('GET', 'https://api.deezer.com/search', {'q': 'b'})
+
+def test_hit_and_expiry(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db', ttl=0.05)
+    cache.set('GET', 'https://example.com/a', None, '{"a": 1}')
+    assert cache.get('GET', 'https://example.com/a') == '{"a": 1}'
+    time.sleep(0.06)
+    assert cache.get('GET', 'https://example.com/a') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+    cache.close()
+
+def test_hits_do_not_write(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.set('GET', 'https://example.com/a', None, '{}')
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        assert cache.get('GET', 'https://example.com/a') == '{}'
+    assert cache._conn.total_changes == changes
+    cache.close()
+
+def test_access_times_are_written_with_the_next_insert(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.set('GET', 'https://example.com/a', None, '{}')
+    accessed = cache._conn.execute("SELECT accessed FROM responses").fetchone()[0]
+    time.sleep(0.01)
+    cache.get('GET', 'https://example.com/a')
+    cache.set('GET', 'https://example.com/b', None, '{}')
+    row = cache._conn.execute("SELECT accessed FROM responses WHERE key = ?",
+                              (cache_key('GET', 'https://example.com/a'),)).fetchone()
+    assert row[0] > accessed
+    cache.close()
+
+def test_zero_ttl_disables_caching_per_provider(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db', ttls={'spotify': 0})
+    cache.set('GET', 'https://api.spotify.com/v1/search', None, '{}')
+    assert cache.get('GET', 'https://api.spotify.com/v1/search') is None
+    cache.close()
+
+def test_lookups_read_committed_rows_while_a_write_is_open(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    cache.set('GET', 'https://example.com/a', None, '{}')
+    cache._conn.execute("BEGIN IMMEDIATE")
+    cache._conn.execute("DELETE FROM responses")
+    assert cache.get('GET', 'https://example.com/a') == '{}'
+    cache._conn.rollback()
+    cache.close()
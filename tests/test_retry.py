@@ -0,0 +1,74 @@
+import time
+import asyncio
+from email.utils import formatdate
+
+import pytest
+
+from metadata_manager.core import deadline
+from metadata_manager.core.http_client import HTTPStatusError
+from metadata_manager.core.retry import RetryPolicy, retry_after_seconds
+
+def flaky(errors, result='ok'):
+    """Callable raising the given errors in turn, then returning result."""
+    errors = list(errors)
+    calls = []
+    
+    def func():
+        calls.append(None)
+        if errors:
+            raise errors.pop(0)
+        return result
+    func.calls = calls
+    return func
+
+def test_retries_transient_errors_until_success():
+    func = flaky([ConnectionError(), HTTPStatusError(503, 'http://x')])
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+    assert policy.call('test', func) == 'ok'
+    assert len(func.calls) == 3
+
+def test_client_errors_fail_fast():
+    func = flaky([HTTPStatusError(404, 'http://x')])
+    with pytest.raises(HTTPStatusError):
+        RetryPolicy(base_delay=0.01).call('test', func)
+    assert len(func.calls) == 1
+
+def test_gives_up_after_max_attempts():
+    func = flaky([ConnectionError()] * 5)
+    with pytest.raises(ConnectionError):
+        RetryPolicy(max_attempts=2, base_delay=0.01).call('test', func)
+    assert len(func.calls) == 2
+
+def test_extra_retryable_types():
+    class LibraryError(Exception):
+        pass
+    func = flaky([LibraryError()])
+    assert RetryPolicy(base_delay=0.01).call('test', func, retryable=(LibraryError,)) == 'ok'
+
+def test_deadline_is_not_retried_and_caps_waits():
+    assert not RetryPolicy.is_retryable(deadline.DeadlineExceeded())
+    func = flaky([HTTPStatusError(503, 'http://x', {'Retry-After': '5'})])
+    started = time.monotonic()
+    with deadline.scope(0.5):
+        with pytest.raises(HTTPStatusError):
+            RetryPolicy().call('test', func)
+    assert time.monotonic() - started < 0.5
+
+def test_call_async():
+    func = flaky([ConnectionError()])
+    
+    async def attempt():
+        return func()
+    assert asyncio.run(RetryPolicy(base_delay=0.01).call_async('test', attempt)) == 'ok'
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(HTTPStatusError(429, 'http://x', {'retry-after': '3'})) == 3.0
+    assert retry_after_seconds(HTTPStatusError(429, 'http://x')) is None
+    assert retry_after_seconds(HTTPStatusError(429, 'http://x', {'Retry-After': 'soon'})) is None
+    later = retry_after_seconds(HTTPStatusError(429, 'http://x', {'Retry-After': formatdate(time.time() + 60)}))
+    assert 55 < later <= 60
+
+def test_delay_prefers_retry_after():
+    policy = RetryPolicy(base_delay=0.1)
+    assert 2.0 <= policy.delay(1, HTTPStatusError(503, 'http://x', {'Retry-After': '2'})) <= 2.1
+    assert 0 <= policy.delay(3, ConnectionError()) <= 0.4
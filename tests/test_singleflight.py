@@ -0,0 +1,121 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from metadata_manager.core import deadline
+from metadata_manager.core.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    
+    def slow():
+        calls.append(None)
+        started.set()
+        time.sleep(0.1)
+        return 42
+    
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do('key', slow)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flights.do('key', slow))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+    assert results == [42] * 5
+    assert len(calls) == 1
+
+def test_errors_are_shared_and_not_kept():
+    flights = SingleFlight()
+    
+    def fail():
+        raise ValueError("boom")
+    with pytest.raises(ValueError):
+        flights.do('key', fail)
+    assert flights.do('key', lambda: 'fresh') == 'fresh'
+
+def test_async_callers_share_one_task():
+    flights = SingleFlight()
+    calls = []
+    
+    async def fetch():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        return 'done'
+    
+    async def run():
+        return await asyncio.gather(*(flights.do_async('key', fetch) for _ in range(5)))
+    assert asyncio.run(run()) == ['done'] * 5
+    assert len(calls) == 1
+
+def test_followers_wait_no_longer_than_their_own_deadline():
+    flights = SingleFlight()
+    started = threading.Event()
+    gate = threading.Event()
+    
+    def blocked():
+        started.set()
+        gate.wait(2)
+        return 'late'
+    leader = threading.Thread(target=lambda: flights.do('key', blocked))
+    leader.start()
+    started.wait()
+    begun = time.monotonic()
+    with deadline.scope(0.05):
+        with pytest.raises(deadline.DeadlineExceeded):
+            flights.do('key', blocked)
+    assert time.monotonic() - begun < 0.5
+    gate.set()
+    leader.join()
+
+def test_followers_retry_when_only_the_leader_ran_out_of_time():
+    flights = SingleFlight()
+    started = threading.Event()
+    
+    def slow():
+        started.set()
+        time.sleep(0.1)
+        deadline.check()
+        return 'done'
+    
+    def lead():
+        with deadline.scope(0.05):
+            with pytest.raises(deadline.DeadlineExceeded):
+                flights.do('key', slow)
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait()
+    with deadline.scope(2.0):
+        assert flights.do('key', slow) == 'done'
+    leader.join()
+
+def test_async_followers_keep_their_own_deadline():
+    flights = SingleFlight()
+    
+    async def slow():
+        await deadline.sleep_async(0.2)
+        return 'slow'
+    
+    async def leader():
+        with deadline.scope(0.05):
+            with pytest.raises(deadline.DeadlineExceeded):
+                await flights.do_async('key', slow)
+    
+    async def follower(seconds):
+        await asyncio.sleep(0.01)
+        with deadline.scope(seconds):
+            return await flights.do_async('key', slow)
+    
+    async def run():
+        impatient = asyncio.ensure_future(follower(0.02))
+        patient = asyncio.ensure_future(follower(2.0))
+        await leader()
+        with pytest.raises(deadline.DeadlineExceeded):
+            await impatient
+        return await patient
+    assert asyncio.run(run()) == 'slow'
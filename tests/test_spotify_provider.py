@@ -0,0 +1,62 @@
+import time
+import threading
+
+import pytest
+
+from metadata_manager.core.providers import spotify_provider
+from metadata_manager.core.providers.spotify_provider import SpotifyTokenManager
+
+pytestmark = pytest.mark.skipif(not spotify_provider.HAS_SPOTIPY, reason="spotipy not installed")
+
+class FakeCredentials:
+    """Hands out numbered tokens, each valid for expires_in seconds."""
+    
+    def __init__(self, expires_in=3600):
+        self.expires_in = expires_in
+        self.issued = 0
+        self.cache_handler = self
+        self._token_info = None
+    
+    def get_access_token(self, as_dict=False, check_cache=True):
+        self.issued += 1
+        self._token_info = {'access_token': f'token-{self.issued}',
+                            'expires_at': int(time.time()) + self.expires_in}
+        return self._token_info['access_token']
+    
+    def get_cached_token(self):
+        return self._token_info
+
+def token_manager(expires_in=3600):
+    manager = SpotifyTokenManager('client-id', 'client-secret')
+    manager._credentials = FakeCredentials(expires_in)
+    return manager
+
+def test_token_is_fetched_once_and_reused():
+    manager = token_manager()
+    assert manager.get_token() == 'token-1'
+    assert manager.get_token() == 'token-1'
+    assert manager._credentials.issued == 1
+
+def test_token_near_expiry_is_renewed_in_the_background():
+    manager = token_manager(expires_in=SpotifyTokenManager.REFRESH_MARGIN - 10)
+    assert manager.get_token() == 'token-1'
+    # Still valid, so the caller gets it at once while the next one is fetched
+    assert manager.cached_token() == 'token-1'
+    for _ in range(100):
+        if manager._token != 'token-1':
+            break
+        time.sleep(0.01)
+    assert manager.get_token() == 'token-2'
+
+def test_rejected_token_is_replaced_once():
+    manager = token_manager()
+    rejected = manager.get_token()
+    replacements = []
+    threads = [threading.Thread(target=lambda: replacements.append(manager.invalidate(rejected)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert replacements == ['token-2'] * 5
+    assert manager._credentials.issued == 2
@@ -0,0 +1,64 @@
+import struct
+
+from mutagen.flac import VCFLACDict
+
+from metadata_manager.core.tag_reader import FLACHeader, read_metadata
+
+def block(code, data, last=False):
+    return bytes([code | (0x80 if last else 0)]) + len(data).to_bytes(3, 'big') + data
+
+def streaminfo(sample_rate=44100, channels=2, bits=16, samples=441000):
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | samples
+    return struct.pack('>HH', 4096, 4096) + bytes(6) + packed.to_bytes(8, 'big') + bytes(16)
+
+def vorbis_comment(**tags):
+    comment = VCFLACDict()
+    for key, value in tags.items():
+        comment[key] = [value]
+    return comment.write(framing=False)
+
+def test_reads_tags_and_stream_info(tmp_path):
+    path = tmp_path / 'song.flac'
+    audio = bytes(100000)
+    path.write_bytes(b'fLaC' + block(0, streaminfo()) + block(6, bytes(50000))
+                     + block(4, vorbis_comment(title='Song', artist='Artist'), last=True) + audio)
+    
+    header = FLACHeader.read(path)
+    assert header.tags['title'] == ['Song']
+    assert header.tags['artist'] == ['Artist']
+    assert header.info.sample_rate == 44100
+    assert header.info.channels == 2
+    assert header.info.length == 10.0
+    assert header.info.bitrate == len(audio) * 8 // 10
+
+def test_file_without_tags(tmp_path):
+    path = tmp_path / 'bare.flac'
+    path.write_bytes(b'fLaC' + block(0, streaminfo(), last=True))
+    header = FLACHeader.read(path)
+    assert header.tags is None
+    assert header.info.length == 10.0
+
+def test_needs_full_parser(tmp_path):
+    id3_prefixed = tmp_path / 'id3.flac'
+    id3_prefixed.write_bytes(b'ID3\x04\x00' + bytes(20))
+    assert FLACHeader.read(id3_prefixed) is None
+    
+    truncated = tmp_path / 'truncated.flac'
+    truncated.write_bytes(b'fLaC' + block(4, vorbis_comment(title='Song')))
+    assert FLACHeader.read(truncated) is None
+
+def test_read_metadata_uses_the_header_fast_path(tmp_path):
+    path = tmp_path / 'song.flac'
+    path.write_bytes(b'fLaC' + block(0, streaminfo())
+                     + block(4, vorbis_comment(title='Song', date='1999', tracknumber='3'), last=True) + bytes(1000))
+    metadata = read_metadata(path)
+    assert metadata['title'] == ['Song']
+    assert metadata['date'] == ['1999']
+    assert metadata['track'] == ['3']
+    assert metadata['duration'] == '10'
+    assert metadata['sample_rate'] == '44100'
+
+def test_read_metadata_of_unreadable_files(tmp_path):
+    path = tmp_path / 'junk.mp3'
+    path.write_bytes(b'not audio')
+    assert read_metadata(path) == {}
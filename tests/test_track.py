@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+from metadata_manager.core.track import Track
+
+METADATA = {
+    'title': ['Song'],
+    'artist': ['Band', 'Guest'],
+    'album': ['Record'],
+    'duration': '215',
+    'bitrate': '320000',
+    'sample_rate': 'junk',
+}
+
+def test_reads_like_the_old_file_dict():
+    track = Track.from_metadata('/music/a/01 Song.flac', METADATA)
+    assert track['path'] == '/music/a/01 Song.flac'
+    assert track['filename'] == '01 Song.flac'
+    assert dict(track).keys() == {'path', 'filename', 'metadata'}
+    assert 'metadata' in track
+    assert track.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        track['title']
+
+def test_metadata_view_has_the_dict_of_lists_shape():
+    metadata = Track.from_metadata('/music/song.mp3', METADATA)['metadata']
+    assert metadata['title'] == ['Song']
+    assert metadata['artist'] == ['Band', 'Guest']
+    assert metadata.get('genre', [''])[0] == ''
+    assert 'genre' not in metadata
+    assert metadata['duration'] == '215'
+    assert metadata['sample_rate'] == '0'
+    assert dict(metadata) == {
+        'title': ['Song'], 'artist': ['Band', 'Guest'], 'album': ['Record'],
+        'duration': '215', 'bitrate': '320000', 'sample_rate': '0',
+    }
+
+def test_shared_tags_are_interned():
+    first = Track.from_metadata('/a.mp3', {'album': [''.join(['Rec', 'ord'])]})
+    second = Track.from_metadata('/b.mp3', {'album': [''.join(['Re', 'cord'])]})
+    assert first.album is second.album
+
+def test_tracks_are_immutable_and_picklable():
+    track = Track.from_metadata('/music/song.mp3', METADATA)
+    with pytest.raises(AttributeError):
+        track.title = 'Other'
+    copy = pickle.loads(pickle.dumps(track))
+    assert dict(copy['metadata']) == dict(track['metadata'])
+    assert not hasattr(track, '__dict__')